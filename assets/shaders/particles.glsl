@@ -0,0 +1,35 @@
+###
+#vertex
+#version 300 es
+
+in vec2 vvert;
+in vec2 ipos;
+in float iangle;
+in float iradius;
+in vec3 icolor;
+
+uniform vec2 fsize;
+
+out vec4 fcolor;
+
+void main() {
+    // rotate + scale the unit mesh, then framebuffer pixels -> clip space
+    float c = cos(iangle);
+    float s = sin(iangle);
+    vec2 p = ipos + vec2(vvert.x * c - vvert.y * s, vvert.x * s + vvert.y * c) * iradius;
+    gl_Position = vec4(p.x / fsize.x * 2.0 - 1.0, 1.0 - p.y / fsize.y * 2.0, 0.0, 1.0);
+    fcolor = vec4(icolor, 1.0);
+}
+
+###
+#fragment
+#version 300 es
+precision mediump float;
+
+in vec4 fcolor;
+
+out vec4 fragColor;
+
+void main() {
+    fragColor = fcolor;
+}
@@ -0,0 +1,33 @@
+###
+#vertex
+#version 300 es
+
+in vec2 vvert;
+in vec4 irect;
+in vec4 iuv;
+
+uniform vec2 fsize;
+
+out vec2 fuv;
+
+void main() {
+    // unit quad -> sprite rect in framebuffer pixels -> clip space
+    vec2 p = irect.xy + vvert * irect.zw;
+    gl_Position = vec4(p.x / fsize.x * 2.0 - 1.0, 1.0 - p.y / fsize.y * 2.0, 0.0, 1.0);
+    fuv = mix(iuv.xy, iuv.zw, vvert);
+}
+
+###
+#fragment
+#version 300 es
+precision mediump float;
+
+uniform sampler2D atlas;
+
+in vec2 fuv;
+
+out vec4 fragColor;
+
+void main() {
+    fragColor = texture(atlas, fuv);
+}
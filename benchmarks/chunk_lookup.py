@@ -0,0 +1,57 @@
+"""
+Chunk lookup benchmark
+- compares the old string-hash chunk lookup against the (x, y) tuple keys
+- run from the repository root: `python benchmarks/chunk_lookup.py`
+"""
+
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soragl import scene
+
+# ------------------------------------------------------------ #
+# setup
+# ------------------------------------------------------------ #
+
+CALLS = 1_000_000
+RANGE = 16
+
+sc = scene.Scene(config=scene.configure_ecs())
+world = sc.make_layer(sc.get_config(), 0)
+for x in range(-RANGE, RANGE):
+    for y in range(-RANGE, RANGE):
+        world.get_chunk(x, y)
+
+# the string-hash lookup that `World.get_chunk` used before integer keys
+legacy_chunks = {hash(f"{k[0]}-{k[1]}"): c for k, c in world._chunks.items()}
+
+
+def legacy_get_chunk(x: int, y: int):
+    """Old `World.get_chunk` -- f-string + hash on every call"""
+    x, y = int(x), int(y)
+    f = hash(f"{x}-{y}")
+    if f in legacy_chunks:
+        return legacy_chunks[f]
+
+
+# ------------------------------------------------------------ #
+# run
+# ------------------------------------------------------------ #
+
+def bench(name: str, stmt: str):
+    """Time `CALLS` lookups + print the per-call cost"""
+    t = timeit.timeit(stmt, globals=globals(), number=CALLS)
+    print(f"{name:<28} {t:8.3f}s / {CALLS} calls | {t / CALLS * 1e9:7.1f} ns/call")
+    return t
+
+
+if __name__ == "__main__":
+    before = bench("legacy string hash", "legacy_get_chunk(3, -4)")
+    after = bench("World.get_chunk", "world.get_chunk(3, -4)")
+    fast = bench("World.get_chunk_from_key", "world.get_chunk_from_key((3, -4))")
+    bench("World.find_chunk", "world.find_chunk(3, -4)")
+    print(f"speedup: get_chunk {before / after:.2f}x | get_chunk_from_key {before / fast:.2f}x")
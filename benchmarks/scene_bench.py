@@ -0,0 +1,166 @@
+"""
+Scene benchmark
+- runs the scene/ECS stack headless (no window) for a number of frames
+- spawns sprites, static colliders, tiles and particles into a `scene.Scene`
+- reports frames/sec + per-phase / per-layer / per-aspect costs from the profiler
+
+run from the repository root:
+    python benchmarks/scene_bench.py --entities 2000 --colliders 500 --tiles 4096 --particles 5000
+    python benchmarks/scene_bench.py --json bench.json     # save results for tracking regressions
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import soragl as SORA
+
+SORA.initialize(
+    {
+        "window_size": [640, 360],
+        "framebuffer_size": [640, 360],
+        "debug": False,
+        "headless": True,
+    }
+)
+SORA.create_context()
+
+from soragl import scene, physics, base_objects, profiler
+
+TILE_SPRITE = "assets/sprites/shovel.png"
+
+# ------------------------------------------------------------ #
+# setup
+# ------------------------------------------------------------ #
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="SoraGL headless scene benchmark")
+    parser.add_argument("--entities", type=int, default=1000, help="moving sprites with colliders")
+    parser.add_argument("--colliders", type=int, default=200, help="static colliders")
+    parser.add_argument("--tiles", type=int, default=1024, help="tilemap tiles")
+    parser.add_argument("--particles", type=int, default=2000, help="live particles")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames")
+    parser.add_argument("--area", type=int, default=2048, help="spawn area size in pixels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=str, default=None, help="write results to a json file")
+    return parser.parse_args()
+
+
+def build_scene(args):
+    """Create a scene filled with entities, colliders, tiles + particles"""
+    random.seed(args.seed)
+    sc = scene.Scene(config=scene.configure_ecs())
+    world = sc.make_layer(sc.get_config(), 0, name="bench")
+    # cover the whole spawn area with active chunks
+    world.render_distance = args.area // world._options["chunkpixw"] + 1
+    world.set_center_chunk(0, 0)
+
+    world.add_aspect(base_objects.TileMap())
+    world.add_aspect(base_objects.SpriteRendererAspect())
+    world.add_aspect(base_objects.Collision2DAspect())
+
+    # tiles
+    tilemap = world.get_aspect(base_objects.TileMap)
+    tilemap.set_sprite_data(TILE_SPRITE, pygame.Rect(0, 0, 16, 16))
+    side = max(int(args.tiles ** 0.5), 1)
+    for i in range(args.tiles):
+        tilemap.add_tile_global(TILE_SPRITE, i % side - side // 2, i // side + 8)
+
+    sprite = SORA.make_surface(8, 8)
+    half = args.area // 2
+
+    # static colliders
+    for _ in range(args.colliders):
+        e = world.add_entity(physics.Entity())
+        e.position = (random.randint(-half, half), random.randint(-half, half))
+        e.area = (16, 16)
+        e.static = True
+        e.add_component(base_objects.Collision2DComponent())
+
+    # moving sprites
+    for _ in range(args.entities):
+        e = world.add_entity(physics.Entity())
+        e.position = (random.randint(-half, half), random.randint(-half, half))
+        e.area = (8, 8)
+        e.velocity = (random.uniform(-60, 60), random.uniform(-60, 60))
+        e.add_component(base_objects.Sprite(0, 0, sprite))
+        e.add_component(base_objects.SpriteRenderer())
+        e.add_component(base_objects.Collision2DComponent())
+
+    # particles -- long lived, so the live count stays fixed
+    if args.particles:
+        handler = world.add_entity(physics.ParticleHandler(args={"life": 1e9}, max_particles=args.particles))
+        handler.position = (0, 0)
+        handler.disable_particles()
+        handler.create_func(handler, args.particles, **handler.args)
+
+    scene.SceneHandler.push_scene(sc)
+    return sc
+
+
+# ------------------------------------------------------------ #
+# run
+# ------------------------------------------------------------ #
+
+
+def run_frame():
+    """Run one engine frame -- fixed delta for reproducible simulation"""
+    st = profiler.clock()
+    SORA.refresh_buffers((0, 0, 0, 255))
+    SORA.handle_pygame_events()
+    scene.SceneHandler.update()
+    SORA.push_framebuffer()
+    SORA.update_hardware()
+    SORA.DELTA = 1 / 60
+    return profiler.clock() - st
+
+
+def main():
+    args = parse_args()
+    build_scene(args)
+    SORA.DELTA = 1 / 60
+    for _ in range(args.warmup):
+        run_frame()
+
+    profiler.enable(capacity=args.frames)
+    profiler.reset()
+    total = 0
+    for _ in range(args.frames):
+        frame = run_frame()
+        profiler.record(profiler.PHASE, profiler.PHASE_FRAME, frame)
+        total += frame
+    profiler.disable()
+
+    fps = args.frames / total if total else 0.0
+    print(
+        f"entities={args.entities} colliders={args.colliders} tiles={args.tiles} "
+        f"particles={args.particles} frames={args.frames}"
+    )
+    print(f"fps: {fps:.1f} | mean frame: {total / args.frames * 1000:.3f} ms")
+    print(profiler.report())
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(
+                {
+                    "args": vars(args),
+                    "fps": fps,
+                    "timings": {
+                        f"{cat}/{name}": s for (cat, name), s in profiler.summary().items()
+                    },
+                },
+                file,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
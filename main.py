@@ -93,6 +93,9 @@ vattrib.add_attribute("2f", "vuv")
 vattrib.add_attribute("4f", "vcolor")
 # add attribs?
 vattrib.create_structure(vertices, indices)
+# frames are presented with `vattrib` below (not `ModernGL.render_frame`) -- keep sprites + particles in the framebuffer
+mgl.SpriteRenderer.ENABLED = False
+mgl.ParticleRenderer.ENABLED = False
 
 # ------------------------------ #
 # scripts imports
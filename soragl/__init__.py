@@ -1,9 +1,12 @@
 print("Thanks for using Sora Engine! v0.1")
 
+import os
 import pygame
 import time
 import sys
 
+from soragl import profiler
+
 
 _VERSION = "0.1.0"
 
@@ -57,6 +60,8 @@ def update_time():
     DELTA = END_TIME - START_TIME
     START_TIME = END_TIME
     ENGINE_UPTIME += DELTA
+    if profiler.ENABLED:
+        profiler.record(profiler.PHASE, profiler.PHASE_FRAME, DELTA)
     # update all clocks
     update_global_clocks()
 
@@ -156,12 +161,13 @@ FHSIZE = [FSIZE[0] // 2, FSIZE[1] // 2]
 FBITS = 32
 
 MODERNGL = False
+HEADLESS = False
 
 
 # setup engine
 def initialize(options: dict = {}) -> None:
     """Initialize Sora Engine with options"""
-    global FPS, WSIZE, WFLAGS, WBITS, FFLAGS, FSIZE, FHSIZE, FBITS, MODERNGL, DEBUG
+    global FPS, WSIZE, WFLAGS, WBITS, FFLAGS, FSIZE, FHSIZE, FBITS, MODERNGL, DEBUG, HEADLESS
     FPS = options["fps"] if "fps" in options else 60
     WSIZE = options["window_size"] if "window_size" in options else [1280, 720]
     WFLAGS = (
@@ -179,6 +185,12 @@ def initialize(options: dict = {}) -> None:
     FHSIZE = [FSIZE[0] // 2, FSIZE[1] // 2]
     FBITS = options["framebuffer_bits"] if "framebuffer_bits" in options else 32
     DEBUG = options["debug"] if "debug" in options else False
+    HEADLESS = options["headless"] if "headless" in options else False
+    # headless -- no window: dummy SDL drivers + off-screen framebuffer (no opengl)
+    if HEADLESS:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        WFLAGS &= ~pygame.OPENGL
     # add options as required!
     MODERNGL = is_flag_active(pygame.OPENGL)
     if MODERNGL:
@@ -225,16 +237,27 @@ def create_context():
 
 def push_framebuffer():
     """Pushes framebuffer to window."""
+    timed = profiler.ENABLED
+    if timed:
+        st = profiler.clock()
     if MODERNGL:
         # push frame buffer to moderngl window context
         mgl.ModernGL.pre_render()
         mgl.ModernGL.render_frame()
+        if timed:
+            ft = profiler.clock()
+            profiler.record(profiler.PHASE, profiler.PHASE_RENDER, ft - st)
         pygame.display.flip()
     else:
         # render frame buffer texture to window!
         WINDOW.blit(pygame.transform.scale(FRAMEBUFFER, WSIZE), (0, 0))
         WINDOW.blit(pygame.transform.scale(DEBUGBUFFER, WSIZE), (0, 0))
+        if timed:
+            ft = profiler.clock()
+            profiler.record(profiler.PHASE, profiler.PHASE_RENDER, ft - st)
         pygame.display.update()
+    if timed:
+        profiler.record(profiler.PHASE, profiler.PHASE_FLIP, profiler.clock() - ft)
 
 
 def refresh_buffers(color):
@@ -368,6 +391,9 @@ def is_key_clicked(key):
 def handle_pygame_events():
     """Handles pygame events."""
     global RUNNING
+    timed = profiler.ENABLED
+    if timed:
+        st = profiler.clock()
     for e in pygame.event.get():
         if e.type == pygame.QUIT:
             RUNNING = False
@@ -392,6 +418,8 @@ def handle_pygame_events():
         elif e.type == pygame.WINDOWRESIZED:
             # window resized
             update_window_resize(e)
+    if timed:
+        profiler.record(profiler.PHASE, profiler.PHASE_EVENTS, profiler.clock() - st)
 
 
 # ------------------------------------------------ #
@@ -405,10 +433,12 @@ FONTS = {}
 
 # textures
 def load_image(path):
-    """Loads image from file."""
+    """Loads image from file -- static: packed into the sprite atlas once"""
     if path in IMAGES:
         return IMAGES[path]
-    IMAGES[path] = pygame.image.load(path).convert_alpha()
+    from . import atlas
+
+    IMAGES[path] = atlas.register_static(pygame.image.load(path).convert_alpha())
     return IMAGES[path]
 
 
@@ -11,14 +11,15 @@ from pygame import transform as pgtrans
 import json
 import os
 
-from soragl import misc, smath
+from soragl import misc, smath, atlas
 
 # ------------------------------ #
 # frame data
 
 class FrameData:
     def __init__(self, frame: int, duration: float, order: int):
-        self.frame = frame
+        # frames never change -- cached + packed into the sprite atlas
+        self.frame = atlas.register_static(frame)
         self.duration = duration
         self.order = order
 
@@ -27,16 +28,16 @@ class FrameData:
         return self.frame
 
     def get_rotated_frame(self, angle: float):
-        """Get a rotated version of the frame"""
-        return pygame.transform.rotate(self.frame, angle)
+        """Get a rotated version of the frame -- cached"""
+        return atlas.get_transform_cache().get(self.frame, angle=angle)
 
     def get_scaled_frame(self, scale: float):
-        """Get a scaled version of the frame"""
-        return pygame.transform.scale(self.frame, scale)
+        """Get a scaled version of the frame -- cached"""
+        return atlas.get_transform_cache().get(self.frame, scale=scale)
 
     def get_rotated_scaled_frame(self, angle: float, scale: float):
-        """Get a rotated and scaled version of the frame"""
-        return pygame.transform.rotozoom(self.frame, angle, scale)
+        """Get a rotated and scaled version of the frame -- cached"""
+        return atlas.get_transform_cache().get(self.frame, scale=float(scale), angle=angle)
 
 # ------------------------------ #
 # spritesheet!
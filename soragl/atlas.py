@@ -0,0 +1,471 @@
+import soragl as SORA
+
+if SORA.DEBUG:
+    print("Activated atlas.py")
+
+import pygame
+from pygame import Rect as pgRect
+from pygame import transform as pgtrans
+
+import weakref
+from collections import OrderedDict
+
+"""
+1. static surfaces -- surfaces whose pixels never change (loaded images, animation frames)
+2. transformed surface cache -- flipped / scaled / rotated surfaces, LRU + memory bounded
+3. texture atlas -- static sprites + animation frames packed into large pages
+4. sprite batch -- all sprite draws of a frame sorted by (layer, page) + drawn at once
+"""
+
+# ------------------------------------------------------------ #
+# static surfaces
+# ------------------------------------------------------------ #
+
+STATIC = weakref.WeakSet()  # surfaces that can be cached + packed by identity
+
+
+def register_static(surface):
+    """Mark a surface as static -- its pixels are copied into the atlas once"""
+    STATIC.add(surface)
+    return surface
+
+
+def inherit_static(result, source):
+    """Mark a surface made from a static surface (scaled, flipped, ...) as static too"""
+    if source in STATIC:
+        STATIC.add(result)
+    return result
+
+
+def is_static(surface) -> bool:
+    """Check if a surface is static"""
+    return surface in STATIC
+
+
+def transform_surface(surface, flip: bool = False, scale=None, angle: float = 0.0):
+    """Flip, scale + rotate a surface -- scale: (width, height) size or a float zoom (rotozoom)"""
+    result = pgtrans.flip(surface, True, False) if flip else surface
+    if isinstance(scale, (int, float)):
+        return pgtrans.rotozoom(result, angle, scale)
+    if scale:
+        result = pgtrans.scale(result, scale)
+    if angle:
+        result = pgtrans.rotate(result, angle)
+    return result
+
+
+# ------------------------------------------------------------ #
+# transformed surface cache
+# ------------------------------------------------------------ #
+
+
+class TransformCache:
+    """
+    TransformCache
+    - LRU cache of transformed surfaces -- keyed by (surface, flip, scale, quantized angle)
+    - scale: (width, height) size or a float zoom (rotozoom)
+    - angles are snapped to `angle_step` degrees so nearby angles share one surface
+    - least recently used surfaces are dropped once `max_bytes` is exceeded
+    """
+
+    MAX_BYTES = 64 * 1024 * 1024
+    ANGLE_STEP = 1.0
+
+    def __init__(self, max_bytes: int = MAX_BYTES, angle_step: float = ANGLE_STEP):
+        """Create an empty cache"""
+        # private
+        self._surfaces = OrderedDict()  # key: surface
+
+        # public
+        self.max_bytes = max_bytes
+        self.angle_step = angle_step
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, angle: float) -> float:
+        """Snap an angle to the cache angle step -- in [0, 360)"""
+        if not angle:
+            return 0.0
+        return (round(angle / self.angle_step) * self.angle_step) % 360
+
+    def get(self, surface, flip: bool = False, scale=None, angle: float = 0.0):
+        """Get a transformed surface -- the source itself if nothing changes"""
+        angle = self.quantize(angle)
+        if type(scale) == list:
+            scale = tuple(scale)
+        if not (flip or scale or angle):
+            return surface
+        key = (surface, flip, scale, angle)
+        result = self._surfaces.get(key)
+        if result is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = inherit_static(transform_surface(surface, flip, scale, angle), surface)
+        self._surfaces[key] = result
+        self.bytes += self.get_size(result)
+        while self.bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, old = self._surfaces.popitem(last=False)
+            self.bytes -= self.get_size(old)
+            self.evictions += 1
+        return result
+
+    def get_size(self, surface) -> int:
+        """Get the pixel memory of a surface in bytes"""
+        return surface.get_pitch() * surface.get_height()
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the ratio of lookups served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> dict:
+        """Get the cache statistics"""
+        return {
+            "entries": len(self._surfaces),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def reset_stats(self):
+        """Reset the hit / miss / eviction counters"""
+        self.hits = self.misses = self.evictions = 0
+
+    def clear(self):
+        """Drop every cached surface"""
+        self._surfaces.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        """Get the number of cached surfaces"""
+        return len(self._surfaces)
+
+
+CACHE = None  # shared transform cache -- created on first use
+
+
+def get_transform_cache() -> TransformCache:
+    """Get the shared transform cache"""
+    global CACHE
+    if CACHE is None:
+        CACHE = TransformCache()
+    return CACHE
+
+
+# ------------------------------------------------------------ #
+# texture atlas
+# ------------------------------------------------------------ #
+
+
+class AtlasRegion:
+    """
+    AtlasRegion
+    - where a surface lives inside an atlas page
+    - surface: subsurface of the page (software blits)
+    - uv: (u0, v0, u1, v1) of the region in the page (gl sampling)
+    """
+
+    def __init__(self, page: "AtlasPage", rect: pgRect):
+        """Create a region"""
+        self.page = page
+        self.rect = rect
+        self.surface = page.surface.subsurface(rect)
+        w, h = page.surface.get_size()
+        self.uv = (rect.left / w, rect.top / h, rect.right / w, rect.bottom / h)
+        self.serial = -1  # atlas batch serial of the last pixel copy
+
+
+class AtlasPage:
+    """
+    AtlasPage
+    - one large surface filled with shelves (rows) of packed surfaces
+    - regions of dead surfaces are freed + reused by surfaces that fit in them
+    - dirty until its pixels have been uploaded to the gpu
+    """
+
+    def __init__(self, index: int, width: int, height: int):
+        """Create an empty page"""
+        # private
+        self._shelves = []  # [y, height, next x]
+        self._bottom = 0
+        self._free = []  # freed rects
+
+        # public
+        self.index = index
+        self.surface = pygame.Surface((width, height), pygame.SRCALPHA, 32)
+        self.dirty = True
+
+    def allocate(self, width: int, height: int, padding: int) -> pgRect:
+        """Find space for a surface -- None if the page is full"""
+        for i, free in enumerate(self._free):
+            if width <= free.w and height <= free.h:
+                del self._free[i]
+                return pgRect(free.x, free.y, width, height)
+        pw, ph = self.surface.get_size()
+        w, h = width + padding, height + padding
+        if w > pw or h > ph:
+            return None
+        # first shelf that is tall enough + has room left
+        for shelf in self._shelves:
+            if h <= shelf[1] and shelf[2] + w <= pw:
+                rect = pgRect(shelf[2], shelf[0], width, height)
+                shelf[2] += w
+                return rect
+        # open a new shelf
+        if self._bottom + h > ph:
+            return None
+        self._shelves.append([self._bottom, h, w])
+        rect = pgRect(0, self._bottom, width, height)
+        self._bottom += h
+        return rect
+
+    def free(self, rect: pgRect):
+        """Give the space of a dropped region back"""
+        self._free.append(rect)
+
+
+class TextureAtlas:
+    """
+    TextureAtlas
+    - packs surfaces into pages on first use -- keyed by (surface id, flip, scale, quantized angle)
+    - flipped / scaled / rotated variants come from the transform cache + are packed once
+    - surfaces are only weakly referenced -- their regions are freed once they are garbage collected
+    - live (non-static) surfaces are re-copied once per batch -- see `begin`
+    - once `max_pages` are full the atlas is reset + repacked lazily, never while a batch is open
+    - edited static surfaces must be re-copied with `update`
+    """
+
+    PAGE_SIZE = 1024
+    PADDING = 1
+    MAX_PAGES = 8
+
+    def __init__(self, page_size: int = PAGE_SIZE, padding: int = PADDING, max_pages: int = MAX_PAGES):
+        """Create an empty atlas"""
+        # private
+        self._regions = {}  # (surface id, flip, scale, angle): AtlasRegion
+        self._surfaces = {}  # surface id: (weakref, [region keys])
+        self._open = 0  # open batches
+        self._reset = False  # reset once the open batches are flushed
+
+        # public
+        self.page_size = page_size
+        self.padding = padding
+        self.max_pages = max_pages
+        self.pages = []
+        self.resets = 0
+        self.serial = 0  # bumped by every batch
+
+    def _copy(self, surface, region: AtlasRegion):
+        """Copy the pixels of a surface into its region"""
+        page = region.page.surface
+        page.fill((0, 0, 0, 0), region.rect)
+        if surface.get_flags() & pygame.SRCALPHA:
+            # exact copy -- alpha blending would darken translucent pixels
+            page.blit(surface, region.rect, special_flags=pygame.BLEND_RGBA_ADD)
+        else:
+            # keeps colorkeys transparent
+            page.blit(surface, region.rect)
+        region.page.dirty = True
+
+    def _allocate(self, width: int, height: int) -> tuple:
+        """Find space in a page -- opens new pages as required"""
+        for page in self.pages:
+            rect = page.allocate(width, height, self.padding)
+            if rect:
+                return page, rect
+        if len(self.pages) >= self.max_pages:
+            if self._open:
+                # queued draws still point at the pages -- grow for now, reset after the flush
+                self._reset = True
+            else:
+                self.clear()
+                self.resets += 1
+        # surfaces larger than a page get a page of their own
+        size = max(self.page_size, width + self.padding), max(self.page_size, height + self.padding)
+        page = AtlasPage(len(self.pages), *size)
+        self.pages.append(page)
+        return page, page.allocate(width, height, self.padding)
+
+    def _track(self, surface, key: tuple):
+        """Remember a region key of a surface -- dropped when the surface dies"""
+        sid = id(surface)
+        if sid not in self._surfaces:
+            self._surfaces[sid] = (weakref.ref(surface, lambda _, sid=sid: self._release(sid)), [])
+        self._surfaces[sid][1].append(key)
+
+    def _release(self, sid: int):
+        """Free the regions of a garbage collected surface"""
+        entry = self._surfaces.pop(sid, None)
+        if not entry:
+            return
+        for key in entry[1]:
+            region = self._regions.pop(key, None)
+            if region:
+                region.page.free(region.rect)
+
+    def begin(self):
+        """Open a batch -- live surfaces are re-copied once per batch + the atlas is not reset until `end`"""
+        self._open += 1
+        self.serial += 1
+
+    def end(self):
+        """Close a batch -- applies a reset that was held back"""
+        self._open = max(self._open - 1, 0)
+        if not self._open and self._reset:
+            self._reset = False
+            self.clear()
+            self.resets += 1
+
+    def get_region(
+        self, surface, flip: bool = False, scale: tuple = None, angle: float = 0.0, live: bool = False
+    ) -> AtlasRegion:
+        """
+        Get the region of a (flipped / scaled / rotated) surface -- packed on first use
+        - live: the surface pixels can change -- re-copied (+ transformed without caching) once per batch
+        """
+        if not (flip or scale or angle):
+            key = (id(surface), False, None, 0.0)
+        else:
+            key = (id(surface), flip, tuple(scale) if scale else None, get_transform_cache().quantize(angle))
+        region = self._regions.get(key)
+        if region and (not live or region.serial == self.serial):
+            return region
+        if live:
+            source = transform_surface(surface, *key[1:])
+        else:
+            source = get_transform_cache().get(surface, *key[1:])
+        if region is None:
+            page, rect = self._allocate(*source.get_size())
+            region = self._regions[key] = AtlasRegion(page, rect)
+            self._track(surface, key)
+        self._copy(source, region)
+        region.serial = self.serial
+        return region
+
+    def update(self, surface):
+        """Re-copy every packed variant of an edited surface"""
+        entry = self._surfaces.get(id(surface))
+        if not entry:
+            return
+        for key in entry[1]:
+            region = self._regions.get(key)
+            if region:
+                self._copy(transform_surface(surface, *key[1:]), region)
+
+    def clear(self):
+        """Drop all pages + regions"""
+        self._regions.clear()
+        self._surfaces.clear()
+        self.pages.clear()
+
+    def __len__(self):
+        """Get the number of packed regions"""
+        return len(self._regions)
+
+
+# ------------------------------------------------------------ #
+# sprite batch
+# ------------------------------------------------------------ #
+
+ATLAS = None  # shared atlas -- created on first use
+
+
+def get_atlas() -> TextureAtlas:
+    """Get the shared texture atlas"""
+    global ATLAS
+    if ATLAS is None:
+        ATLAS = TextureAtlas()
+    return ATLAS
+
+
+class SpriteBatch:
+    """
+    SpriteBatch
+    - collects every sprite draw of a frame -- `begin(target)`, `draw`, `flush`
+    - draws are sorted by (layer, atlas page) then drawn at once
+        - software: one `fblits` call -- static surfaces as atlas subsurfaces, others as they are
+        - moderngl: one instanced draw per atlas page (`mgl.SpriteRenderer`, opt-in)
+    """
+
+    def __init__(self, atlas: TextureAtlas = None):
+        """Create a sprite batch"""
+        # private
+        self._draws = []  # (layer, page index, surface, x, y, w, h, flip, region)
+        self._gpu = False
+        self._atlas = None  # atlas held open by the current batch
+
+        # public
+        self.atlas = atlas
+        self.target = None
+        self.drawn = 0  # sprites drawn in the last flush
+
+    def begin(self, target=None):
+        """Start a new batch for a target surface -- the framebuffer by default"""
+        self._draws.clear()
+        self.target = target or SORA.FRAMEBUFFER
+        self._gpu = SORA.MODERNGL and SORA.mgl.SpriteRenderer.ENABLED and self.target is SORA.FRAMEBUFFER
+        if self._atlas is not None:
+            self._atlas.end()
+        self._atlas = self.atlas if self.atlas is not None else get_atlas()
+        self._atlas.begin()
+
+    def draw(
+        self, surface, position, layer: int = 0, flip: bool = False, scale: tuple = None, angle: float = 0.0
+    ):
+        """Queue a surface to be drawn with its topleft at position -- rotated around its center"""
+        atlas = self._atlas
+        if atlas is None:
+            atlas = self.atlas if self.atlas is not None else get_atlas()
+        x, y = position
+        live = surface not in STATIC
+        if live and not self._gpu:
+            # pixels can change -- drawn as they are now, never cached
+            image = transform_surface(surface, flip, scale, angle)
+            w, h = image.get_size()
+            if angle:
+                sw, sh = scale or surface.get_size()
+                x, y = x - (w - sw) / 2, y - (h - sh) / 2
+            self._draws.append((layer, -1, image, x, y, w, h, False, None))
+            return
+        if self._gpu and not angle:
+            # the gpu flips + scales while sampling -- only the source is packed
+            region = atlas.get_region(surface, live=live)
+            w, h = scale or surface.get_size()
+        else:
+            region = atlas.get_region(surface, flip, scale, angle, live=live)
+            w, h = region.rect.size
+            flip = False
+            if angle:
+                # rotated surfaces grow -- keep the center in place
+                sw, sh = scale or surface.get_size()
+                x, y = x - (w - sw) / 2, y - (h - sh) / 2
+        self._draws.append((layer, region.page.index, region.surface, x, y, w, h, flip, region))
+
+    def flush(self):
+        """Draw every queued sprite -- sorted by layer then atlas page"""
+        target = self.target or SORA.FRAMEBUFFER
+        draws = self._draws
+        draws.sort(key=lambda d: (d[0], d[1]))
+        self.drawn = len(draws)
+        if self._gpu:
+            SORA.mgl.SpriteRenderer.submit(draws)
+        elif hasattr(target, "fblits"):
+            target.fblits([(d[2], (d[3], d[4])) for d in draws])
+        else:
+            target.blits([(d[2], (d[3], d[4])) for d in draws], False)
+        draws.clear()
+        # the atlas can be reset again
+        if self._atlas is not None:
+            self._atlas.end()
+            self._atlas = None
+
+    def __len__(self):
+        """Get the number of queued draws"""
+        return len(self._draws)
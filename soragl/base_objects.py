@@ -1,11 +1,12 @@
 import soragl as SORA
-from soragl import scene, physics, mgl, animation, smath, signal
+from soragl import scene, physics, mgl, animation, smath, signal, atlas
 
 import random
 import math
 import glm
 import numpy as np
 
+import pygame
 from pygame import Rect as pgRect
 from pygame import math as pgmath
 from pygame import draw as pgdraw
@@ -60,7 +61,7 @@ class Sprite(scene.Component):
             self.width, self.height = self._sprite.get_size()
         else:
             self._sprite = (
-                SORA.scale_image(sprite, (width, height))
+                atlas.inherit_static(SORA.scale_image(sprite, (width, height)), sprite)
                 if sprite is not None
                 else SORA.make_surface(width, height)
             )
@@ -69,6 +70,10 @@ class Sprite(scene.Component):
         # print(self.width, self.height, self._sprite)
         # scaling size
         self.scale_size = scale_size
+        # draw order within the world -- higher is drawn later
+        self.layer = 0
+        # rotation around the center (degrees) -- quantized by the transform cache
+        self.angle = 0.0
 
         # flipping
         self._flip = False
@@ -90,8 +95,8 @@ class Sprite(scene.Component):
 
     @sprite.setter
     def sprite(self, new):
-        """Set a new sprite"""
-        self._sprite = SORA.scale_image(new, (self.width, self.height))
+        """Set a new sprite -- static if the new sprite is (see `atlas.register_static`)"""
+        self._sprite = atlas.inherit_static(SORA.scale_image(new, (self.width, self.height)), new)
 
     @property
     def area(self):
@@ -155,59 +160,93 @@ class SpriteRenderer(scene.Component):
         # print(self._sprite)
 
 
+def get_viewport(world) -> pgRect:
+    """Get the visible world rect -- the Camera2D viewport, else the framebuffer at the global offset"""
+    camera = world._dev.get(Camera2D.WORLD_KEY)
+    if camera:
+        return camera.viewport
+    return pgRect(SORA.iOFFSET[0], SORA.iOFFSET[1], SORA.FSIZE[0], SORA.FSIZE[1])
+
+
 class SpriteRendererAspect(scene.Aspect):
     def __init__(self):
         super().__init__(SpriteRenderer)
         self.priority = 0
+        self.declare_access(
+            reads=[SpriteRenderer, Sprite, AnimatedSprite, scene.RES_TRANSFORMS, scene.RES_CAMERA],
+            writes=[scene.RES_FRAMEBUFFER],
+        )
+        # all sprites are packed in the atlas + drawn in one batch
+        self.batch = atlas.SpriteBatch()
+        # sprites drawn / skipped outside the viewport in the last frame
+        self.drawn = 0
+        self.culled = 0
+
+    def get_stats(self) -> dict:
+        """Get the drawn / culled sprite counts of the last frame"""
+        return {"drawn": self.drawn, "culled": self.culled}
 
     def handle(self):
         """Render the sprites"""
-        for e in self.iterate_entities():
+        batch = self.batch
+        batch.begin(SORA.FRAMEBUFFER)
+        ox, oy = SORA.OFFSET
+        view = get_viewport(self._world)
+        vl, vt, vr, vb = view.left, view.top, view.right, view.bottom
+        culled = 0
+        for e, c_renderer in self.iterate_components():
             # get the sprite
-            # print(e._components)
-            c_sprite = e.get_component(SpriteRenderer)._sprite
-            if not c_sprite.sprite:
+            c_sprite = c_renderer._sprite
+            sprite = c_sprite.sprite
+            if not sprite:
                 continue
-            # get sprite
-            _sprite = c_sprite.sprite if not c_sprite.flip else pgtrans.flip(
-                c_sprite.sprite, True, False
-            )
-            # render the sprite
-            if c_sprite.scale_size:
-                SORA.FRAMEBUFFER.blit(
-                    pgtrans.scale(_sprite, c_sprite.scale_size),
-                    e.position - (c_sprite.hwidth, c_sprite.hheight) - SORA.OFFSET,
-                )
+            pos = e.render_position
+            x, y = pos.x - c_sprite.hwidth, pos.y - c_sprite.hheight
+            w, h = c_sprite.scale_size or sprite.get_size()
+            # rotated sprites can reach up to their diagonal
+            m = math.hypot(w, h) / 2 if c_sprite.angle else 0
+            if x - m >= vr or y - m >= vb or x + w + m <= vl or y + h + m <= vt:
+                culled += 1
                 continue
-            SORA.FRAMEBUFFER.blit(
-                _sprite, e.position - (c_sprite.hwidth, c_sprite.hheight) - SORA.OFFSET
+            batch.draw(
+                sprite,
+                (x - ox, y - oy),
+                c_sprite.layer,
+                c_sprite.flip,
+                c_sprite.scale_size,
+                c_sprite.angle,
             )
-            # print(pos - (c_sprite.hwidth, c_sprite.hheight) - SORA.OFFSET)
+        self.drawn, self.culled = len(batch), culled
+        batch.flush()
 
 
 class SpriteRendererAspectDebug(scene.Aspect):
     def __init__(self):
         super().__init__(SpriteRenderer)
         self.priority = 0
+        self.declare_access(
+            reads=[SpriteRenderer, Sprite, AnimatedSprite, scene.RES_TRANSFORMS, scene.RES_CAMERA],
+            writes=[scene.RES_FRAMEBUFFER, scene.RES_DEBUGBUFFER],
+        )
 
     def handle(self):
         """Render the sprites"""
-        for e in self.iterate_entities():
+        for e, c_renderer in self.iterate_components():
             # get the sprite
-            c_sprite = e.get_component(SpriteRenderer)._sprite
+            c_sprite = c_renderer._sprite
             # print(c_sprite)
             if not c_sprite or not c_sprite.sprite:
                 continue
             # print(c_sprite)
             # render the sprite
             SORA.FRAMEBUFFER.blit(
-                c_sprite.sprite, e.position - (c_sprite.hwidth, c_sprite.hheight) - SORA.OFFSET
+                c_sprite.sprite, e.render_position - (c_sprite.hwidth, c_sprite.hheight) - SORA.OFFSET
             )
             pgdraw.rect(
                 SORA.DEBUGBUFFER,
                 (0, 0, 255),
                 pgRect(
-                    e.position - (c_sprite.hwidth, c_sprite.hheight) - SORA.iOFFSET,
+                    e.render_position - (c_sprite.hwidth, c_sprite.hheight) - SORA.iOFFSET,
                     c_sprite.sprite.get_size(),
                 ),
                 1,
@@ -217,6 +256,26 @@ class SpriteRendererAspectDebug(scene.Aspect):
 # ------------------------------ #
 # area2d
 
+def diff_sorted(old: list, new: list) -> tuple:
+    """Diff two sorted lists -- (entered, stayed, exited)"""
+    entered, stayed, exited = [], [], []
+    i = j = 0
+    while i < len(old) and j < len(new):
+        if old[i] == new[j]:
+            stayed.append(new[j])
+            i += 1
+            j += 1
+        elif old[i] < new[j]:
+            exited.append(old[i])
+            i += 1
+        else:
+            entered.append(new[j])
+            j += 1
+    exited.extend(old[i:])
+    entered.extend(new[j:])
+    return entered, stayed, exited
+
+
 class Area2D(scene.Component):
     def __init__(self, width: int, height: int):
         super().__init__()
@@ -225,6 +284,9 @@ class Area2D(scene.Component):
         self.exit_signal_register = signal.SignalRegister("Area2D-exit")
         # conditional for (if already has Collision2DComponent)
         self._collision2D = False
+        # overlapping colliders -- sorted entity handles + handle: entity
+        self.overlaps = []
+        self._overlap_entities = {}
 
     def on_add(self):
         """On add"""
@@ -243,7 +305,9 @@ class Area2DAspect(scene.Aspect):
         # since we want to use updated positions of entities in world -- for area2D detection
         self.priority = 18
         self.a_collision2D = None
-        self.overlapped = set()
+        self.declare_access(
+            reads=[Collision2DComponent], writes=[Area2D, scene.RES_TRANSFORMS]
+        )
 
     def on_add(self):
         """On add"""
@@ -258,52 +322,87 @@ class Area2DAspect(scene.Aspect):
 
     def handle(self):
         """Handle area2Ds"""
-        for entity in self.iterate_entities():
-            if not entity.get_component(Area2D)._collision2D:
+        broadphase = self.a_collision2D._dynamic_broadphase
+        for entity, area in self.iterate_components():
+            if not area._collision2D:
                 # move entity around
                 entity.position += entity.velocity
                 entity.rect.center = entity.position
-            # check for collision with each of the active collision2D components
-            for other in self.a_collision2D.iterate_entities():
-                # rect collision between entities
-                if other.static:
-                    continue
-                if other.rect.colliderect(entity.rect):
-                    # raise a signal?
-                    if id(other) in self.overlapped:
-                        entity.get_component(
-                            Area2D
-                        ).overlap_signal_register.emit_signal(other)
-                    else:
-                        entity.get_component(Area2D).enter_signal_register.emit_signal(
-                            other
-                        )
-                        self.overlapped.add(id(other))
-                    # print(f"signal: {SORA.ENGINE_UPTIME:.2f}", entity)
-                elif id(other) in self.overlapped:
-                    entity.get_component(Area2D).exit_signal_register.emit_signal(other)
-                    self.overlapped.remove(id(other))
-
-
-# TODO:
-# add in - circle + polygon
+            # only moving colliders in the cells of the area are candidates
+            rect = entity.rect
+            current = {}
+            for other in broadphase.query(rect):
+                if other is not entity and other.rect.colliderect(rect):
+                    current[other.handle] = other
+            overlaps = sorted(current)
+            entered, stayed, exited = diff_sorted(area.overlaps, overlaps)
+            # one queued emission per signal
+            area.enter_signal_register.emit_batch(
+                [{"area": entity, "other": current[h]} for h in entered]
+            )
+            area.overlap_signal_register.emit_batch(
+                [{"area": entity, "other": current[h]} for h in stayed]
+            )
+            area.exit_signal_register.emit_batch(
+                [{"area": entity, "other": area._overlap_entities[h]} for h in exited]
+            )
+            area.overlaps = overlaps
+            area._overlap_entities = current
 
 # ------------------------------ #
 # collision2d
 
 
 class Collision2DComponent(scene.Component):
+    # box colliders are swept against other boxes -- shaped colliders use the narrowphase
+    SWEPT = True
+
     def __init__(self, offset: list = None):
-        super().__init__()
+        # every collider shares one slot -- the aspect + `get_component(Collision2DComponent)` find them all
+        super().__init__(loaded_hash=hash(Collision2DComponent))
         # private
         self._offset = pgmath.Vector2(offset) if offset else pgmath.Vector2(0, 0)
         self._rect = None
         self.signal_register = signal.SignalRegister("Collision2D")
+        # public
+        self.shape = None  # `physics` shape -- None for the entity rect
+        # contacts from the last physics step -- (other, time of impact, normal)
+        self.contacts = []
+        # resting bodies sleep -- skipped by the aspect until woken
+        self.sleeping = False
+        self.rest_steps = 0
+        self._rest_state = None  # (x, y, static) when put to sleep
 
     def on_add(self):
         """On add"""
         self._rect = self._entity.rect
-        self._rect.center = self._entity.position.xy
+        self.get_shape()
+
+    def sleep(self):
+        """Put the body to sleep"""
+        self.sleeping = True
+        self._rest_state = (self._entity._position.x, self._entity._position.y, self._entity.static)
+
+    def wake(self):
+        """Wake the body up"""
+        self.sleeping = False
+        self.rest_steps = 0
+
+    def should_wake(self) -> bool:
+        """Check if a sleeping body was moved, pushed or changed"""
+        e = self._entity
+        return bool(e.velocity.x or e.velocity.y) or self._rest_state != (
+            e._position.x,
+            e._position.y,
+            e.static,
+        )
+
+    def on_remove(self):
+        """On remove"""
+        # drop the entity from the broadphase
+        aspect = self._entity.world.get_aspect(Collision2DAspect)
+        if aspect:
+            aspect.remove_from_broadphase(self._entity)
 
     def get_relative_position(self):
         """Get the relative position"""
@@ -313,33 +412,93 @@ class Collision2DComponent(scene.Component):
         """Get the offset"""
         return self._offset
 
+    def get_shape(self):
+        """Get the world collision shape -- keeps the entity rect on its bounds for the broadphase"""
+        if self.shape is None:
+            self._rect.center = self._entity._position.xy
+            return self._rect
+        self.shape.transform(
+            self._entity._position.x + self._offset.x,
+            self._entity._position.y + self._offset.y,
+        )
+        l, t, r, b = self.shape.aabb
+        size = (math.ceil(r - l), math.ceil(b - t))
+        if size != self._rect.size:
+            self._entity.area = size
+        self._rect.center = ((l + r) / 2, (t + b) / 2)
+        return self.shape
+
     def get_vertices(self):
         """Iterator for vertices"""
+        if self.shape is not None:
+            return [pgmath.Vector2(v) for v in self.get_shape().get_vertices().tolist()]
+        rect = self._rect
         return [
-            self._entity.position
-            + self._entity._rect.topleft
-            - self._entity._rect.center,
-            self._entity.position
-            + self._entity._rect.topright
-            - self._entity._rect.center,
-            self._entity.position
-            + self._entity._rect.bottomright
-            - self._entity._rect.center,
-            self._entity.position
-            + self._entity._rect.bottomleft
-            - self._entity._rect.center,
+            self._entity.position + rect.topleft - rect.center,
+            self._entity.position + rect.topright - rect.center,
+            self._entity.position + rect.bottomright - rect.center,
+            self._entity.position + rect.bottomleft - rect.center,
         ]
 
 
+# ------------------------------ #
+# shaped colliders
+# - all share the `Collision2DComponent` slot -- one collider per entity, adding another replaces it
+# - `get_component(Collision2DComponent)` finds any collider, `get_component(CircleCollider2D)` only a circle
+
+
+class CircleCollider2D(Collision2DComponent):
+    SWEPT = False
+
+    def __init__(self, radius: float, offset: list = None):
+        super().__init__(offset)
+        self.shape = physics.Circle(radius)
+
+
+class CapsuleCollider2D(Collision2DComponent):
+    SWEPT = False
+
+    def __init__(self, length: float, radius: float, angle: float = 0.0, offset: list = None):
+        super().__init__(offset)
+        self.shape = physics.Capsule(length, radius, angle)
+
+
+class PolygonCollider2D(Collision2DComponent):
+    SWEPT = False
+
+    def __init__(self, vertices: list, angle: float = 0.0, offset: list = None):
+        super().__init__(offset)
+        self.shape = physics.ConvexPolygon(vertices, angle)
+
+
 class Collision2DAspect(scene.Aspect):
+    # max swept moves per step -- one per blocked axis + the final slide
+    MAX_ITERATIONS = 3
+    # physics steps at rest before a body goes to sleep
+    SLEEP_STEPS = 30
+
     def __init__(self):
         super().__init__(Collision2DComponent)
         self.priority = 19
+        self.fixed_step = True
+        self.declare_access(
+            reads=[TileMap.CHUNK_KEY],
+            writes=[Collision2DComponent, scene.RES_TRANSFORMS, scene.RES_CHUNKS],
+        )
         # private
         self._handler_aspect = (
             None  # to be set after in 'on_add' of the collision2dhandleraspect
         )
         self._tile_map = None
+        # broadphase -- static colliders are only tested against movers in nearby cells
+        self._static_broadphase = None
+        self._dynamic_broadphase = None
+        # static colliders with a non box shape -- resolved in the narrowphase
+        self._shaped_statics = set()
+
+        # public
+        self.awake_count = 0
+        self.sleeping_count = 0
 
     def on_add(self):
         """On add"""
@@ -347,44 +506,99 @@ class Collision2DAspect(scene.Aspect):
         if not self._tile_map:
             self._tile_map = self._world.get_aspect(TileMapDebug)
         # if not exist then oh well lmao
-
-    def handle_movement(self, entity):
+        # broadphase cells -- default to the chunk size
+        cw = self._world._options.get("cellpixw") or self._world._options["chunkpixw"]
+        ch = self._world._options.get("cellpixh") or self._world._options["chunkpixh"]
+        self._static_broadphase = physics.SpatialHash(cw, ch)
+        self._dynamic_broadphase = physics.SpatialHash(cw, ch)
+        # answer the world raycasts + shape queries
+        self._world._dev[scene.DEV_QUERIES] = self
+
+    # === broadphase
+    def update_broadphase(self, entity, comp: Collision2DComponent = None):
+        """Update the cells an entity occupies in the broadphase"""
+        if entity.static:
+            comp = comp or entity.get_component(Collision2DComponent)
+            if comp.SWEPT:
+                self._shaped_statics.discard(entity)
+            else:
+                self._shaped_statics.add(entity)
+            self._dynamic_broadphase.remove(entity)
+            self._static_broadphase.update(entity, entity.rect)
+        else:
+            self._shaped_statics.discard(entity)
+            self._static_broadphase.remove(entity)
+            self._dynamic_broadphase.update(entity, entity.rect)
+
+    def remove_from_broadphase(self, entity):
+        """Remove an entity from the broadphase"""
+        self._static_broadphase.remove(entity)
+        self._dynamic_broadphase.remove(entity)
+        self._shaped_statics.discard(entity)
+
+    def get_collider_shape(self, col):
+        """Get the collision shape of a collider or tile"""
+        if col in self._shaped_statics:
+            return col.get_component(Collision2DComponent).get_shape()
+        if not col.static:
+            comp = col.get_component(Collision2DComponent)
+            if comp and comp.shape is not None:
+                return comp.get_shape()
+        return col.rect
+
+    def handle_movement(self, entity, comp: Collision2DComponent = None):
         """Handle the movement of the entity"""
         """
-        move in x
-        move in y
-        check col both -- resolve col in both
-        check surroundings chunks for entities + static objects
-        - perform colsion check !!
+        sweep the entity box along its velocity
+        - stop at the earliest time of impact against nearby colliders
+        - slide the rest of the move along the contact
+        - repeat for the remaining move
+        shaped colliders (circle, capsule, polygon) move directly
+        - then get pushed out of overlaps by the narrowphase
 
         update rect pos
         update chunk pos
         """
-        # x movement
-        entity._position.x += entity.velocity.x * SORA.DELTA
-        entity.rect.center = entity._position.xy
-        # check for x collisions
-        for col in self.iterate_collisions(entity.rect):
-            # print(col.rect)
-            if entity.velocity.x > 0:
-                entity._position.x -= entity.rect.right - col.rect.left
-            elif entity.velocity.x < 0:
-                entity._position.x += col.rect.right - entity.rect.left
-            # update rect
-            entity.rect.center = entity._position.xy
-        # y movement
-        entity._position.y += entity.velocity.y * SORA.DELTA
-        entity.rect.center = entity._position.xy
-        # check for y collisoins
-        for col in self.iterate_collisions(entity.rect):
-            if entity.velocity.y > 0:
-                entity._position.y -= entity.rect.bottom - col.rect.top
-            elif entity.velocity.y < 0:
-                entity._position.y += col.rect.bottom - entity.rect.top
-            # update rect
-            entity.rect.center = entity._position.xy
+        dt = self.delta
+        entity.store_previous_position()
+        dx = entity.velocity.x * dt
+        dy = entity.velocity.y * dt
+        comp = comp or entity.get_component(Collision2DComponent)
+        comp.contacts.clear()
+        overlapping = False
+        if (dx or dy) and not comp.SWEPT:
+            entity._position.x += dx
+            entity._position.y += dy
+        elif dx or dy:
+            hw, hh = entity.rect.w / 2, entity.rect.h / 2
+            for _ in range(self.MAX_ITERATIONS):
+                x, y = entity._position.x, entity._position.y
+                box = (x - hw, y - hh, x + hw, y + hh)
+                hit, overlap = self.sweep(box, dx, dy)
+                overlapping = overlapping or overlap
+                if not hit:
+                    entity._position.x = x + dx
+                    entity._position.y = y + dy
+                    break
+                col, t, nx, ny = hit
+                entity._position.x = x + dx * t
+                entity._position.y = y + dy * t
+                comp.contacts.append((col, t, (nx, ny)))
+                # slide -- drop the rest of the move along the normal
+                dx, dy = dx * (1 - t), dy * (1 - t)
+                if nx:
+                    dx = 0
+                if ny:
+                    dy = 0
+                if not (dx or dy):
+                    break
+        if entity.velocity.x or entity.velocity.y:
+            self.resolve_overlaps(entity, comp, overlapping)
         # update rect once more
-        entity.rect.center = entity._position.xy
+        if comp.shape is None:
+            entity.rect.center = entity._position.xy
+        else:
+            comp.get_shape()
 
         # update chunk position -- if moved to new chunk
         nchunk = [
@@ -394,10 +608,194 @@ class Collision2DAspect(scene.Aspect):
         if nchunk != entity.c_chunk:
             self._world.update_entity_chunk(entity, entity.c_chunk, nchunk)
 
+    def sweep(self, box: tuple, dx: float, dy: float) -> tuple:
+        """
+        Get the earliest contact of a moving box
+        - returns ((collider, time, normal x, normal y) or None, if the box started inside a collider)
+        """
+        best = None
+        overlapping = False
+        for col in self.iterate_collisions(physics.get_swept_rect(box, dx, dy)):
+            if col in self._shaped_statics:
+                continue
+            hit = physics.sweep_aabb(box, dx, dy, col.rect)
+            if hit:
+                if best is None or hit[0] < best[1]:
+                    best = (col, hit[0], hit[1], hit[2])
+            elif not overlapping and physics.overlap_aabb(box, col.rect):
+                overlapping = True
+        return best, overlapping
+
+    def resolve_box_overlaps(self, entity, comp: Collision2DComponent):
+        """Push a box out of the static rects + tiles it overlaps -- deepest contact first"""
+        hw, hh = entity.rect.w / 2, entity.rect.h / 2
+        for _ in range(self.MAX_ITERATIONS):
+            x, y = entity._position.x, entity._position.y
+            box = (x - hw, y - hh, x + hw, y + hh)
+            best = None
+            for col in self.iterate_collisions(physics.get_swept_rect(box, 0, 0)):
+                if col in self._shaped_statics:
+                    continue
+                hit = physics.overlap_aabb(box, col.rect)
+                if hit and (best is None or hit[2] > best[3]):
+                    best = (col,) + hit
+            if not best:
+                return
+            col, nx, ny, depth = best
+            entity._position.x += nx * depth
+            entity._position.y += ny * depth
+            comp.contacts.append((col, 1.0, (nx, ny)))
+
+    def resolve_overlaps(self, entity, comp: Collision2DComponent, boxes: bool = True):
+        """Push a collider out of the shapes it overlaps -- deepest contact first"""
+        if comp.SWEPT:
+            # the sweep skips pairs that already overlap -- spawned or pushed inside
+            if boxes:
+                self.resolve_box_overlaps(entity, comp)
+            if not self._shaped_statics:
+                return
+        for _ in range(self.MAX_ITERATIONS):
+            shape = comp.get_shape()
+            best = None
+            for col in self.iterate_collisions(entity.rect):
+                if comp.SWEPT and col not in self._shaped_statics:
+                    continue
+                hit = physics.collide(shape, self.get_collider_shape(col))
+                if hit and (best is None or hit[2] > best[3]):
+                    best = (col,) + hit
+            if not best:
+                return
+            col, nx, ny, depth = best
+            entity._position.x += nx * depth
+            entity._position.y += ny * depth
+            comp.contacts.append((col, 1.0, (nx, ny)))
+
+    # === queries
+    def _iterate_ray_cells(self, ox: float, oy: float, dx: float, dy: float, distance: float):
+        """Iterate the broadphase + tile grids along a ray -- one ordered (collider, cell entry distance) iterator per grid"""
+        seen = set()
+        for broadphase in (self._static_broadphase, self._dynamic_broadphase):
+            yield (
+                (entity, t)
+                for cx, cy, t in physics.iterate_grid_ray(ox, oy, dx, dy, distance, broadphase.cellw, broadphase.cellh)
+                for entity in broadphase.get_cell(cx, cy)
+                if entity not in seen and not seen.add(entity)
+            )
+        if self._tile_map:
+            tw, th = self._tile_map._tsize
+            yield (
+                (tile, t)
+                for tx, ty, t in physics.iterate_grid_ray(ox, oy, dx, dy, distance, tw, th)
+                for tile in (self._tile_map.get_tile(tx, ty),)
+                if tile
+            )
+
+    def raycast(self, origin, direction, distance: float, first: bool = False, ignore=None) -> list:
+        """Cast a ray through the broadphase cells + tile grid -- [(collider, distance, normal)] sorted by distance"""
+        ox, oy = origin
+        length = math.hypot(direction[0], direction[1])
+        if not length:
+            return []
+        dx, dy = direction[0] / length, direction[1] / length
+        ignore = ignore if isinstance(ignore, (set, frozenset, list, tuple)) else (ignore,)
+        hits = []
+        nearest = distance
+        for cells in self._iterate_ray_cells(ox, oy, dx, dy, distance):
+            for col, entry in cells:
+                # cells are visited in order -- nothing further can beat the nearest hit
+                if first and entry > nearest:
+                    break
+                if col in ignore:
+                    continue
+                hit = physics.raycast_shape(self.get_collider_shape(col), ox, oy, dx, dy, distance)
+                if hit:
+                    hits.append((col, hit[0], (hit[1], hit[2])))
+                    nearest = min(nearest, hit[0])
+        hits.sort(key=lambda h: h[1])
+        return hits[:1] if first else hits
+
+    def segment_cast(self, start, end, first: bool = False, ignore=None) -> list:
+        """Cast a segment -- [(collider, distance, normal)] sorted by distance"""
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        return self.raycast(start, (dx, dy), math.hypot(dx, dy), first, ignore)
+
+    def query_point(self, point, ignore=None) -> list:
+        """Get the colliders + tiles containing a point"""
+        probe = physics.Circle(0)
+        probe.transform(point[0], point[1])
+        return self.query_shape(probe, pgRect(int(point[0]), int(point[1]), 1, 1), ignore)
+
+    def query_rect(self, rect, ignore=None) -> list:
+        """Get the colliders + tiles overlapping a rect -- sorted by distance to its center"""
+        rect = pgRect(rect)
+        return self.query_shape(rect, rect, ignore)
+
+    def query_shape(self, shape, bounds, ignore=None) -> list:
+        """Get the colliders + tiles overlapping a shape (inside bounds) -- sorted by distance to the bounds center"""
+        ignore = ignore if isinstance(ignore, (set, frozenset, list, tuple)) else (ignore,)
+        candidates = self._static_broadphase.query(bounds) | self._dynamic_broadphase.query(bounds)
+        if self._tile_map:
+            candidates.update(self._tile_map.iterate_tiles_in_rect(bounds))
+        cx, cy = bounds.center
+        hits = []
+        for col in candidates:
+            if col in ignore:
+                continue
+            other = self.get_collider_shape(col)
+            if physics.collide(shape, other):
+                r = col.rect
+                hits.append(((r.centerx - cx) ** 2 + (r.centery - cy) ** 2, id(col), col))
+        hits.sort(key=lambda h: h[:2])
+        return [h[2] for h in hits]
+
+    # === sleeping
+    def wake_touching(self, entity):
+        """Wake the sleeping dynamic bodies a moving body overlaps or touches"""
+        rect = entity.rect.inflate(2, 2)
+        for other in self._dynamic_broadphase.query(rect):
+            if other is entity or not rect.colliderect(other.rect):
+                continue
+            comp = other.get_component(Collision2DComponent)
+            if comp and comp.sleeping:
+                comp.wake()
+
+    def update_rest(self, entity, comp: Collision2DComponent):
+        """Count the steps a body spent at rest + wake the bodies it touched"""
+        for col, _, _ in comp.contacts:
+            if isinstance(col, physics.Entity):
+                other = col.get_component(Collision2DComponent)
+                if other and other.sleeping:
+                    other.wake()
+        if entity.velocity.x or entity.velocity.y:
+            comp.rest_steps = 0
+            # dynamic bodies are not contacts -- only look for sleepers if there were any last step
+            if self.sleeping_count:
+                self.wake_touching(entity)
+            return
+        comp.rest_steps += 1
+        if comp.rest_steps >= self.SLEEP_STEPS:
+            comp.sleep()
+
+    def handle_body(self, entity, comp: Collision2DComponent) -> bool:
+        """Step one body -- False if it is asleep"""
+        if comp.sleeping:
+            if not comp.should_wake():
+                return False
+            comp.wake()
+        self.handle_movement(entity, comp)
+        self.update_broadphase(entity, comp)
+        self.update_rest(entity, comp)
+        return True
+
+    def get_stats(self) -> dict:
+        """Get the awake / sleeping body counts of the last step"""
+        return {"awake": self.awake_count, "sleeping": self.sleeping_count}
+
     def iterate_collisions(self, rect):
         """Detect all collisions that occur with a certain rect"""
-        for entity in self.iterate_entities():
-            if id(entity.rect) == id(rect) or not entity.static:
+        # only static colliders in nearby cells are candidates
+        for entity in self._static_broadphase.query(rect):
+            if entity.rect is rect:
                 continue
             # check collision
             if rect.colliderect(entity.rect):
@@ -405,31 +803,51 @@ class Collision2DAspect(scene.Aspect):
         # iterate if there are tilemap
         if not self._tile_map:
             return
-        for item in self._tile_map.iterate_active_tiles():
-            # print(item)
-            if item.rect.colliderect(entity.rect):
+        for item in self._tile_map.iterate_tiles_in_rect(rect):
+            if item.rect.colliderect(rect):
                 yield item
 
     def handle(self):
         """Handle Collisions for Collision2D Components"""
-        for entity in self.iterate_entities():
-            self.handle_movement(entity)
+        awake = sleeping = 0
+        for entity, comp in self.iterate_components():
+            if self.handle_body(entity, comp):
+                awake += 1
+            else:
+                sleeping += 1
+        self.awake_count, self.sleeping_count = awake, sleeping
 
 
 class Collision2DRendererAspectDebug(Collision2DAspect):
     def __init__(self):
         super().__init__()
+        self.declare_access(
+            reads=[TileMap.CHUNK_KEY],
+            writes=[Collision2DComponent, scene.RES_TRANSFORMS, scene.RES_CHUNKS, scene.RES_DEBUGBUFFER],
+        )
 
     def handle(self):
         """Render the collision areas"""
         # print(len(list(self.iterate_entities())))
-        for entity in self.iterate_entities():
-            self.handle_movement(entity)
-            # render debug rect etc
+        awake = sleeping = 0
+        for entity, comp in self.iterate_components():
+            if self.handle_body(entity, comp):
+                awake += 1
+            else:
+                sleeping += 1
+            if comp.shape is not None:
+                pgdraw.polygon(
+                    SORA.DEBUGBUFFER,
+                    (255, 255, 0),
+                    [(v.x - SORA.iOFFSET[0], v.y - SORA.iOFFSET[1]) for v in comp.get_vertices()],
+                    1,
+                )
+            # render debug rect etc -- sleeping bodies in blue
             # print(entity.rect)
-            pgdraw.rect(SORA.DEBUGBUFFER, (255, 0, 0), 
+            pgdraw.rect(SORA.DEBUGBUFFER, (0, 0, 255) if comp.sleeping else (255, 0, 0), 
                     pgRect(entity.rect.x - SORA.iOFFSET[0], entity.rect.y - SORA.iOFFSET[1], entity.rect.w, entity.rect.h),
                     1)
+        self.awake_count, self.sleeping_count = awake, sleeping
 
 
 # ------------------------------ #
@@ -482,6 +900,7 @@ class Tile:
         # private
         self._hrect = sprite_rect
         self._position = position
+        self._rect = pgRect(0, 0, 0, 0)
         # public
         self.static = True
         self.position = position
@@ -489,12 +908,46 @@ class Tile:
 
     @property
     def rect(self):
-        return pgRect(
+        """Get the collision rect -- one rect per tile, refreshed in place (the sprite rect is shared)"""
+        self._rect.update(
             self._position[0] + self._hrect.x,
             self._position[1] + self._hrect.y,
             self._hrect.w,
             self._hrect.h,
         )
+        return self._rect
+
+
+class TileGrid:
+    """
+    TileGrid
+    - the tiles of one chunk -- a (rows, cols) uint16 grid of tilemap palette ids, 0 is empty
+    - `Tile` objects are only made for tiles that get queried (collision, raycasts) + are cached
+    """
+
+    def __init__(self, width: int, height: int):
+        """Create an empty grid"""
+        # public
+        self.ids = np.zeros((height, width), dtype=np.uint16)
+        self.tiles = {}  # flat index: Tile
+        self.count = 0
+
+    def set(self, tx: int, ty: int, tid: int):
+        """Set the id of one tile"""
+        self.count += bool(tid) - bool(self.ids[ty, tx])
+        self.ids[ty, tx] = tid
+        self.tiles.pop(ty * self.ids.shape[1] + tx, None)
+
+    def set_region(self, tx: int, ty: int, ids: np.ndarray):
+        """Copy a (rows, cols) block of ids into the grid"""
+        rows, cols = ids.shape
+        self.ids[ty : ty + rows, tx : tx + cols] = ids
+        self.count = int(np.count_nonzero(self.ids))
+        self.tiles.clear()
+
+    def __len__(self):
+        """Get the number of tiles"""
+        return self.count
 
 
 class TileMap(scene.Aspect):
@@ -503,11 +956,26 @@ class TileMap(scene.Aspect):
 
     def __init__(self):
         super().__init__(None)
+        self.declare_access(
+            reads=[self.CHUNK_KEY, scene.RES_CAMERA],
+            writes=[scene.RES_FRAMEBUFFER, scene.RES_DEBUGBUFFER],
+        )
         # private
         self._tsize = [0, 0]
         self._chunk_tile_area = [0, 0]
         self._resized_sprites = {}
         self._registered_chunks = set()
+        # tile ids -- id: sprite path (0 is empty) + sprite path: id
+        self._palette = [None]
+        self._palette_ids = {}
+        # pre-rendered chunk tiles -- chunk key: premultiplied surface
+        self._baked = {}
+        self._premul_sprites = {}
+
+        # public
+        # tiles drawn / skipped outside the viewport in the last frame
+        self.drawn = 0
+        self.culled = 0
 
     def on_add(self):
         self._tsize = [
@@ -519,6 +987,10 @@ class TileMap(scene.Aspect):
             self._world._options["chunktileh"],
         ]
 
+    def on_chunk_deactivated(self, chunk):
+        """Drop the pre-rendered tiles of chunks out of range"""
+        self._baked.pop(chunk.key, None)
+
     # === utils
     def load_resized_sprite(self, sprite_path, rect=None):
         """Get a resized sprite"""
@@ -535,57 +1007,212 @@ class TileMap(scene.Aspect):
             rref = self._resized_sprites[sprite_path][1]
             rref.topleft = rect.topleft
             rref.w, rref.h = rect.w, rect.h
+            # every tile using the sprite may have moved
+            self._baked.clear()
         else:
             self.load_resized_sprite(sprite_path, rect)
 
     # === tiles
+    def get_palette_id(self, sprite_path: str) -> int:
+        """Get the tile id of a sprite -- registered on first use"""
+        tid = self._palette_ids.get(sprite_path)
+        if tid is None:
+            if len(self._palette) > 0xFFFF:
+                raise ValueError("TileMap palette is full -- 65535 tile sprites max")
+            self.load_resized_sprite(sprite_path)
+            tid = self._palette_ids[sprite_path] = len(self._palette)
+            self._palette.append(sprite_path)
+        return tid
+
+    def get_tile_chunk(self, cx: int, cy: int):
+        """Get a chunk with a tile grid -- the grid is made + registered on first use"""
+        chunk = self._world.get_chunk(cx, cy)
+        if not self.CHUNK_KEY in chunk._dev:
+            chunk._dev[self.CHUNK_KEY] = TileGrid(*self._chunk_tile_area)
+            self._registered_chunks.add(chunk.key)
+        return chunk
+
     def add_tile_to_chunk(self, cx: int, cy: int, sprite_path: str, tx: int, ty: int):
         """Add a tile to a chunk"""
-        # literally a dict
-        chunk = self._world.get_chunk(
-            cx + tx // self._chunk_tile_area[0], (cy + ty // self._chunk_tile_area[1])
-        )
-        # if not registered already -- do so now
-        if not self.CHUNK_KEY in chunk._dev:
-            chunk._dev[self.CHUNK_KEY] = {}
-        # add tile
-        tx, ty = smath.__mod__(tx, self._chunk_tile_area[0]), smath.__mod__(
-            ty, self._chunk_tile_area[1]
-        )
-        sprite_data = self.load_resized_sprite(sprite_path)
-        chunk._dev[self.CHUNK_KEY][self.get_tile_hash(tx, ty)] = Tile(
-            sprite_path,
-            (tx * self._tsize[0] + chunk.rect.x, ty * self._tsize[1] + chunk.rect.y),
-            self._resized_sprites[sprite_path][1],
-        )
-        self._registered_chunks.add(hash(chunk))
-        # print(chunk._dev[self.CHUNK_KEY][self.get_tile_hash(tx, ty)])
+        cw, ch = self._chunk_tile_area
+        chunk = self.get_tile_chunk(cx + tx // cw, cy + ty // ch)
+        chunk._dev[self.CHUNK_KEY].set(tx % cw, ty % ch, self.get_palette_id(sprite_path))
+        # rebuilt the next time the chunk is drawn
+        self._baked.pop(chunk.key, None)
 
     def add_tile_global(self, sprite_path: str, tx: int, ty: int):
         """Add a tile to the world"""
-        cx, cy = tx // self._chunk_tile_area[0], ty // self._chunk_tile_area[1]
-        tx, ty = smath.__mod__(tx, self._chunk_tile_area[0]), smath.__mod__(
-            ty, self._chunk_tile_area[1]
-        )
-        self.add_tile_to_chunk(cx, cy, sprite_path, tx, ty)
+        self.add_tile_to_chunk(0, 0, sprite_path, tx, ty)
 
-    def get_tile_hash(self, tx: int, ty: int):
-        """Get a tile hash"""
-        return f"{int(tx)}|{int(ty)}"
+    def set_region(self, sprite_path: str, tx: int, ty: int, width: int, height: int):
+        """Fill a rect of global tiles with one sprite -- None clears them"""
+        tid = self.get_palette_id(sprite_path) if sprite_path else 0
+        self.load_layer(np.full((height, width), tid, dtype=np.uint16), tx, ty)
+
+    def load_layer(self, ids, tx: int = 0, ty: int = 0, palette: list = None):
+        """
+        Load a (rows, cols) layer of tiles with its topleft at a global tile position
+        - palette: sprite paths -- id 0 is empty, id n is palette[n - 1]
+        - no palette: the ids are tilemap palette ids
+        - every tile in the rect is overwritten, empty ones included
+        """
+        ids = np.asarray(ids)
+        if palette is not None:
+            lut = np.array([0] + [self.get_palette_id(path) for path in palette], dtype=np.uint16)
+            ids = lut[ids]
+        elif ids.size and int(ids.max()) >= len(self._palette):
+            raise ValueError("Tile id is not in the TileMap palette")
+        rows, cols = ids.shape
+        cw, ch = self._chunk_tile_area
+        # split the layer along chunk borders -- one block copy per chunk
+        for cy in range(ty // ch, (ty + rows - 1) // ch + 1):
+            y0, y1 = max(ty, cy * ch), min(ty + rows, (cy + 1) * ch)
+            for cx in range(tx // cw, (tx + cols - 1) // cw + 1):
+                x0, x1 = max(tx, cx * cw), min(tx + cols, (cx + 1) * cw)
+                chunk = self.get_tile_chunk(cx, cy)
+                chunk._dev[self.CHUNK_KEY].set_region(
+                    x0 - cx * cw, y0 - cy * ch, ids[y0 - ty : y1 - ty, x0 - tx : x1 - tx]
+                )
+                self._baked.pop(chunk.key, None)
+
+    def get_tile_id(self, tx: int, ty: int) -> int:
+        """Get the tile id at a global tile position -- 0 if empty"""
+        cw, ch = self._chunk_tile_area
+        chunk = self._world.find_chunk(tx // cw, ty // ch)
+        if not chunk or self.CHUNK_KEY not in chunk._dev:
+            return 0
+        return chunk._dev[self.CHUNK_KEY].ids.item(ty % ch, tx % cw)
+
+    def get_chunk_tile(self, chunk, tx: int, ty: int, tid: int):
+        """Get the Tile of a chunk tile -- made on first query"""
+        grid = chunk._dev[self.CHUNK_KEY]
+        index = ty * self._chunk_tile_area[0] + tx
+        tile = grid.tiles.get(index)
+        if tile is None:
+            sprite_path = self._palette[tid]
+            tile = grid.tiles[index] = Tile(
+                sprite_path,
+                (tx * self._tsize[0] + chunk.rect.x, ty * self._tsize[1] + chunk.rect.y),
+                self._resized_sprites[sprite_path][1],
+            )
+        return tile
+
+    def get_tile(self, tx: int, ty: int):
+        """Get the tile at a global tile position"""
+        cw, ch = self._chunk_tile_area
+        chunk = self._world.find_chunk(tx // cw, ty // ch)
+        if not chunk or self.CHUNK_KEY not in chunk._dev:
+            return None
+        tx, ty = tx % cw, ty % ch
+        tid = chunk._dev[self.CHUNK_KEY].ids.item(ty, tx)
+        return self.get_chunk_tile(chunk, tx, ty, tid) if tid else None
+
+    def iterate_tiles_in_rect(self, rect):
+        """Iterate through the tiles in the grid cells a rect covers"""
+        for tx in range(rect.left // self._tsize[0], max(rect.right - 1, rect.left) // self._tsize[0] + 1):
+            for ty in range(rect.top // self._tsize[1], max(rect.bottom - 1, rect.top) // self._tsize[1] + 1):
+                tile = self.get_tile(tx, ty)
+                if tile:
+                    yield tile
+
+    def iterate_chunk_tiles(self, chunk):
+        """Iterate through all the tiles of a chunk"""
+        ids = chunk._dev[self.CHUNK_KEY].ids
+        ys, xs = np.nonzero(ids)
+        for ty, tx in zip(ys.tolist(), xs.tolist()):
+            yield self.get_chunk_tile(chunk, tx, ty, ids.item(ty, tx))
 
     def iterate_active_tiles(self):
         """iterate t hrough all the active tils"""
         for cid in self._world._active_chunks:
             if not cid in self._registered_chunks:
                 continue
-            for item in self._world._chunks[cid]._dev[self.CHUNK_KEY].values():
+            yield from self.iterate_chunk_tiles(self._world._chunks[cid])
+
+    def iterate_visible_tiles(self, viewport):
+        """Iterate the active tiles inside a viewport -- chunks outside it are skipped whole"""
+        tw, th = self._tsize
+        vl, vt, vr, vb = viewport.left, viewport.top, viewport.right, viewport.bottom
+        self.drawn = self.culled = 0
+        for cid in self._world._active_chunks:
+            if not cid in self._registered_chunks:
+                continue
+            chunk = self._world._chunks[cid]
+            count = len(chunk._dev[self.CHUNK_KEY])
+            # tile sprites can hang one tile over the chunk edge
+            bounds = chunk.rect.inflate(tw * 2, th * 2)
+            if not bounds.colliderect(viewport):
+                self.culled += count
+                continue
+            if viewport.contains(bounds):
+                self.drawn += count
+                yield from self.iterate_chunk_tiles(chunk)
+                continue
+            for item in self.iterate_chunk_tiles(chunk):
+                x = item._position[0] + item._hrect.x
+                y = item._position[1] + item._hrect.y
+                if x >= vr or y >= vb or x + tw <= vl or y + th <= vt:
+                    self.culled += 1
+                    continue
+                self.drawn += 1
                 yield item
 
+    def get_stats(self) -> dict:
+        """Get the drawn / culled tile counts of the last frame"""
+        return {"drawn": self.drawn, "culled": self.culled, "baked": len(self._baked)}
+
+    # === pre-rendering
+    def get_premul_sprite(self, sprite_path):
+        """Get the premultiplied alpha version of a tile sprite"""
+        if sprite_path not in self._premul_sprites:
+            self._premul_sprites[sprite_path] = self._resized_sprites[sprite_path][0].premul_alpha()
+        return self._premul_sprites[sprite_path]
+
+    def get_baked_chunk(self, chunk):
+        """Get the pre-rendered tiles of a chunk -- padded by one tile for sprites hanging over the edge"""
+        surface = self._baked.get(chunk.key)
+        if surface:
+            return surface
+        tw, th = self._tsize
+        surface = pygame.Surface((chunk.rect.w + tw * 2, chunk.rect.h + th * 2), pygame.SRCALPHA, 32)
+        # premultiplied alpha -- baking then drawing blends the same as drawing each tile
+        ids = chunk._dev[self.CHUNK_KEY].ids
+        ys, xs = np.nonzero(ids)
+        blits = []
+        for ty, tx, tid in zip(ys.tolist(), xs.tolist(), ids[ys, xs].tolist()):
+            sprite_path = self._palette[tid]
+            hrect = self._resized_sprites[sprite_path][1]
+            blits.append(
+                (self.get_premul_sprite(sprite_path), ((tx + 1) * tw + hrect.x, (ty + 1) * th + hrect.y))
+            )
+        surface.fblits(blits, pygame.BLEND_PREMULTIPLIED)
+        self._baked[chunk.key] = surface
+        return surface
+
     # === rendering
     def handle(self):
-        """Handle the rendering of the tilemap"""
-        for item in self.iterate_active_tiles():
-            SORA.FRAMEBUFFER.blit(self._resized_sprites[item.sprite_path][0], (item.rect.x - SORA.OFFSET[0], item.rect.y - SORA.OFFSET[1]))
+        """Handle the rendering of the tilemap -- one blit per visible chunk"""
+        viewport = get_viewport(self._world)
+        tw, th = self._tsize
+        ox, oy = SORA.OFFSET
+        self.drawn = self.culled = 0
+        for cid in self._world._active_chunks:
+            if not cid in self._registered_chunks:
+                continue
+            chunk = self._world._chunks[cid]
+            count = len(chunk._dev[self.CHUNK_KEY])
+            if not count:
+                continue
+            if not chunk.rect.inflate(tw * 2, th * 2).colliderect(viewport):
+                self.culled += count
+                continue
+            self.drawn += count
+            # floored -- a truncated negative position would shift the whole chunk
+            SORA.FRAMEBUFFER.blit(
+                self.get_baked_chunk(chunk),
+                (math.floor(chunk.rect.x - tw - ox), math.floor(chunk.rect.y - th - oy)),
+                special_flags=pygame.BLEND_PREMULTIPLIED,
+            )
 
 
 class TileMapDebug(TileMap):
@@ -594,7 +1221,7 @@ class TileMapDebug(TileMap):
 
     def handle(self):
         """Handle the rendering of the tilemap"""
-        for item in self.iterate_active_tiles():
+        for item in self.iterate_visible_tiles(get_viewport(self._world)):
             SORA.FRAMEBUFFER.blit(self._resized_sprites[item.sprite_path][0], (item.rect.x - SORA.OFFSET[0], item.rect.y - SORA.OFFSET[1]))
             # debug render rect
             r = self._resized_sprites[item.sprite_path]
@@ -611,52 +1238,62 @@ Particle systems are very cool
 """
 # ------------------------------------------------------------ #
 
+# ------------------------------ #
+# shape particles -- all share the same arrays, only the outline differs
+
+SQUARE_SHAPE = np.array([(1, 0), (0, -1), (-1, 0), (0, 1)], dtype=float)
+TRIANGLE_SHAPE = np.array(
+    [tuple(physics.World2D.RIGHT.rotate(a)) for a in (0, 120, 240)], dtype=float
+)
+
+
+def _emit_shape_particles(parent, count: int, kwargs: dict, spin: float, color: tuple):
+    """Emit `count` spinning shape particles"""
+    if "vel" in kwargs:
+        vel = kwargs["vel"]
+    else:
+        vel = (np.random.random((count, 2)) - 0.5) * 100
+    parent.particles.emit(
+        count,
+        (parent.position.x, parent.position.y),
+        velocity=vel,
+        life=kwargs["life"] if "life" in kwargs else 1.0,
+        color=tuple(kwargs["color"]) if "color" in kwargs else color,
+        angle=0,
+        spin=kwargs["angv"] if "angv" in kwargs else (np.random.random(count) - 0.5) * spin,
+        radius=kwargs["radius"] if "radius" in kwargs else 10,
+    )
+
+
+def _update_shape_particles(particles, shape: np.ndarray):
+    """Age + color + move + draw spinning shape particles"""
+    # check if the particles are dead
+    particles.age(SORA.DELTA)
+    particles.remove_dead()
+    n = particles.count
+    # set color value
+    colors = particles.colors
+    colors[:n, 0] = int(math.sin(SORA.ENGINE_UPTIME) * 127 + 127)
+    colors[:n, 1] = int(math.cos(SORA.ENGINE_UPTIME) * 127 + 127)
+    colors[:n, 2] = np.sin(particles.positions[:n, 0]) * 127 + 127
+    # just spin + move in random direction
+    particles.integrate(SORA.DELTA)
+    # render -- shape (that rotates)
+    physics.draw_particle_polygons(particles, shape, SORA.FRAMEBUFFER, 1)
+
+
 # ------------------------------ #
 # square particle
 
 
-def create_square_particle(parent, **kwargs):
-    """Create a square particle"""
-    r = kwargs["radius"] if "radius" in kwargs else 10
-    return [
-        parent.position.xy,
-        kwargs["vel"]
-        if "vel" in kwargs
-        else pgmath.Vector2(
-            (random.random() - 0.5) * 100, (random.random() - 0.5) * 100
-        ),
-        0,  # angle,
-        kwargs["angv"] if "angv" in kwargs else (random.random() - 0.5) * 100,
-        list(kwargs["color"]) if "color" in kwargs else [0, 0, 255],
-        kwargs["life"] if "life" in kwargs else 1.0,
-        (
-            physics.World2D.RIGHT * r,
-            physics.World2D.UP * r,
-            physics.World2D.LEFT * r,
-            physics.World2D.DOWN * r,
-        ),  # points
-        parent.get_new_particle_id(),
-    ]
-
-
-def update_square_particle(parent, particle):
-    """Update a square particle"""
-    # check if the particle is dead
-    particle[5] -= SORA.DELTA
-    # print(particle)
-    if particle[5] <= 0:
-        parent.remove_particle(particle)
-        return
-    # set color value
-    particle[4][0] = int(math.sin(SORA.ENGINE_UPTIME) * 127 + 127)
-    particle[4][1] = int(math.cos(SORA.ENGINE_UPTIME) * 127 + 127)
-    particle[4][2] = int(math.sin(particle[0].x) * 127 + 127)
-    # just spin + move in random direction
-    particle[0] += particle[1] * SORA.DELTA
-    particle[2] += particle[3] * SORA.DELTA
-    # render -- square (that rotates)
-    points = [i.rotate(particle[2]) + particle[0] for i in particle[6]]
-    pgdraw.polygon(SORA.FRAMEBUFFER, particle[4], points, 1)
+def create_square_particle(parent, count: int = 1, **kwargs):
+    """Create square particles"""
+    _emit_shape_particles(parent, count, kwargs, 100, (0, 0, 255))
+
+
+def update_square_particle(parent, particles):
+    """Update square particles"""
+    _update_shape_particles(particles, SQUARE_SHAPE)
 
 
 # register
@@ -667,47 +1304,14 @@ physics.ParticleHandler.register_update_function("square", update_square_particl
 # triangle particles
 
 
-def create_triangle_particle(parent, **kwargs):
-    """Create a square particle"""
-    r = kwargs["radius"] if "radius" in kwargs else 10
-    return [
-        parent.position.xy,
-        kwargs["vel"]
-        if "vel" in kwargs
-        else pgmath.Vector2(
-            (random.random() - 0.5) * 100, (random.random() - 0.5) * 100
-        ),
-        0,  # angle,
-        kwargs["angv"] if "angv" in kwargs else (random.random() - 0.5) * 1000,
-        list(kwargs["color"]) if "color" in kwargs else [0, 0, 255],
-        kwargs["life"] if "life" in kwargs else 1.0,
-        (
-            physics.World2D.RIGHT * r,
-            physics.World2D.RIGHT.rotate(120) * r,
-            physics.World2D.RIGHT.rotate(240) * r,
-        ),  # points
-        parent.get_new_particle_id(),
-    ]
-
-
-def update_triangle_particle(parent, particle):
-    """Update a square particle"""
-    # check if the particle is dead
-    particle[5] -= SORA.DELTA
-    # print(particle)
-    if particle[5] <= 0:
-        parent.remove_particle(particle)
-        return
-    # set color value
-    particle[4][0] = int(math.sin(SORA.ENGINE_UPTIME) * 127 + 127)
-    particle[4][1] = int(math.cos(SORA.ENGINE_UPTIME) * 127 + 127)
-    particle[4][2] = int(math.sin(particle[0].x) * 127 + 127)
-    # just spin + move in random direction
-    particle[0] += particle[1] * SORA.DELTA
-    particle[2] += particle[3] * SORA.DELTA
-    # render -- square (that rotates)
-    points = [i.rotate(particle[2]) + particle[0] for i in particle[6]]
-    pgdraw.polygon(SORA.FRAMEBUFFER, particle[4], points, 1)
+def create_triangle_particle(parent, count: int = 1, **kwargs):
+    """Create triangle particles"""
+    _emit_shape_particles(parent, count, kwargs, 1000, (0, 0, 255))
+
+
+def update_triangle_particle(parent, particles):
+    """Update triangle particles"""
+    _update_shape_particles(particles, TRIANGLE_SHAPE)
 
 
 # register
@@ -715,65 +1319,52 @@ physics.ParticleHandler.register_create_function("triangle", create_triangle_par
 physics.ParticleHandler.register_update_function("triangle", update_triangle_particle)
 
 # ------------------------------ #
-# triangle particles
-
-__custom_shape = [
-    pgmath.Vector2(0, -1),
-    pgmath.Vector2(1, 0),
-    pgmath.Vector2(0.9, 0.15),
-    pgmath.Vector2(0.8, 0.4),
-    pgmath.Vector2(0.6, 0.7),
-    pgmath.Vector2(0.5, 0.65),
-    pgmath.Vector2(0.4, 0.5),
-    pgmath.Vector2(0.2, 0.4),
-    pgmath.Vector2(0, 0),
-    pgmath.Vector2(-0.2, 0.4),
-    pgmath.Vector2(-0.4, 0.5),
-    pgmath.Vector2(-0.5, 0.65),
-    pgmath.Vector2(-0.6, 0.7),
-    pgmath.Vector2(-0.8, 0.4),
-    pgmath.Vector2(-0.9, 0.15),
-    pgmath.Vector2(-1, 0),
-]
-
-
-def create_custom_particle(parent, **kwargs):
-    """Create a square particle"""
-    r = kwargs["radius"] if "radius" in kwargs else 10
-    return [
-        parent.position.xy,
-        kwargs["vel"]
-        if "vel" in kwargs
-        else pgmath.Vector2(
-            (random.random() - 0.5) * 100, (random.random() - 0.5) * 100
-        ),
-        0,  # angle,
-        kwargs["angv"] if "angv" in kwargs else (random.random() - 0.5) * 1000,
-        list(kwargs["color"]) if "color" in kwargs else [255, 192, 203],
-        kwargs["life"] if "life" in kwargs else 1.0,
-        tuple([_ * r for _ in __custom_shape]),  # points
-        parent.get_new_particle_id(),
-    ]
-
-
-def update_custom_particle(parent, particle):
-    """Update a square particle"""
-    # check if the particle is dead
-    particle[5] -= SORA.DELTA
-    # print(particle)
-    if particle[5] <= 0:
-        parent.remove_particle(particle)
-        return
+# custom particles
+
+CUSTOM_SHAPE = np.array(
+    [
+        (0, -1),
+        (1, 0),
+        (0.9, 0.15),
+        (0.8, 0.4),
+        (0.6, 0.7),
+        (0.5, 0.65),
+        (0.4, 0.5),
+        (0.2, 0.4),
+        (0, 0),
+        (-0.2, 0.4),
+        (-0.4, 0.5),
+        (-0.5, 0.65),
+        (-0.6, 0.7),
+        (-0.8, 0.4),
+        (-0.9, 0.15),
+        (-1, 0),
+    ],
+    dtype=float,
+)
+
+
+def create_custom_particle(parent, count: int = 1, **kwargs):
+    """Create custom shaped particles"""
+    _emit_shape_particles(parent, count, kwargs, 1000, (255, 192, 203))
+
+
+def update_custom_particle(parent, particles):
+    """Update custom shaped particles"""
+    # check if the particles are dead
+    particles.age(SORA.DELTA)
+    particles.remove_dead()
+    n = particles.count
     # set color value
-    particle[4][0] = 255 - abs(int(math.sin(particle[0].y) * 100))
-    particle[4][1] = abs(int(math.cos(SORA.ENGINE_UPTIME) * 129))
-    particle[4][2] = 200 - abs(int(math.sin(particle[0].x) * 40))
+    pos = particles.positions[:n]
+    colors = particles.colors
+    colors[:n, 0] = 255 - np.abs(np.trunc(np.sin(pos[:, 1]) * 100))
+    colors[:n, 1] = abs(int(math.cos(SORA.ENGINE_UPTIME) * 129))
+    colors[:n, 2] = 200 - np.abs(np.trunc(np.sin(pos[:, 0]) * 40))
     # just spin + move in random direction
-    particle[0] += particle[1] * SORA.DELTA
-    particle[2] += particle[3] * SORA.DELTA
-    # render -- square (that rotates)
-    points = [i.rotate(particle[2]) + particle[0] for i in particle[6]]
-    pgdraw.polygon(SORA.FRAMEBUFFER, particle[4], points, 1)
+    particles.integrate(SORA.DELTA)
+    # render -- custom shape (that rotates)
+    physics.draw_particle_polygons(particles, CUSTOM_SHAPE, SORA.FRAMEBUFFER, 1)
 
 
 # register
@@ -792,6 +1383,8 @@ For use in opengl based applications / games! -- not pygame 2D
 
 # 2D camera
 class Camera2D(physics.Entity):
+    WORLD_KEY = "camera2d"
+
     def __init__(self):
         """
         Camera Constructor:
@@ -809,13 +1402,23 @@ class Camera2D(physics.Entity):
     
     def on_ready(self):
         """Called when the camera is ready"""
-        pass
+        # sprite + tile culling read the viewport of the world camera
+        self.world._dev[self.WORLD_KEY] = self
+        if not self.world.get_aspect(Camera2DAspect):
+            self.world.add_aspect(Camera2DAspect())
 
     def update(self):
+        """Cameras are moved by the `Camera2DAspect` -- after the physics steps"""
+        pass
+
+    def follow(self):
         """Track an entity target and center them"""
-        if not self.target: return
-        # get world position
-        self.position = self.target._position.xy
+        if not self.target:
+            # follow the global offset
+            self.viewport.topleft = SORA.iOFFSET
+            return
+        # interpolated position -- matches where the target sprite is drawn
+        self.position = self.target.render_position
         self.viewport.center = tuple(map(int, self.position.xy))
         # update eglob offset
         SORA.set_offset(self.position.x - SORA.FHSIZE[0], self.position.y - SORA.FHSIZE[1])
@@ -839,6 +1442,28 @@ class Camera2D(physics.Entity):
         return -self.target.position + SORA.OFFSET
 
 
+class Camera2DAspect(scene.Aspect):
+    """
+    Camera2D Aspect
+    - moves the world camera once the physics of the frame has stepped
+    - runs before the renderers -- the camera + sprites use the same interpolation alpha
+    """
+
+    def __init__(self):
+        super().__init__(None)
+        # after physics (19), areas (18) + scripts (2) -- before the renderers (0)
+        self.priority = 1
+        self.declare_access(
+            reads=[], writes=[scene.RES_CAMERA, scene.RES_TRANSFORMS, scene.RES_CHUNKS]
+        )
+
+    def handle(self):
+        """Update the world camera"""
+        camera = self._world._dev.get(Camera2D.WORLD_KEY)
+        if camera:
+            camera.follow()
+
+
 # ortho
 class OrthoCamera(mgl.Camera):
     def __init__(self, pos, front, up):
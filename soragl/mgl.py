@@ -3,12 +3,13 @@ import soragl as SORA
 if SORA.DEBUG:
     print("Activated mgl.py")
 
-from . import misc
+from . import misc, profiler
 import moderngl
 
 import glm
 import struct
 import math
+import weakref
 from array import array
 import numpy as np
 
@@ -106,14 +107,22 @@ class ModernGL:
     def render_frame(cls):
         """Renders the everything (framebuffer + debugbuffer) to the window."""
         # upload frames to shader
+        timed = profiler.ENABLED
+        if timed:
+            st = profiler.clock()
         cls.FB_VAO.change_uniform_scalar(
             "framebuffer", Texture.pg2gltex(SORA.FRAMEBUFFER, "fb")
         )
         cls.FB_VAO.change_uniform_scalar(
             "debugbuffer", Texture.pg2gltex(SORA.DEBUGBUFFER, "db")
         )
+        if timed:
+            profiler.record(profiler.PHASE, profiler.PHASE_GL_UPLOAD, profiler.clock() - st)
         # render the quad
         cls.FB_VAO.render()
+        # instanced sprites + particles -- drawn over the framebuffer
+        SpriteRenderer.render()
+        ParticleRenderer.render()
         # disable blending
 
 
@@ -345,6 +354,14 @@ class Buffer:
         packed = struct.pack(self.parse, *self.rawbuf)
         self.buffer.write(packed)
 
+    def stream(self, data: np.ndarray):
+        """Write a numpy array into the buffer -- orphans + grows the gl buffer if too small"""
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        if data.nbytes > self.buffer.size:
+            self.buffer.orphan(max(data.nbytes, self.buffer.size * 2))
+        self.buffer.write(data)
+        self.rawbuf = data
+
     def render(self):
         """Render the buffer"""
         pass
@@ -403,8 +420,10 @@ class VAO:
     def __init__(self, shader_path: str = ShaderProgram.DEFAULT):
         """Creates an empty VAO"""
         self.attributes = []
+        self.instance_attributes = []
         self.vbo = None
         self.ibo = None
+        self.instance_buffer = None
         self.vao = None
         self.uniforms = UniformHandler(shader_path)
         self.shader = shader_path
@@ -414,6 +433,10 @@ class VAO:
         """Add an attribute to the vao"""
         self.attributes.append([parse, var_name])
 
+    def add_instance_attribute(self, parse: str, var_name: str):
+        """Add a per-instance attribute to the vao -- read from the instance buffer"""
+        self.instance_attributes.append([parse, var_name])
+
     def change_uniform_scalar(self, name: str, value):
         """Change a uniform value"""
         self.uniforms.change_uniform_scalar(name, value)
@@ -426,10 +449,23 @@ class VAO:
         """Get a uniform value"""
         return self.uniforms[name]
 
-    def create_structure(self, vbo, ibo=None):
+    def _instance_blob(self) -> list:
+        """Get the vertex array content for the instance buffer"""
+        if not self.instance_buffer:
+            return []
+        iattrib = " ".join([i[0] for i in self.instance_attributes]) + "/i"
+        return [
+            tuple(
+                [self.instance_buffer.buffer, iattrib]
+                + list(i[1] for i in self.instance_attributes)
+            )
+        ]
+
+    def create_structure(self, vbo, ibo=None, instance_buffer=None):
         """Creates the gl context for the vao"""
         self.vbo = vbo
         self.ibo = ibo
+        self.instance_buffer = instance_buffer
         # check if there are ibo
         if ibo:
             self.glvbo = self.vbo.buffer
@@ -440,6 +476,7 @@ class VAO:
             blob.append(
                 tuple([self.glvbo, vattrib] + list(i[1] for i in self.attributes))
             )
+            blob += self._instance_blob()
             # vao object
             self.vao = ModernGL.CTX.vertex_array(
                 ShaderProgram.SHADERS[self.shader].program, blob, self.glibo
@@ -457,6 +494,7 @@ class VAO:
             blob.append(
                 tuple([self.glvbo, vattrib] + list(i[1] for i in self.attributes))
             )
+            blob += self._instance_blob()
             # vao object
             self.vao = ModernGL.CTX.vertex_array(
                 ShaderProgram.SHADERS[self.shader].program, blob, points
@@ -464,19 +502,195 @@ class VAO:
         self.initialized = True
         # done?
 
-    def render(self, mode=moderngl.TRIANGLES):
+    def render(self, mode=moderngl.TRIANGLES, instances: int = 1):
         """Render the vao given its data"""
         if not self.initialized:
             raise Exception("VAO has not yet been initialized!")
         # update uniform variables!
         self.uniforms.update()
-        self.vao.render(mode=mode)
+        self.vao.render(mode=mode, instances=instances)
 
     def get_shader(self) -> str:
         """Get the shader"""
         return self.shader
 
 
+# ------------------------------ #
+# instanced particles
+class ParticleRenderer:
+    """
+    Particle Renderer
+    - draws particle buffers with one instanced draw call per particle mesh
+    - per-instance data (x, y, angle, radius, r, g, b) is streamed from the particle arrays
+    - particles are queued during the scene update + drawn after the framebuffer quad
+
+    opt-in -- set `ENABLED = True` only if frames are presented with `ModernGL.render_frame`
+    (`SORA.push_framebuffer`), nothing else draws + empties the queue
+    NOTE: gpu particles are drawn over the whole framebuffer + debugbuffer -- anything
+    blitted to the framebuffer after the particles (ui, overlays) ends up below them
+    """
+
+    ENABLED = False
+    SHADER = "assets/shaders/particles.glsl"
+    CIRCLE_SEGMENTS = 16
+    CIRCLE = "circle"
+
+    MESHES = {}  # key: [VAO, instance Buffer, vertex count]
+    QUEUE = {}  # key: [(n, 7) instance arrays]
+
+    @classmethod
+    def get_mesh(cls, key, shape: np.ndarray = None):
+        """Get (or create) the mesh for a shape -- the unit circle if no shape is given"""
+        if key in cls.MESHES:
+            return cls.MESHES[key]
+        if shape is None:
+            # triangle fan -- center + ring
+            a = np.linspace(0, math.tau, cls.CIRCLE_SEGMENTS + 1)
+            shape = np.vstack(([0, 0], np.column_stack((np.cos(a), np.sin(a)))))
+        vertices = np.asarray(shape, dtype=np.float32).ravel().tolist()
+        count = len(vertices) // 2
+        vao = VAO(cls.SHADER)
+        vao.add_attribute("2f", "vvert")
+        vao.add_instance_attribute("2f", "ipos")
+        vao.add_instance_attribute("1f", "iangle")
+        vao.add_instance_attribute("1f", "iradius")
+        vao.add_instance_attribute("3f", "icolor")
+        vbuf = Buffer(f"{len(vertices)}f", vertices)
+        ibuf = Buffer(f"{count}i", list(range(count)))
+        instances = Buffer("7f", [0.0] * 7, dynamic=True)
+        vao.create_structure(vbuf, ibuf, instances)
+        cls.MESHES[key] = [vao, instances, count]
+        return cls.MESHES[key]
+
+    @classmethod
+    def submit(cls, particles, shape: np.ndarray = None):
+        """Queue all live particles of a buffer -- circles if no shape is given"""
+        n = particles.count
+        if not n:
+            return
+        key = cls.CIRCLE if shape is None else shape.tobytes()
+        cls.get_mesh(key, shape)
+        data = np.empty((n, 7), dtype=np.float32)
+        data[:, 0:2] = particles.positions[:n]
+        data[:, 2] = np.radians(particles.angles[:n])
+        data[:, 3] = particles.radii[:n]
+        data[:, 4:7] = particles.colors[:n] / 255
+        cls.QUEUE.setdefault(key, []).append(data)
+
+    @classmethod
+    def render(cls):
+        """Draw + clear all queued particles"""
+        for key, batches in cls.QUEUE.items():
+            if not batches:
+                continue
+            vao, instances, count = cls.MESHES[key]
+            data = batches[0] if len(batches) == 1 else np.concatenate(batches)
+            instances.stream(data)
+            vao.change_uniform_scalar("fsize", tuple(SORA.FSIZE))
+            vao.render(
+                moderngl.TRIANGLE_FAN if key == cls.CIRCLE else moderngl.LINE_LOOP,
+                instances=len(data),
+            )
+            batches.clear()
+
+    @classmethod
+    def clear(cls):
+        """Drop all meshes + queued particles"""
+        cls.MESHES.clear()
+        cls.QUEUE.clear()
+
+
+# ------------------------------ #
+# instanced sprites
+class SpriteRenderer:
+    """
+    Sprite Renderer
+    - draws `atlas.SpriteBatch` draws with one instanced quad draw per atlas page
+    - per-instance data (x, y, w, h, u0, v0, u1, v1) -- flipping swaps u0 + u1
+    - atlas pages are uploaded as textures when they change
+
+    opt-in -- set `ENABLED = True` only if frames are presented with `ModernGL.render_frame`
+    (`SORA.push_framebuffer`), nothing else draws + empties the queue
+    NOTE: gpu sprites are drawn over the whole framebuffer + debugbuffer
+    """
+
+    ENABLED = False
+    SHADER = "assets/shaders/sprites.glsl"
+
+    MESH = None  # [VAO, instance Buffer]
+    TEXTURES = weakref.WeakKeyDictionary()  # atlas page: texture -- released with the page
+    QUEUE = []  # [(atlas page, (n, 8) instance array)]
+
+    @classmethod
+    def get_mesh(cls):
+        """Get (or create) the unit quad"""
+        if cls.MESH:
+            return cls.MESH
+        vao = VAO(cls.SHADER)
+        vao.add_attribute("2f", "vvert")
+        vao.add_instance_attribute("4f", "irect")
+        vao.add_instance_attribute("4f", "iuv")
+        vbuf = Buffer("8f", [0.0, 0.0, 1.0, 0.0, 1.0, 1.0, 0.0, 1.0])
+        ibuf = Buffer("6i", [0, 1, 2, 0, 2, 3])
+        instances = Buffer("8f", [0.0] * 8, dynamic=True)
+        vao.create_structure(vbuf, ibuf, instances)
+        cls.MESH = [vao, instances]
+        return cls.MESH
+
+    @classmethod
+    def get_texture(cls, page):
+        """Get the texture of an atlas page -- re-uploaded if the page changed"""
+        tex = cls.TEXTURES.get(page)
+        if tex is None:
+            tex = ModernGL.CTX.texture(page.surface.get_size(), 4)
+            tex.filter = (moderngl.NEAREST, moderngl.NEAREST)
+            tex.swizzle = "BGRA"
+            cls.TEXTURES[page] = tex
+            weakref.finalize(page, tex.release)
+            page.dirty = True
+        if page.dirty:
+            tex.write(page.surface.get_view("1"))
+            page.dirty = False
+        return tex
+
+    @classmethod
+    def submit(cls, draws: list):
+        """Queue sorted batch draws -- (layer, page index, surface, x, y, w, h, flip, atlas region)"""
+        start = 0
+        for i in range(1, len(draws) + 1):
+            # split into runs of the same page
+            if i < len(draws) and draws[i][8].page is draws[start][8].page:
+                continue
+            run = draws[start:i]
+            data = np.empty((len(run), 8), dtype=np.float32)
+            data[:, 0:4] = [d[3:7] for d in run]
+            data[:, 4:8] = [d[8].uv for d in run]
+            flipped = np.array([d[7] for d in run], dtype=bool)
+            data[flipped] = data[flipped][:, [0, 1, 2, 3, 6, 5, 4, 7]]
+            cls.QUEUE.append((run[0][8].page, data))
+            start = i
+
+    @classmethod
+    def render(cls):
+        """Draw + clear all queued sprites"""
+        if not cls.QUEUE:
+            return
+        vao, instances = cls.get_mesh()
+        vao.change_uniform_scalar("fsize", tuple(SORA.FSIZE))
+        for page, data in cls.QUEUE:
+            vao.change_uniform_scalar("atlas", cls.get_texture(page))
+            instances.stream(data)
+            vao.render(moderngl.TRIANGLES, instances=len(data))
+        cls.QUEUE.clear()
+
+    @classmethod
+    def clear(cls):
+        """Drop the mesh, page textures + queued sprites"""
+        cls.MESH = None
+        cls.TEXTURES.clear()
+        cls.QUEUE.clear()
+
+
 # ------------------------------ #
 # camera
 class Camera:
@@ -3,11 +3,13 @@ print("Activating physics.py")
 import soragl as SORA
 import random
 import math
+import numpy as np
 
 from soragl import scene
 from pygame import Rect as pRect
 from pygame import math as pgmath
 from pygame import draw as pgdraw
+from pygame import surfarray
 
 # ------------------------------------------------------------ #
 # global constnats
@@ -34,6 +36,147 @@ class World3D:
     GRAVITY = Y_AXIS * -9.8 * 10
     UP = Y_AXIS
 
+# ------------------------------------------------------------ #
+# struct-of-arrays transform store
+# ------------------------------------------------------------ #
+
+class TransformView(np.ndarray):
+    """
+    TransformView
+    - a (2,) view into one row of a TransformStore array
+    - keeps the Vector2 accessors used around the engine (x, y, xy)
+    """
+
+    @property
+    def x(self):
+        return float(self[0])
+
+    @x.setter
+    def x(self, value):
+        self[0] = value
+
+    @property
+    def y(self):
+        return float(self[1])
+
+    @y.setter
+    def y(self, value):
+        self[1] = value
+
+    @property
+    def xy(self):
+        """Copy as a Vector2 -- same as a Vector2 swizzle"""
+        return pgmath.Vector2(float(self[0]), float(self[1]))
+
+
+class TransformStore:
+    """
+    TransformStore
+    - positions, velocities + rect extents (w, h) of many entities in shared NumPy arrays
+    - each stored entity owns one slot (row); its `position` / `velocity` are views into the row
+    - integration + rect queries can run over all entities at once
+
+    NOTE: growing the store re-binds the views of live entities -- don't hold on to old views
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Create a transform store"""
+        # private
+        self._free = []
+        self._count = 0  # slots ever used
+
+        # public
+        self.capacity = capacity
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.extents = np.zeros((capacity, 2))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.entities = [None] * capacity
+
+    def __len__(self):
+        """Get the number of stored entities"""
+        return self._count - len(self._free)
+
+    def _bind(self, entity, slot: int):
+        """Point an entity's transform at its slot"""
+        entity._transform_store = self
+        entity._transform_slot = slot
+        entity._position = self.positions[slot].view(TransformView)
+        entity._velocity = self.velocities[slot].view(TransformView)
+
+    def _grow(self, capacity: int):
+        """Grow the arrays + re-bind live entities"""
+        for name in ("positions", "velocities", "extents"):
+            arr = np.zeros((capacity, 2))
+            arr[: self.capacity] = getattr(self, name)
+            setattr(self, name, arr)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self.capacity] = self.alive
+        self.alive = alive
+        self.entities += [None] * (capacity - self.capacity)
+        self.capacity = capacity
+        for slot in np.flatnonzero(self.alive):
+            self._bind(self.entities[slot], slot)
+
+    def allocate(self, entity) -> int:
+        """Give an entity a slot in the store"""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._count == self.capacity:
+                self._grow(self.capacity * 2)
+            slot = self._count
+            self._count += 1
+        # keep the current transform
+        self.positions[slot] = (entity._position[0], entity._position[1])
+        self.velocities[slot] = (entity._velocity[0], entity._velocity[1])
+        self.extents[slot] = entity.rect.size
+        self.alive[slot] = True
+        self.entities[slot] = entity
+        self._bind(entity, slot)
+        return slot
+
+    def release(self, entity):
+        """Free an entity's slot -- the entity keeps a detached copy of its transform"""
+        slot = entity._transform_slot
+        entity._position = pgmath.Vector2(self.positions[slot].tolist())
+        entity._velocity = pgmath.Vector2(self.velocities[slot].tolist())
+        entity._transform_store = None
+        entity._transform_slot = -1
+        self.velocities[slot] = 0
+        self.alive[slot] = False
+        self.entities[slot] = None
+        self._free.append(slot)
+
+    def integrate(self, dt: float):
+        """position += velocity * dt -- for every stored entity"""
+        n = self._count
+        self.positions[:n] += self.velocities[:n] * dt
+
+    def sync_rects(self):
+        """Center entity rects on their stored positions"""
+        for slot in np.flatnonzero(self.alive[: self._count]):
+            self.entities[slot].rect.center = self.positions[slot].tolist()
+
+    def get_aabbs(self) -> np.ndarray:
+        """Get (left, top, right, bottom) of every slot -- from positions + extents"""
+        n = self._count
+        half = self.extents[:n] / 2
+        return np.hstack((self.positions[:n] - half, self.positions[:n] + half))
+
+    def query_rect(self, rect) -> list:
+        """Get the stored entities overlapping a rect"""
+        aabbs = self.get_aabbs()
+        mask = (
+            self.alive[: self._count]
+            & (aabbs[:, 0] < rect.right)
+            & (aabbs[:, 2] > rect.left)
+            & (aabbs[:, 1] < rect.bottom)
+            & (aabbs[:, 3] > rect.top)
+        )
+        return [self.entities[slot] for slot in np.flatnonzero(mask)]
+
+
 # ------------------------------------------------------------ #
 # create a base entity class using the entity system
 # ------------------------------------------------------------ #
@@ -41,7 +184,7 @@ class World3D:
 class Entity:
     ENTITY_COUNT = 0
 
-    def __init__(self, name:str=None):
+    def __init__(self, name:str=None, transform_store: TransformStore = None):
         self.name = f"entity{Entity.ENTITY_COUNT}" if not name else name
         # defined after register
         self.world = None
@@ -52,23 +195,33 @@ class Entity:
         self._components = {}
         self._linked_entities = [] # links for linked entities
         self._alive = True
+        self._spawned = False  # in a chunk -- structural changes are deferred from then on
         Entity.ENTITY_COUNT += 1
         self._entity_id = Entity.ENTITY_COUNT
+        self._generation = 0  # bumped every time a pool recycles the entity
+        self._pool = None
         self._projected_position = pgmath.Vector2()
         self._position = pgmath.Vector2()
         self._velocity = pgmath.Vector2()
+        self._prev_position = None  # position before the last fixed physics step
+        self._transform_store = None
+        self._transform_slot = -1
 
         # public
         self.c_chunk = [0, 0]
         self.rect = pRect(0, 0, 0, 0)
         self.static = False
 
+        # optional -- position + velocity become views into the store
+        if transform_store is not None:
+            transform_store.allocate(self)
+
     # whenever components are added -- the world must be queried --> so that cache can be updated
     def on_ready(self):
         """When Entity is ready -- called at end of every update loop by world -- if new entity"""
         # add to required chunk
-        self.c_chunk[0] = self.position.x // self.world._options['chunkpixw']
-        self.c_chunk[1] = self.position.y // self.world._options['chunkpixh']
+        self.c_chunk[0] = int(self.position.x // self.world._options['chunkpixw'])
+        self.c_chunk[1] = int(self.position.y // self.world._options['chunkpixh'])
 
     #=== components
     @property
@@ -83,7 +236,7 @@ class Entity:
     
     def remove_component(self, component):
         """Remove a component from the entity"""
-        if component in self._components:
+        if hash(component) in self._components:
             self.world.remove_component(self, component)
     
     def get_component_from_hash(self, comp_class_hash: int):
@@ -93,12 +246,19 @@ class Entity:
         return None
     
     def get_component(self, comp_class):
-        """Get a component from the entity"""
-        return self.get_component_from_hash(hash(comp_class))
+        """Get a component from the entity -- subclasses sharing a base class slot (loaded hash) match too"""
+        comp = self._components.get(hash(comp_class))
+        if comp is not None:
+            return comp
+        # e.g. a `CircleCollider2D` is stored as the `Collision2DComponent`
+        for comp in self._components.values():
+            if isinstance(comp, comp_class):
+                return comp
+        return None
 
     def entity_has_component(self, comp_class):
         """Check if an entity has a component"""
-        return hash(comp_class) in self._components
+        return self.get_component(comp_class) is not None
 
     #=== default functions
     def update(self):
@@ -113,6 +273,33 @@ class Entity:
         """Kill the entity == world removes all linked entities"""
         self.world.remove_entity(self)
 
+    def reset(self):
+        """Reset the entity to its default state -- called when a pool recycles it"""
+        self.world = None
+        self.scene = None
+        self.handler = None
+        self._components.clear()
+        self._linked_entities.clear()
+        self._alive = True
+        self._spawned = False
+        self._projected_position.x = self._projected_position.y = 0
+        self._position.x = self._position.y = 0
+        self._velocity.x = self._velocity.y = 0
+        self._prev_position = None
+        self.c_chunk[0] = self.c_chunk[1] = 0
+        self.rect.update(0, 0, 0, 0)
+        self.static = False
+
+    @property
+    def handle(self) -> tuple:
+        """Get the generation-tagged id -- (entity id, generation)"""
+        return (self._entity_id, self._generation)
+
+    @property
+    def alive(self) -> bool:
+        """Check if the entity has not been killed + removed"""
+        return self._alive
+
     #=== values / setters / getters
     @property
     def area(self):
@@ -125,6 +312,8 @@ class Entity:
         if len(new_area) != 2:
             raise NotImplementedError(f"The area {new_area} is not supported yet! {__file__} {__package__}")
         self.rect.w, self.rect.h = new_area
+        if self._transform_store is not None:
+            self._transform_store.extents[self._transform_slot] = new_area
     
     @property
     def position(self):
@@ -136,6 +325,24 @@ class Entity:
         """Set the position for the entity"""
         self._position.x = new_position[0]
         self._position.y = new_position[1]
+        # moved outside of physics -- don't interpolate
+        if self._prev_position is not None:
+            self._prev_position.update(self._position.x, self._position.y)
+
+    def store_previous_position(self):
+        """Remember the position before a fixed physics step"""
+        if self._prev_position is None:
+            self._prev_position = pgmath.Vector2()
+        self._prev_position.update(self._position.x, self._position.y)
+
+    @property
+    def render_position(self):
+        """Position interpolated between the last two fixed physics steps"""
+        if self._prev_position is None or not self.world:
+            return self._position.xy
+        return self._prev_position.lerp(
+            (self._position.x, self._position.y), self.world.timestep.alpha
+        )
     
     @property
     def velocity(self):
@@ -175,6 +382,111 @@ class Entity:
         return self._entity_id
 
 
+# ------------------------------------------------------------ #
+# entity pooling
+# ------------------------------------------------------------ #
+
+class EntityPool:
+    """
+    EntityPool
+    - factory: callable that creates a new entity (an Entity subclass or a function)
+    - capacity: max number of free entities kept (None == no limit)
+    - transform_store: optional TransformStore -- recycled entities get a slot again
+    - killed entities are returned to the pool by the scene + reset with `Entity.reset`
+    - recycled entities keep their id but bump their generation -- stale handles stop resolving
+    """
+
+    def __init__(self, factory=Entity, capacity: int = None, transform_store: TransformStore = None):
+        """Create an entity pool"""
+        # private
+        self._free = []
+        self._entities = {}  # entity id: entity -- every entity made by the pool
+
+        # public
+        self.factory = factory
+        self.capacity = capacity
+        self.transform_store = transform_store
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self.dropped = 0
+
+    def _create(self):
+        """Create a new pooled entity"""
+        entity = self.factory()
+        entity._pool = self
+        self._entities[entity._entity_id] = entity
+        return entity
+
+    def prewarm(self, count: int):
+        """Fill the pool with `count` new free entities"""
+        for _ in range(count):
+            self._free.append(self._create())
+
+    def acquire(self):
+        """Get a fresh entity -- recycled if possible"""
+        if self._free:
+            entity = self._free.pop()
+            self.hits += 1
+        else:
+            entity = self._create()
+            self.misses += 1
+        entity._alive = True
+        if self.transform_store is not None and entity._transform_store is None:
+            self.transform_store.allocate(entity)
+        return entity
+
+    def spawn(self, world):
+        """Acquire an entity + add it to a world"""
+        return world.add_entity(self.acquire())
+
+    def release(self, entity):
+        """Return a removed entity to the pool"""
+        entity.reset()
+        entity._alive = False
+        entity._generation += 1
+        self.released += 1
+        if self.capacity is not None and len(self._free) >= self.capacity:
+            # let the gc have it
+            self._entities.pop(entity._entity_id, None)
+            entity._pool = None
+            self.dropped += 1
+            return
+        self._free.append(entity)
+
+    def resolve(self, handle: tuple):
+        """Get the entity for a handle -- None if it was recycled or is free"""
+        entity = self._entities.get(handle[0])
+        if entity is None or entity._generation != handle[1] or not entity._alive:
+            return None
+        return entity
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of acquires served from the pool"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> dict:
+        """Get the pool counters"""
+        return {
+            "free": len(self._free),
+            "hits": self.hits,
+            "misses": self.misses,
+            "released": self.released,
+            "dropped": self.dropped,
+            "hit_rate": self.hit_rate,
+        }
+
+    def reset_stats(self):
+        """Reset the pool counters"""
+        self.hits = self.misses = self.released = self.dropped = 0
+
+    def __len__(self):
+        """Get the number of free entities"""
+        return len(self._free)
+
+
 # ------------------------------------------------------------ #
 # SAT - check if colliding objects
 # ------------------------------------------------------------ #
@@ -182,9 +494,9 @@ class Entity:
 
 """
 SAT code
-- to be used when implementing box2d + movement + polygonal objects in game!
-TODO:
-- figure out how to do the above :)
+- convex shapes are separated if their projections on any edge normal don't overlap
+- ConvexPolygon caches its axes + only re-transforms when its owner moves / rotates
+- `sat_overlap_many` tests one polygon against many candidates in one batch
 """
 
 def is_separated(shape1, shape2, axis: pgmath.Vector2) -> bool:
@@ -195,34 +507,967 @@ def is_separated(shape1, shape2, axis: pgmath.Vector2) -> bool:
     min_proj2, max_proj2 = min(proj2), max(proj2)
     return max_proj1 < min_proj2 or min_proj1 > max_proj2
 
-def overlap_general(shape1_, shape2_) -> bool:
-    """Check if two objects overlap -- axis not used"""
-    shape1 = list(shape1_.get_vertices())
-    shape2 = list(shape2_.get_vertices())
-    # TODO: perhaps integrate the AABB for none AABB shapes
-
-    # Test all the normals (edge directions) of shape1
-    for i in range(len(shape1)):
-        edge = shape1[i] - shape1[i-1]
-        axis = pgmath.Vector2(-edge.y, edge.x).normalize()
-        if is_separated(shape1, shape2, axis):
-            return False
 
-    # Test all the normals (edge directions) of shape2
-    for i in range(len(shape2)):
-        edge = shape2[i] - shape2[i-1]
-        axis = pgmath.Vector2(-edge.y, edge.x).normalize()
-        if is_separated(shape1, shape2, axis):
+def get_axes(vertices: np.ndarray) -> np.ndarray:
+    """Get the unique normalized edge normals of a convex polygon -- parallel edges share an axis"""
+    edges = vertices - np.roll(vertices, 1, axis=0)
+    axes = np.column_stack((-edges[:, 1], edges[:, 0]))
+    lengths = np.hypot(axes[:, 0], axes[:, 1])
+    axes = axes[lengths > 0] / lengths[lengths > 0, None]
+    # same direction for opposite normals -- (x > 0) or (x == 0 and y > 0)
+    flip = (axes[:, 0] < -1e-12) | ((np.abs(axes[:, 0]) <= 1e-12) & (axes[:, 1] < 0))
+    axes[flip] *= -1
+    _, index = np.unique(np.round(axes, 9), axis=0, return_index=True)
+    return axes[np.sort(index)]
+
+
+def sat_overlap(vertices1: np.ndarray, axes1: np.ndarray, vertices2: np.ndarray, axes2: np.ndarray) -> bool:
+    """Check if two convex polygons overlap -- all axes tested at once"""
+    axes = np.concatenate((axes1, axes2))
+    proj1 = vertices1 @ axes.T
+    proj2 = vertices2 @ axes.T
+    return not np.any(
+        (proj1.max(axis=0) < proj2.min(axis=0)) | (proj1.min(axis=0) > proj2.max(axis=0))
+    )
+
+
+class ConvexPolygon:
+    """
+    ConvexPolygon
+    - vertices: local (K, 2) vertices around the owner position (in order, convex)
+    - unique normalized axes are computed once + rotated with the shape
+    - world vertices, axes + the AABB are only recomputed when `transform` gets a new position / angle
+    """
+
+    def __init__(self, vertices, angle: float = 0.0):
+        """Create a convex polygon"""
+        # private
+        self._local = np.asarray(vertices, dtype=float).reshape(-1, 2)
+        self._local_axes = get_axes(self._local)
+        self._rotated = self._local
+        self._transform = None  # (x, y, angle) of the cached world data
+
+        # public
+        self.angle = angle
+        self.vertices = self._local.copy()
+        self.axes = self._local_axes.copy()
+        self.aabb = (0.0, 0.0, 0.0, 0.0)  # left, top, right, bottom
+        self.transform(0, 0, angle)
+
+    @classmethod
+    def from_size(cls, width: float, height: float):
+        """Create a box polygon centered on its owner"""
+        hw, hh = width / 2, height / 2
+        return cls([(-hw, -hh), (hw, -hh), (hw, hh), (-hw, hh)])
+
+    @classmethod
+    def regular(cls, sides: int, radius: float):
+        """Create a regular polygon centered on its owner"""
+        a = np.linspace(0, math.tau, sides, endpoint=False)
+        return cls(np.column_stack((np.cos(a), np.sin(a))) * radius)
+
+    @property
+    def local_vertices(self) -> np.ndarray:
+        """Get the local vertices"""
+        return self._local
+
+    def transform(self, x: float, y: float, angle: float = None):
+        """Move the polygon to a position + angle (degrees) -- no work if nothing changed"""
+        angle = self.angle if angle is None else angle
+        key = (x, y, angle)
+        if key == self._transform:
+            return
+        if self._transform is None or angle != self._transform[2]:
+            rad = math.radians(angle)
+            c, s = math.cos(rad), math.sin(rad)
+            rot = np.array(((c, s), (-s, c)))
+            self._rotated = self._local @ rot
+            self.axes = self._local_axes @ rot
+        self.angle = angle
+        self.vertices = self._rotated + (x, y)
+        mins = self.vertices.min(axis=0)
+        maxs = self.vertices.max(axis=0)
+        self.aabb = (mins[0], mins[1], maxs[0], maxs[1])
+        self._transform = key
+
+    def aabb_overlaps(self, other: "ConvexPolygon") -> bool:
+        """Check if the AABBs overlap"""
+        a, b = self.aabb, other.aabb
+        return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+    def overlaps(self, other: "ConvexPolygon") -> bool:
+        """Check if two polygons overlap -- AABB early out, then SAT on the cached axes"""
+        if not self.aabb_overlaps(other):
             return False
+        return sat_overlap(self.vertices, self.axes, other.vertices, other.axes)
+
+    def get_vertices(self) -> np.ndarray:
+        """Get the world vertices"""
+        return self.vertices
+
+
+def sat_overlap_many(shape: ConvexPolygon, others: list) -> np.ndarray:
+    """Check one polygon against many -- (N,) bool array; AABB filter + one batched SAT"""
+    result = np.zeros(len(others), dtype=bool)
+    if not others:
+        return result
+    aabbs = np.array([o.aabb for o in others])
+    a = shape.aabb
+    hits = np.flatnonzero(
+        (aabbs[:, 0] <= a[2]) & (aabbs[:, 2] >= a[0]) & (aabbs[:, 1] <= a[3]) & (aabbs[:, 3] >= a[1])
+    )
+    if not len(hits):
+        return result
+    cands = [others[i] for i in hits]
+    # pad to the same vertex / axis count -- repeated vertices + axes don't change the result
+    kmax = max(len(o.vertices) for o in cands)
+    mmax = max(len(o.axes) for o in cands)
+    verts = np.empty((len(cands), kmax, 2))
+    axes = np.empty((len(cands), len(shape.axes) + mmax, 2))
+    axes[:, : len(shape.axes)] = shape.axes
+    for i, o in enumerate(cands):
+        k, m = len(o.vertices), len(o.axes)
+        verts[i, :k] = o.vertices
+        verts[i, k:] = o.vertices[-1]
+        axes[i, len(shape.axes) : len(shape.axes) + m] = o.axes
+        axes[i, len(shape.axes) + m :] = o.axes[-1]
+    # (N, M, K) projections
+    proj1 = np.einsum("kd,nmd->nmk", shape.vertices, axes)
+    proj2 = np.einsum("nkd,nmd->nmk", verts, axes)
+    separated = np.any(
+        (proj1.max(axis=2) < proj2.min(axis=2)) | (proj1.min(axis=2) > proj2.max(axis=2)), axis=1
+    )
+    result[hits] = ~separated
+    return result
+
+
+def overlap_general(shape1_, shape2_) -> bool:
+    """Check if two objects overlap -- anything with `get_vertices` (or ConvexPolygons)"""
+    if isinstance(shape1_, ConvexPolygon) and isinstance(shape2_, ConvexPolygon):
+        return shape1_.overlaps(shape2_)
+    shape1 = np.array([tuple(v) for v in shape1_.get_vertices()], dtype=float)
+    shape2 = np.array([tuple(v) for v in shape2_.get_vertices()], dtype=float)
+    # AABB early out
+    if np.any(shape1.max(axis=0) < shape2.min(axis=0)) or np.any(shape1.min(axis=0) > shape2.max(axis=0)):
+        return False
+    return sat_overlap(shape1, get_axes(shape1), shape2, get_axes(shape2))
+
+
+# ------------------------------------------------------------ #
+# narrowphase - shapes + type pair dispatch
+# ------------------------------------------------------------ #
+
+class Circle:
+    """
+    Circle
+    - radius around the owner position
+    """
+
+    def __init__(self, radius: float):
+        """Create a circle"""
+        # public
+        self.radius = radius
+        self.x = 0.0
+        self.y = 0.0
+        self.aabb = (-radius, -radius, radius, radius)
+
+    def transform(self, x: float, y: float, angle: float = None):
+        """Move the circle to a position"""
+        self.x, self.y = x, y
+        r = self.radius
+        self.aabb = (x - r, y - r, x + r, y + r)
+
+    def get_vertices(self, segments: int = 16) -> np.ndarray:
+        """Get a polygon approximation of the circle"""
+        a = np.linspace(0, math.tau, segments, endpoint=False)
+        return np.column_stack((np.cos(a), np.sin(a))) * self.radius + (self.x, self.y)
+
+
+class Capsule:
+    """
+    Capsule
+    - segment of `length` (along the x axis, rotated by angle) + radius around the owner position
+    """
+
+    def __init__(self, length: float, radius: float, angle: float = 0.0):
+        """Create a capsule"""
+        # public
+        self.length = length
+        self.radius = radius
+        self.angle = angle
+        self.a = np.zeros(2)
+        self.b = np.zeros(2)
+        self.axis = np.zeros(2)  # segment normal
+        self.aabb = (0.0, 0.0, 0.0, 0.0)
+        self.transform(0, 0, angle)
+
+    def transform(self, x: float, y: float, angle: float = None):
+        """Move the capsule to a position + angle (degrees)"""
+        self.angle = self.angle if angle is None else angle
+        rad = math.radians(self.angle)
+        d = np.array((math.cos(rad), math.sin(rad))) * self.length / 2
+        self.a = np.array((x, y)) - d
+        self.b = np.array((x, y)) + d
+        self.axis = np.array((-math.sin(rad), math.cos(rad)))
+        r = self.radius
+        self.aabb = (
+            min(self.a[0], self.b[0]) - r,
+            min(self.a[1], self.b[1]) - r,
+            max(self.a[0], self.b[0]) + r,
+            max(self.a[1], self.b[1]) + r,
+        )
+
+    def get_vertices(self, segments: int = 8) -> np.ndarray:
+        """Get a polygon approximation of the capsule"""
+        rad = math.radians(self.angle)
+        a = np.linspace(-math.pi / 2, math.pi / 2, segments) + rad
+        cap = np.column_stack((np.cos(a), np.sin(a))) * self.radius
+        return np.vstack((cap + self.b, -cap + self.a))
+
+
+def closest_point_on_segment(a: np.ndarray, b: np.ndarray, p) -> np.ndarray:
+    """Get the closest point to p on the segment a-b"""
+    ab = b - a
+    denom = ab @ ab
+    t = 0.0 if denom == 0 else min(max((np.asarray(p) - a) @ ab / denom, 0.0), 1.0)
+    return a + ab * t
+
+
+def closest_points_segments(a1, b1, a2, b2) -> tuple:
+    """Get the closest points between two segments"""
+    d1, d2, r = b1 - a1, b2 - a2, a1 - a2
+    a, e, f = d1 @ d1, d2 @ d2, d2 @ r
+    if a <= 1e-12 and e <= 1e-12:
+        return a1, a2
+    if a <= 1e-12:
+        s, t = 0.0, min(max(f / e, 0.0), 1.0)
+    else:
+        c = d1 @ r
+        if e <= 1e-12:
+            s, t = min(max(-c / a, 0.0), 1.0), 0.0
+        else:
+            b = d1 @ d2
+            denom = a * e - b * b
+            s = min(max((b * f - c * e) / denom, 0.0), 1.0) if denom != 0 else 0.0
+            t = (b * s + f) / e
+            if t < 0:
+                s, t = min(max(-c / a, 0.0), 1.0), 0.0
+            elif t > 1:
+                s, t = min(max((b - c) / a, 0.0), 1.0), 1.0
+    return a1 + d1 * s, a2 + d2 * t
+
+
+def _push_apart(ax: float, ay: float, bx: float, by: float, depth: float) -> tuple:
+    """Contact pushing point a away from point b"""
+    dx, dy = ax - bx, ay - by
+    dist = math.hypot(dx, dy)
+    if dist == 0:
+        return (0.0, -1.0, depth)
+    return (float(dx / dist), float(dy / dist), float(depth - dist))
+
+
+def collide_aabb_aabb(a: pRect, b: pRect) -> tuple:
+    """Rect vs rect"""
+    ox = min(a.right, b.right) - max(a.left, b.left)
+    oy = min(a.bottom, b.bottom) - max(a.top, b.top)
+    if ox <= 0 or oy <= 0:
+        return None
+    if ox < oy:
+        return (-1.0 if a.centerx < b.centerx else 1.0, 0.0, ox)
+    return (0.0, -1.0 if a.centery < b.centery else 1.0, oy)
+
+
+def collide_circle_circle(a: Circle, b: Circle) -> tuple:
+    """Circle vs circle"""
+    r = a.radius + b.radius
+    dx, dy = a.x - b.x, a.y - b.y
+    if dx * dx + dy * dy >= r * r:
+        return None
+    return _push_apart(a.x, a.y, b.x, b.y, r)
+
+
+def collide_circle_aabb(a: Circle, b: pRect) -> tuple:
+    """Circle vs rect"""
+    cx = min(max(a.x, b.left), b.right)
+    cy = min(max(a.y, b.top), b.bottom)
+    dx, dy = a.x - cx, a.y - cy
+    if dx or dy:
+        if dx * dx + dy * dy >= a.radius * a.radius:
+            return None
+        return _push_apart(a.x, a.y, cx, cy, a.radius)
+    # center inside the rect -- out through the closest side
+    sides = (
+        (a.x - b.left, -1.0, 0.0),
+        (b.right - a.x, 1.0, 0.0),
+        (a.y - b.top, 0.0, -1.0),
+        (b.bottom - a.y, 0.0, 1.0),
+    )
+    d, nx, ny = min(sides)
+    return (nx, ny, d + a.radius)
 
-    # If no separations were found, the shapes are intersecting
-    return True
+
+def collide_capsule_circle(a: Capsule, b: Circle) -> tuple:
+    """Capsule vs circle"""
+    p = closest_point_on_segment(a.a, a.b, (b.x, b.y))
+    r = a.radius + b.radius
+    dx, dy = p[0] - b.x, p[1] - b.y
+    if dx * dx + dy * dy >= r * r:
+        return None
+    return _push_apart(p[0], p[1], b.x, b.y, r)
+
+
+def collide_capsule_capsule(a: Capsule, b: Capsule) -> tuple:
+    """Capsule vs capsule"""
+    p, q = closest_points_segments(a.a, a.b, b.a, b.b)
+    r = a.radius + b.radius
+    dx, dy = p[0] - q[0], p[1] - q[1]
+    if dx * dx + dy * dy >= r * r:
+        return None
+    return _push_apart(p[0], p[1], q[0], q[1], r)
+
+
+_RECT_AXES = np.array(((1.0, 0.0), (0.0, 1.0)))
+_NO_AXES = np.zeros((0, 2))
+
+
+def _get_sat_parts(shape) -> tuple:
+    """Get (core vertices, radius, axes) -- circles + capsules are a rounded point / segment"""
+    if isinstance(shape, ConvexPolygon):
+        return shape.vertices, 0.0, shape.axes
+    if isinstance(shape, pRect):
+        return (
+            np.array((shape.topleft, shape.topright, shape.bottomright, shape.bottomleft), dtype=float),
+            0.0,
+            _RECT_AXES,
+        )
+    if isinstance(shape, Circle):
+        return np.array(((shape.x, shape.y),)), shape.radius, _NO_AXES
+    return np.array((shape.a, shape.b)), shape.radius, shape.axis[None, :]
+
+
+def _get_round_axes(core: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Axes from a rounded core (point / segment) to the vertices of the other shape"""
+    if len(core) == 1:
+        d = other - core[0]
+    else:
+        d = np.array([v - closest_point_on_segment(core[0], core[1], v) for v in other])
+    lengths = np.hypot(d[:, 0], d[:, 1])
+    keep = lengths > 1e-12
+    return d[keep] / lengths[keep, None]
+
+
+def collide_sat(a, b) -> tuple:
+    """Any convex pair (polygon, rect, circle, capsule) -- SAT with the minimum translation"""
+    va, ra, axa = _get_sat_parts(a)
+    vb, rb, axb = _get_sat_parts(b)
+    axes = [axa, axb]
+    if ra:
+        axes.append(_get_round_axes(va, vb))
+    if rb:
+        axes.append(_get_round_axes(vb, va))
+    axes = np.concatenate(axes)
+    if not len(axes):
+        return None
+    pa = va @ axes.T
+    pb = vb @ axes.T
+    amin, amax = pa.min(axis=0) - ra, pa.max(axis=0) + ra
+    bmin, bmax = pb.min(axis=0) - rb, pb.max(axis=0) + rb
+    # distance to push a out of b -- backwards / forwards along each axis
+    back = amax - bmin
+    forward = bmax - amin
+    depth = np.minimum(back, forward)
+    if np.any(depth <= 0):
+        return None
+    i = int(np.argmin(depth))
+    sign = -1.0 if back[i] < forward[i] else 1.0
+    return (float(axes[i][0] * sign), float(axes[i][1] * sign), float(depth[i]))
+
+
+NARROWPHASE = {}  # (shape type, shape type): function(a, b) -> (normal x, normal y, depth)
+
+
+def register_narrowphase(type_a: type, type_b: type, func):
+    """Register the collision function for a pair of shape types"""
+    NARROWPHASE[(type_a, type_b)] = func
+
+
+def collide(a, b) -> tuple:
+    """Get the contact between two shapes -- (normal x, normal y, depth) pushing `a` out of `b`; None if apart"""
+    func = NARROWPHASE.get((type(a), type(b)))
+    if func:
+        return func(a, b)
+    func = NARROWPHASE.get((type(b), type(a)))
+    if func:
+        hit = func(b, a)
+        return (-hit[0], -hit[1], hit[2]) if hit else None
+    return collide_sat(a, b)
+
+
+register_narrowphase(pRect, pRect, collide_aabb_aabb)
+register_narrowphase(Circle, Circle, collide_circle_circle)
+register_narrowphase(Circle, pRect, collide_circle_aabb)
+register_narrowphase(Capsule, Circle, collide_capsule_circle)
+register_narrowphase(Capsule, Capsule, collide_capsule_capsule)
+register_narrowphase(ConvexPolygon, ConvexPolygon, collide_sat)
+register_narrowphase(ConvexPolygon, pRect, collide_sat)
+register_narrowphase(ConvexPolygon, Circle, collide_sat)
+register_narrowphase(ConvexPolygon, Capsule, collide_sat)
+register_narrowphase(Capsule, pRect, collide_sat)
+
+
+# ------------------------------------------------------------ #
+# raycasting - grid traversal + ray vs shape dispatch
+# ------------------------------------------------------------ #
+
+def iterate_grid_ray(ox: float, oy: float, dx: float, dy: float, distance: float, cellw: int, cellh: int):
+    """Iterate the grid cells a ray passes through in order (DDA) -- (cx, cy, entry distance); direction is normalized"""
+    cx, cy = int(ox // cellw), int(oy // cellh)
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    delta_x = cellw / abs(dx) if dx else math.inf
+    delta_y = cellh / abs(dy) if dy else math.inf
+    next_x = ((cx + (dx > 0)) * cellw - ox) / dx if dx else math.inf
+    next_y = ((cy + (dy > 0)) * cellh - oy) / dy if dy else math.inf
+    t = 0.0
+    while t <= distance:
+        yield cx, cy, t
+        if next_x < next_y:
+            t = next_x
+            cx += step_x
+            next_x += delta_x
+        else:
+            t = next_y
+            cy += step_y
+            next_y += delta_y
+
+
+def ray_aabb(rect: pRect, ox: float, oy: float, dx: float, dy: float, distance: float) -> tuple:
+    """Ray vs rect (slabs) -- (distance, normal x, normal y) or None"""
+    if rect.left <= ox <= rect.right and rect.top <= oy <= rect.bottom:
+        return (0.0, 0.0, 0.0)
+    t_near, t_far = -math.inf, math.inf
+    nx = ny = 0.0
+    for o, d, lo, hi, axis in ((ox, dx, rect.left, rect.right, 0), (oy, dy, rect.top, rect.bottom, 1)):
+        if d == 0:
+            if o < lo or o > hi:
+                return None
+            continue
+        t1, t2 = (lo - o) / d, (hi - o) / d
+        n = -1.0 if d > 0 else 1.0
+        if t1 > t2:
+            t1, t2 = t2, t1
+        if t1 > t_near:
+            t_near = t1
+            nx, ny = (n, 0.0) if axis == 0 else (0.0, n)
+        t_far = min(t_far, t2)
+    if t_near > t_far or t_near < 0 or t_near > distance:
+        return None
+    return (t_near, nx, ny)
+
+
+def ray_circle(circle: Circle, ox: float, oy: float, dx: float, dy: float, distance: float) -> tuple:
+    """Ray vs circle -- (distance, normal x, normal y) or None"""
+    fx, fy = ox - circle.x, oy - circle.y
+    c = fx * fx + fy * fy - circle.radius * circle.radius
+    if c <= 0:
+        return (0.0, 0.0, 0.0)
+    b = fx * dx + fy * dy
+    disc = b * b - c
+    if b > 0 or disc < 0:
+        return None
+    t = -b - math.sqrt(disc)
+    if t > distance:
+        return None
+    px, py = ox + dx * t - circle.x, oy + dy * t - circle.y
+    return (t, px / circle.radius, py / circle.radius)
+
+
+def ray_segment(ax: float, ay: float, bx: float, by: float, ox: float, oy: float, dx: float, dy: float) -> float:
+    """Distance along a ray to a segment -- None if missed"""
+    ex, ey = bx - ax, by - ay
+    denom = dx * ey - dy * ex
+    if denom == 0:
+        return None
+    wx, wy = ax - ox, ay - oy
+    t = (wx * ey - wy * ex) / denom
+    s = (wx * dy - wy * dx) / denom
+    if t < 0 or s < 0 or s > 1:
+        return None
+    return t
+
+
+def ray_capsule(capsule: Capsule, ox: float, oy: float, dx: float, dy: float, distance: float) -> tuple:
+    """Ray vs capsule -- the end circles + the two side segments"""
+    p = closest_point_on_segment(capsule.a, capsule.b, (ox, oy))
+    if (p[0] - ox) ** 2 + (p[1] - oy) ** 2 <= capsule.radius ** 2:
+        return (0.0, 0.0, 0.0)
+    best = None
+    for end in (capsule.a, capsule.b):
+        circle = Circle(capsule.radius)
+        circle.transform(float(end[0]), float(end[1]))
+        hit = ray_circle(circle, ox, oy, dx, dy, distance)
+        if hit and (best is None or hit[0] < best[0]):
+            best = hit
+    for side in (1.0, -1.0):
+        n = capsule.axis * side
+        a, b = capsule.a + n * capsule.radius, capsule.b + n * capsule.radius
+        t = ray_segment(float(a[0]), float(a[1]), float(b[0]), float(b[1]), ox, oy, dx, dy)
+        if t is not None and t <= distance and (best is None or t < best[0]):
+            best = (t, float(n[0]), float(n[1]))
+    return best
+
+
+def ray_polygon(polygon: ConvexPolygon, ox: float, oy: float, dx: float, dy: float, distance: float) -> tuple:
+    """Ray vs convex polygon (Cyrus-Beck clipping against every edge)"""
+    v = polygon.vertices
+    edges = np.roll(v, -1, axis=0) - v
+    normals = np.column_stack((edges[:, 1], -edges[:, 0]))
+    # point every normal away from the center
+    normals[np.einsum("ij,ij->i", normals, v.mean(axis=0) - v) > 0] *= -1
+    t_near, t_far, hit = 0.0, distance, None
+    for (px, py), (nx, ny) in zip(v.tolist(), normals.tolist()):
+        num = nx * (px - ox) + ny * (py - oy)
+        den = nx * dx + ny * dy
+        if den == 0:
+            if num < 0:
+                return None
+            continue
+        t = num / den
+        if den < 0:
+            if t > t_near:
+                t_near, hit = t, (nx, ny)
+        else:
+            t_far = min(t_far, t)
+        if t_near > t_far:
+            return None
+    if hit is None:
+        return (0.0, 0.0, 0.0)
+    length = math.hypot(hit[0], hit[1])
+    return (t_near, hit[0] / length, hit[1] / length)
+
+
+RAYCASTS = {}  # shape type: function(shape, ox, oy, dx, dy, distance) -> (distance, normal x, normal y)
+
+
+def register_raycast(shape_type: type, func):
+    """Register the ray test for a shape type"""
+    RAYCASTS[shape_type] = func
+
+
+def raycast_shape(shape, ox: float, oy: float, dx: float, dy: float, distance: float) -> tuple:
+    """Cast a ray (normalized direction) against a shape -- (distance, normal x, normal y); zeros if it starts inside"""
+    return RAYCASTS[type(shape)](shape, ox, oy, dx, dy, distance)
+
+
+register_raycast(pRect, ray_aabb)
+register_raycast(Circle, ray_circle)
+register_raycast(Capsule, ray_capsule)
+register_raycast(ConvexPolygon, ray_polygon)
+
+
+# ------------------------------------------------------------ #
+# swept AABB - continuous collision
+# ------------------------------------------------------------ #
+
+SWEEP_EPSILON = 1e-7
+
+def sweep_aabb(box: tuple, dx: float, dy: float, other) -> tuple:
+    """
+    Swept AABB test
+    - box: (left, top, right, bottom) moving by (dx, dy)
+    - other: static rect
+    - returns (time of impact 0..1, normal x, normal y) of the first contact -- None if no hit
+    """
+    left, top, right, bottom = box
+    # x axis entry + exit times
+    if dx > 0:
+        tx_entry = (other.left - right) / dx
+        tx_exit = (other.right - left) / dx
+    elif dx < 0:
+        tx_entry = (other.right - left) / dx
+        tx_exit = (other.left - right) / dx
+    elif right <= other.left or left >= other.right:
+        return None
+    else:
+        tx_entry, tx_exit = -math.inf, math.inf
+    # y axis entry + exit times
+    if dy > 0:
+        ty_entry = (other.top - bottom) / dy
+        ty_exit = (other.bottom - top) / dy
+    elif dy < 0:
+        ty_entry = (other.bottom - top) / dy
+        ty_exit = (other.top - bottom) / dy
+    elif bottom <= other.top or top >= other.bottom:
+        return None
+    else:
+        ty_entry, ty_exit = -math.inf, math.inf
+    entry = max(tx_entry, ty_entry)
+    exit = min(tx_exit, ty_exit)
+    # no hit | already overlapping (left to depenetration) | hit after this move
+    if entry > exit or entry < -SWEEP_EPSILON or entry >= 1 or exit <= 0:
+        return None
+    if tx_entry > ty_entry:
+        return (max(entry, 0.0), -1.0 if dx > 0 else 1.0, 0.0)
+    return (max(entry, 0.0), 0.0, -1.0 if dy > 0 else 1.0)
+
+
+def overlap_aabb(box: tuple, other) -> tuple:
+    """
+    AABB depenetration
+    - box: (left, top, right, bottom) overlapping a static rect
+    - returns (normal x, normal y, depth) of the shortest push out -- None if they only touch
+    """
+    left, top, right, bottom = box
+    # push depth out of each face
+    pl, pr = right - other.left, other.right - left
+    pt, pb = bottom - other.top, other.bottom - top
+    if min(pl, pr, pt, pb) <= SWEEP_EPSILON:
+        return None
+    nx, dx = (-1.0, pl) if pl < pr else (1.0, pr)
+    ny, dy = (-1.0, pt) if pt < pb else (1.0, pb)
+    if dx < dy:
+        return (nx, 0.0, dx)
+    return (0.0, ny, dy)
+
+
+def get_swept_rect(box: tuple, dx: float, dy: float) -> pRect:
+    """Get the rect covering a box over its whole move -- for broadphase queries"""
+    left = math.floor(min(box[0], box[0] + dx))
+    top = math.floor(min(box[1], box[1] + dy))
+    right = math.ceil(max(box[2], box[2] + dx))
+    bottom = math.ceil(max(box[3], box[3] + dy))
+    return pRect(left, top, right - left, bottom - top)
+
+
+# ------------------------------------------------------------ #
+# broadphase - uniform grid spatial hash
+# ------------------------------------------------------------ #
+
+class SpatialHash:
+    """
+    Spatial Hash
+    - uniform grid of cells: (cx, cy) -> set of objects
+    - objects are registered in every cell their rect covers
+    - moving an object only touches cells when its covered cell range changes
+    """
+
+    def __init__(self, cellw: int, cellh: int):
+        """Create a spatial hash with a given cell size"""
+        # private
+        self._cells = {}  # (cx, cy): {objects}
+        self._objects = {}  # object: (x0, y0, x1, y1) cell range
+
+        # public
+        self.cellw = int(cellw)
+        self.cellh = int(cellh)
+
+    def get_cell_range(self, rect) -> tuple:
+        """Get the (inclusive) range of cells a rect covers"""
+        return (
+            rect.left // self.cellw,
+            rect.top // self.cellh,
+            max(rect.right - 1, rect.left) // self.cellw,
+            max(rect.bottom - 1, rect.top) // self.cellh,
+        )
+
+    def _add_cells(self, obj, cell_range: tuple):
+        """Register an object in a range of cells"""
+        for cx in range(cell_range[0], cell_range[2] + 1):
+            for cy in range(cell_range[1], cell_range[3] + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    cell = self._cells[(cx, cy)] = set()
+                cell.add(obj)
+
+    def _remove_cells(self, obj, cell_range: tuple):
+        """Unregister an object from a range of cells"""
+        for cx in range(cell_range[0], cell_range[2] + 1):
+            for cy in range(cell_range[1], cell_range[3] + 1):
+                cell = self._cells[(cx, cy)]
+                cell.discard(obj)
+                if not cell:
+                    del self._cells[(cx, cy)]
+
+    def insert(self, obj, rect):
+        """Insert (or move) an object"""
+        self.update(obj, rect)
+
+    def update(self, obj, rect):
+        """Update the cells an object occupies -- only touches cells if they changed"""
+        cell_range = self.get_cell_range(rect)
+        old = self._objects.get(obj)
+        if old == cell_range:
+            return
+        if old is not None:
+            self._remove_cells(obj, old)
+        self._add_cells(obj, cell_range)
+        self._objects[obj] = cell_range
+
+    def remove(self, obj):
+        """Remove an object from the hash"""
+        old = self._objects.pop(obj, None)
+        if old is not None:
+            self._remove_cells(obj, old)
+
+    def get_cell(self, cx: int, cy: int) -> set:
+        """Get the objects registered in one cell"""
+        return self._cells.get((cx, cy), ())
+
+    def query(self, rect) -> set:
+        """Get all objects registered in the cells a rect covers"""
+        result = set()
+        x0, y0, x1, y1 = self.get_cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell:
+                    result.update(cell)
+        return result
+
+    def clear(self):
+        """Clear the hash"""
+        self._cells.clear()
+        self._objects.clear()
+
+    def __contains__(self, obj):
+        """Check if an object is in the hash"""
+        return obj in self._objects
+
+    def __len__(self):
+        """Get the number of objects in the hash"""
+        return len(self._objects)
 
 
 # ------------------------------------------------------------ #
 # particle handling + physics
 # ------------------------------------------------------------ #
 
+class ParticleBuffer:
+    """
+    ParticleBuffer
+    - struct-of-arrays particle storage in preallocated NumPy arrays
+    - positions, velocities (N, 2) | life, angles, spins, radii (N,) | colors (N, 3) uint8
+    - live particles are packed into the first `count` rows
+    - dead particles are swap-removed -- live rows from the tail fill the holes
+    - capacity: initial array size -- the arrays grow as required
+    - max_count: cap on live particles -- extra emitted particles are dropped (None == no limit)
+    """
+
+    FIELDS = ("positions", "velocities", "life", "angles", "spins", "radii", "colors")
+
+    def __init__(self, capacity: int = 1024, max_count: int = None):
+        """Create a particle buffer"""
+        # public
+        self.capacity = max(int(capacity), 1)
+        self.max_count = max_count
+        self.count = 0
+        self.dropped = 0  # particles dropped by the cap
+        self.positions = np.zeros((self.capacity, 2))
+        self.velocities = np.zeros((self.capacity, 2))
+        self.life = np.zeros(self.capacity)
+        self.angles = np.zeros(self.capacity)
+        self.spins = np.zeros(self.capacity)
+        self.radii = np.zeros(self.capacity)
+        self.colors = np.zeros((self.capacity, 3), dtype=np.uint8)
+
+    def _grow(self, capacity: int):
+        """Grow the arrays -- keeps the live particles"""
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            arr = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            arr[: self.count] = old[: self.count]
+            setattr(self, name, arr)
+        self.capacity = capacity
+
+    def emit(
+        self,
+        count: int,
+        position,
+        velocity=(0, 0),
+        life=1.0,
+        color=(255, 255, 255),
+        angle=0.0,
+        spin=0.0,
+        radius=1.0,
+    ) -> slice:
+        """Add `count` particles -- every value is broadcast (a single value or one per particle)"""
+        if self.max_count is not None and self.count + count > self.max_count:
+            kept = max(self.max_count - self.count, 0)
+            self.dropped += count - kept
+            # per-particle values only keep the rows that fit
+            position, velocity, life, color, angle, spin, radius = (
+                value[:kept] if np.ndim(value) == getattr(self, name).ndim else value
+                for name, value in zip(
+                    ("positions", "velocities", "life", "colors", "angles", "spins", "radii"),
+                    (position, velocity, life, color, angle, spin, radius),
+                )
+            )
+            count = kept
+        if count <= 0:
+            return slice(self.count, self.count)
+        if self.count + count > self.capacity:
+            capacity = self.capacity
+            while capacity < self.count + count:
+                capacity *= 2
+            self._grow(capacity)
+        s = slice(self.count, self.count + count)
+        self.positions[s] = position
+        self.velocities[s] = velocity
+        self.life[s] = life
+        self.colors[s] = color
+        self.angles[s] = angle
+        self.spins[s] = spin
+        self.radii[s] = radius
+        self.count += count
+        return s
+
+    def integrate(self, dt: float = 1.0, acceleration=None):
+        """Move (+ accelerate) every live particle"""
+        n = self.count
+        if acceleration is not None:
+            self.velocities[:n] += np.asarray(acceleration) * dt
+        self.positions[:n] += self.velocities[:n] * dt
+        self.angles[:n] += self.spins[:n] * dt
+
+    def age(self, dt: float):
+        """Reduce the life of every live particle"""
+        self.life[: self.count] -= dt
+
+    def remove_dead(self) -> int:
+        """Swap-remove all particles with life <= 0 -- returns the number removed"""
+        n = self.count
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if not len(dead):
+            return 0
+        k = n - len(dead)
+        # holes in the kept range are filled by live particles from the tail
+        holes = dead[dead < k]
+        if len(holes):
+            tail = np.flatnonzero(self.life[k:n] > 0) + k
+            for name in self.FIELDS:
+                arr = getattr(self, name)
+                arr[holes] = arr[tail]
+        self.count = k
+        return len(dead)
+
+    def clear(self):
+        """Remove all particles"""
+        self.count = 0
+
+    def __len__(self):
+        """Get the number of live particles"""
+        return self.count
+
+
+# ------------------------------ #
+# batched particle drawing
+
+_DISC_OFFSETS = {}  # radius: (dx, dy) arrays
+
+
+def _get_disc_offsets(radius: int) -> tuple:
+    """Get the pixel offsets of a filled disc -- same coverage as `pygame.draw.circle` for small radii"""
+    if radius not in _DISC_OFFSETS:
+        r = np.arange(-radius, max(radius, 1))
+        dx, dy = np.meshgrid(r, r, indexing="ij")
+        # pixel centers inside the circle
+        mask = (dx + 0.5) ** 2 + (dy + 0.5) ** 2 <= max(radius, 0.5) ** 2
+        _DISC_OFFSETS[radius] = (dx[mask], dy[mask])
+    return _DISC_OFFSETS[radius]
+
+
+def _use_gpu_particles(surface) -> bool:
+    """Check if particles drawn to a surface go through the instanced gl renderer (`mgl.ParticleRenderer`, opt-in)"""
+    return SORA.MODERNGL and surface is SORA.FRAMEBUFFER and SORA.mgl.ParticleRenderer.ENABLED
+
+
+def map_colors(surface, colors: np.ndarray) -> np.ndarray:
+    """Map (N, 3) rgb colors to the pixel values of a 32 bit surface -- opaque"""
+    rs, gs, bs, _ = surface.get_shifts()
+    amask = surface.get_masks()[3]
+    c = colors.astype(np.uint32)
+    return (c[:, 0] << rs) | (c[:, 1] << gs) | (c[:, 2] << bs) | np.uint32(amask)
+
+
+def draw_particle_circles(particles: ParticleBuffer, surface):
+    """
+    Draw every live particle as a filled circle -- stamped into the surface pixels at once
+    - with `mgl.ParticleRenderer` enabled, framebuffer particles are queued + drawn over the whole frame instead
+    """
+    n = particles.count
+    if not n:
+        return
+    if _use_gpu_particles(surface):
+        return SORA.mgl.ParticleRenderer.submit(particles)
+    if surface.get_bytesize() != 4:
+        for pos, color, r in zip(
+            particles.positions[:n].tolist(),
+            particles.colors[:n].tolist(),
+            particles.radii[:n].tolist(),
+        ):
+            pgdraw.circle(surface, color, pos, r)
+        return
+    w, h = surface.get_size()
+    pos = np.floor(particles.positions[:n]).astype(np.int64)
+    radii = particles.radii[:n].astype(np.int64)
+    mapped = map_colors(surface, particles.colors[:n])
+    pixels = surfarray.pixels2d(surface)
+    # row major view of the pixels -- 1d index writes are a lot cheaper
+    flat = pixels.T.reshape(-1) if pixels.strides == (4, 4 * w) else None
+    for radius in np.unique(radii).tolist():
+        sel = radii == radius
+        x, y, c = pos[sel, 0], pos[sel, 1], mapped[sel]
+        dx, dy = _get_disc_offsets(radius)
+        # discs fully inside the surface -- stamped one offset at a time
+        inner = (x >= radius) & (x < w - radius) & (y >= radius) & (y < h - radius)
+        xi, yi, ci = x[inner], y[inner], c[inner]
+        base = yi * w + xi
+        for ox, oy in zip(dx.tolist(), dy.tolist()):
+            if flat is not None:
+                flat[base + (oy * w + ox)] = ci
+            else:
+                pixels[xi + ox, yi + oy] = ci
+        # discs crossing the border -- clipped per pixel
+        edge = ~inner & (x > -radius - 1) & (x < w + radius) & (y > -radius - 1) & (y < h + radius)
+        if edge.any():
+            xe = (x[edge, None] + dx).ravel()
+            ye = (y[edge, None] + dy).ravel()
+            ce = np.repeat(c[edge], len(dx))
+            keep = (xe >= 0) & (xe < w) & (ye >= 0) & (ye < h)
+            pixels[xe[keep], ye[keep]] = ce[keep]
+    del flat, pixels
+
+
+def get_particle_polygons(particles: ParticleBuffer, shape: np.ndarray) -> np.ndarray:
+    """Get the (N, K, 2) points of every live particle -- shape rotated by angle (degrees) + scaled by radius"""
+    n = particles.count
+    rad = np.radians(particles.angles[:n])
+    cos, sin = np.cos(rad)[:, None], np.sin(rad)[:, None]
+    sx, sy = shape[:, 0][None, :], shape[:, 1][None, :]
+    r = particles.radii[:n, None]
+    points = np.empty((n, len(shape), 2))
+    points[:, :, 0] = (sx * cos - sy * sin) * r + particles.positions[:n, 0, None]
+    points[:, :, 1] = (sx * sin + sy * cos) * r + particles.positions[:n, 1, None]
+    return points
+
+
+def draw_particle_polygons(particles: ParticleBuffer, shape: np.ndarray, surface, width: int = 1):
+    """
+    Draw every live particle as a polygon -- all points are computed in one batch
+    - with `mgl.ParticleRenderer` enabled, framebuffer particles are queued + drawn over the whole frame instead
+    """
+    if not particles.count:
+        return
+    if _use_gpu_particles(surface):
+        return SORA.mgl.ParticleRenderer.submit(particles, shape)
+    points = get_particle_polygons(particles, shape)
+    for color, pts in zip(particles.colors[: particles.count].tolist(), points.tolist()):
+        pgdraw.polygon(surface, color, pts, width)
+
+
+# ------------------------------ #
+# particle handler
+
 class ParticleHandler(Entity):
     # ------------------------------ #
     # functions for updating + creating particles
@@ -295,6 +1540,7 @@ class ParticleHandler(Entity):
     # class
 
     def __init__(self, args: dict = {}, max_particles: int = 100, create_func: str = None, update_func: str = None, create_timer_func: str = None, handler_type: str = None):
+        """Create a particle handler -- at most `max_particles` live particles (None == no limit)"""
         super().__init__()
         if handler_type:
             create_func = handler_type if handler_type in self.CREATE else self.DEFAULT_CREATE
@@ -302,30 +1548,20 @@ class ParticleHandler(Entity):
             create_timer_func = handler_type if handler_type in self.TIMER_FUNC else self.DEFAULT_TIMER
         # private
         self._create = True
-        self._particles = {}
-        self._particle_count = 0
-        self._total_particles = 0
-        self._max_particles = max_particles
         self._data = {
             "interval": 0.1
         }
         self.args = args
         self._timer = 0
-        self._remove = []
         self._instant_death = False
 
         # public
+        self.particles = ParticleBuffer(max_particles or 1024, max_count=max_particles)
         self._function_data = [create_func, update_func, create_timer_func]
         self._create_timer_func = ParticleHandler.get_create_timer_funcion(name=create_timer_func)
         self._create_func = ParticleHandler.get_create_function(name=create_func)
         self._update_func = ParticleHandler.get_update_function(name=update_func)
     
-    def get_new_particle_id(self):
-        """Get a new particle id"""
-        self._particle_count += 1
-        self._total_particles += 1
-        return self._particle_count
-
     # ------------------------------ #
     @property
     def data(self):
@@ -386,12 +1622,11 @@ class ParticleHandler(Entity):
     
     def __len__(self):
         """Get the number of particles"""
-        return self._total_particles
+        return self.particles.count
 
-    def remove_particle(self, particle):
-        """Remove a particle"""
-        self._total_particles -= 1
-        self._remove.append(particle[-1])
+    def remove_particle(self, index):
+        """Remove a particle (or an array of particle indices) -- removed on the next `remove_dead`"""
+        self.particles.life[index] = 0
 
     def disable_particles(self):
         """Disable particles"""
@@ -406,13 +1641,8 @@ class ParticleHandler(Entity):
         """Update the Particle Handler"""
         # print(self._function_data)
         if self._create: self._create_timer_func(self, **self.args)
-        for particle in self._particles.values():
-            self._update_func(self, particle)
-        # remove timer
-        for i in self._remove:
-            del self._particles[i]
-        # self._particle_count -= len(self._remove) # when removing particles bad things happen
-        self._remove.clear()
+        # update functions run over all particles at once
+        self._update_func(self, self.particles)
 
     def kill(self):
         """Kill the particle handler"""
@@ -423,45 +1653,59 @@ class ParticleHandler(Entity):
         if not len(self):
             return super().kill()
 
+    def reset(self):
+        """Reset the particle handler -- keeps its particle functions + args"""
+        super().reset()
+        self._create = True
+        self._timer = 0
+        self.particles.clear()
+
 
 # ------------------------------ #
 # default for circle particles
-# attribs = [pos, vel, radius, color, life]
+# create functions emit `count` particles into `parent.particles`
+# update functions age + move + remove + draw all particles of a handler
 # create function
-def _default_create(parent, **kwargs):
+def _default_create(parent, count: int = 1, **kwargs):
     """Default create function for particles"""
-    return [parent.position.xy, 
-            kwargs["vel"] if "vel" in kwargs else pgmath.Vector2(random.random()-0.5, -5),
-            kwargs["radius"] if "radius" in kwargs else 2, 
-            kwargs["color"] if "color" in kwargs else (0, 0, 255),
-            kwargs["life"] if "life" in kwargs else 1.0,
-            parent.get_new_particle_id()]
+    if "vel" in kwargs:
+        vel = kwargs["vel"]
+    else:
+        vel = np.empty((count, 2))
+        vel[:, 0] = np.random.random(count) - 0.5
+        vel[:, 1] = -5
+    parent.particles.emit(
+        count,
+        (parent.position.x, parent.position.y),
+        velocity=vel,
+        radius=kwargs["radius"] if "radius" in kwargs else 2,
+        color=kwargs["color"] if "color" in kwargs else (0, 0, 255),
+        life=kwargs["life"] if "life" in kwargs else 1.0,
+    )
 
 # update function
-def _default_update(parent, particle):
+def _default_update(parent, particles: ParticleBuffer):
     """Default update function for particles"""
     # gravity
-    particle[1] += World2D.GRAVITY * SORA.DELTA
-    particle[4] -= SORA.DELTA
-    if particle[4] <= 0:
-        parent.remove_particle(particle)
-        return
+    n = particles.count
+    particles.velocities[:n] += World2D.GRAVITY * SORA.DELTA
+    particles.age(SORA.DELTA)
+    particles.remove_dead()
     # move
-    particle[0] += particle[1]
+    n = particles.count
+    particles.positions[:n] += particles.velocities[:n]
     # render
-    pgdraw.circle(SORA.FRAMEBUFFER, particle[3], particle[0], particle[2]) #, 1)
+    draw_particle_circles(particles, SORA.FRAMEBUFFER)
 
 # timer function
 def _default_timer(parent, **kwargs):
     """Default timer function for particles"""
     parent._timer += SORA.DELTA
     if parent._timer >= parent._data["interval"]:
-        # print(parent._function_data)
-        parent._timer = 0
-        particle = parent.create_func(parent, **parent.args)
-        # print("created particle")
-        parent._particles[particle[-1]] = particle
-        # print(parent._particle_count)
+        # one particle per elapsed interval
+        count = int(parent._timer // parent._data["interval"])
+        parent._timer -= count * parent._data["interval"]
+        parent.create_func(parent, count, **parent.args)
 
 # REGISTER default function
 ParticleHandler.register_particle_setting(ParticleHandler.DEFAULT_SETTING, _default_create, _default_update, _default_timer)
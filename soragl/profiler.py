@@ -0,0 +1,172 @@
+"""
+Profiler:
+- per-aspect, per-layer and per-phase frame timings
+- fixed-size ring buffers + p50/p95/p99 summaries
+- disabled by default; call sites only check `ENABLED` when off
+"""
+
+import time
+import math
+from array import array
+
+# ------------------------------------------------------------ #
+# globals
+# ------------------------------------------------------------ #
+
+ENABLED = False
+CAPACITY = 240
+
+# categories
+ASPECT = "aspect"
+LAYER = "layer"
+PHASE = "phase"
+
+# phases
+PHASE_EVENTS = "events"
+PHASE_SCENE = "scene update"
+PHASE_RENDER = "render"
+PHASE_GL_UPLOAD = "gl upload"
+PHASE_FLIP = "flip"
+PHASE_FRAME = "frame"
+
+TIMINGS = {}  # (category, name): RingBuffer
+
+clock = time.perf_counter
+
+
+# ------------------------------------------------------------ #
+# ring buffer
+# ------------------------------------------------------------ #
+
+class RingBuffer:
+    """
+    RingBuffer
+    - capacity: int
+    - keeps the last `capacity` samples (seconds) in a preallocated array
+    """
+
+    def __init__(self, capacity: int):
+        """Create a ring buffer"""
+        self._data = array("d", bytes(8 * capacity))
+        self._index = 0
+        self._count = 0
+        self.capacity = capacity
+        self.total = 0  # samples ever recorded
+
+    def add(self, value: float):
+        """Add a sample -- overwrites the oldest sample when full"""
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+
+    def samples(self) -> list:
+        """Get the stored samples (oldest first)"""
+        if self._count < self.capacity:
+            return list(self._data[: self._count])
+        return list(self._data[self._index :]) + list(self._data[: self._index])
+
+    def percentile(self, p: float, ordered: list = None) -> float:
+        """Get a percentile (nearest rank) of the stored samples"""
+        ordered = ordered if ordered is not None else sorted(self.samples())
+        if not ordered:
+            return 0.0
+        rank = max(math.ceil(p / 100 * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+    def histogram(self, bins: int = 10) -> tuple:
+        """Get (edges, counts) of the stored samples"""
+        values = self.samples()
+        if not values:
+            return [], []
+        low, high = min(values), max(values)
+        width = (high - low) / bins or 1.0
+        counts = [0] * bins
+        for v in values:
+            counts[min(int((v - low) / width), bins - 1)] += 1
+        return [low + width * i for i in range(bins + 1)], counts
+
+    def summary(self) -> dict:
+        """Get the summary of the stored samples -- in milliseconds"""
+        ordered = sorted(self.samples())
+        if not ordered:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "count": len(ordered),
+            "mean": sum(ordered) / len(ordered) * 1000,
+            "p50": self.percentile(50, ordered) * 1000,
+            "p95": self.percentile(95, ordered) * 1000,
+            "p99": self.percentile(99, ordered) * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+    def __len__(self):
+        """Get the number of stored samples"""
+        return self._count
+
+
+# ------------------------------------------------------------ #
+# functions
+# ------------------------------------------------------------ #
+
+def enable(capacity: int = None):
+    """Start recording timings"""
+    global ENABLED, CAPACITY
+    if capacity and capacity != CAPACITY:
+        CAPACITY = capacity
+        TIMINGS.clear()
+    ENABLED = True
+
+
+def disable():
+    """Stop recording timings"""
+    global ENABLED
+    ENABLED = False
+
+
+def toggle():
+    """Toggle recording timings"""
+    if ENABLED:
+        disable()
+    else:
+        enable()
+
+
+def reset():
+    """Clear all recorded timings"""
+    TIMINGS.clear()
+
+
+def record(category: str, name: str, seconds: float):
+    """Record a timing sample"""
+    buf = TIMINGS.get((category, name))
+    if buf is None:
+        buf = TIMINGS[(category, name)] = RingBuffer(CAPACITY)
+    buf.add(seconds)
+
+
+def get_timings(category: str, name: str) -> RingBuffer:
+    """Get the ring buffer for a timing"""
+    return TIMINGS.get((category, name))
+
+
+def summary(category: str = None) -> dict:
+    """Get the summaries of all (or one category of) timings"""
+    return {
+        key: buf.summary()
+        for key, buf in TIMINGS.items()
+        if category is None or key[0] == category
+    }
+
+
+def report(category: str = None) -> str:
+    """Format the timing summaries as a table"""
+    lines = [
+        f"{'category':<8} {'name':<32} {'count':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    ]
+    for (cat, name), s in sorted(summary(category).items()):
+        lines.append(
+            f"{cat:<8} {name:<32} {s['count']:>6} {s['mean']:>8.3f} {s['p50']:>8.3f} {s['p95']:>8.3f} {s['p99']:>8.3f} {s['max']:>8.3f}"
+        )
+    return "\n".join(lines)
@@ -3,11 +3,12 @@ import json
 import pygame
 
 import soragl as SORA
-from soragl import smath
+from soragl import smath, profiler, signal
 
 if SORA.DEBUG:
     print("Activating scene.py")
 from queue import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # ------------------------------------------------------------ #
 
@@ -26,19 +27,26 @@ class SceneHandler:
 
     @classmethod
     def pop_scene(cls, scene):
-        """Pop a scene from the stack"""
-        cls._STACK.pop()
+        """Pop a scene from the stack -- stops its aspect worker threads"""
+        cls._STACK.pop().shutdown()
 
     @classmethod
     def clear_stack(cls):
         """Clear the scene stack"""
+        for scene in cls._STACK:
+            scene.shutdown()
         cls._STACK.clear()
         CURRENT = None
 
     @classmethod
     def update(cls):
         """Update the current scene"""
+        timed = profiler.ENABLED
+        if timed:
+            st = profiler.clock()
         cls._STACK[-1].update()
+        if timed:
+            profiler.record(profiler.PHASE, profiler.PHASE_SCENE, profiler.clock() - st)
 
 # ------------------------------ #
 # scene - chunks
@@ -47,13 +55,11 @@ class Chunk:
     def __init__(self, x: int, y: int, world, options: dict):
         # private
         self._intrinstic_entities = set()
-        self._hash = f"{int(x)}-{int(y)}"
+        self._key = (int(x), int(y))
         self._world = world
         self._dev = {}
 
         # public
-        self.aq = []
-        self.rq = []
         cpw, cph = options["chunkpixw"], options["chunkpixh"]
         self.rect = pygame.Rect(x * cpw, y * cph, cpw, cph)
     
@@ -63,70 +69,354 @@ class Chunk:
     
     def _remove_entity(self, entity: "Entity"):
         """Remove an entity from the chunk"""
-        self._intrinstic_entities.remove(entity)
-    
-    def add_entity(self, entity: "Entity"):
-        """Add an entity to the chunk"""
-        self.aq.append(entity)
-    
-    def remove_entity(self, entity: "Entity"):
-        """Remove an entity from the chunk"""
-        self.rq.append(entity)
+        self._intrinstic_entities.discard(entity)
+
+    @property
+    def key(self) -> tuple:
+        """Get the chunk key -- (x, y) chunk coordinates"""
+        return self._key
 
     def __hash__(self):
         """Hash the chunk"""
-        return hash(self._hash)
+        return hash(self._key)
 
     def update(self):
         """Update the chunk"""
-        # add + remove entiites
-        for entity in self.aq:
-            self._add_entity(entity)
-        # print(self._hash, self.rq, self._intrinstic_entities)
-        for entity in self.rq:
-            if entity not in self._intrinstic_entities:
-                # print(entity.c_chunk, self._hash)
-                continue
-            self._remove_entity(entity)
-        self.aq.clear()
-        self.rq.clear()
-        # update all intrinstic entities
+        # membership changes are applied by the scene `CommandBuffer`
         for entity in self._intrinstic_entities:
             self._world._scene._global_entities[entity].update()
 
+# ------------------------------ #
+# scene - archetypes
+
+class Archetype:
+    """
+    Archetype
+    - groups all entities that share the exact same component signature
+    - components are stored in packed per-component columns (row i == entities[i])
+    """
+
+    def __init__(self, signature: frozenset):
+        # private
+        self._rows = {}  # entity: row
+        self._add_edges = {}  # comp_hash: Archetype
+        self._remove_edges = {}  # comp_hash: Archetype
+
+        # public
+        self.signature = signature
+        self.entities = []
+        self.columns = {comp_hash: [] for comp_hash in signature}
+
+    def __len__(self):
+        """Get the number of entities in the archetype"""
+        return len(self.entities)
+
+    def __contains__(self, entity):
+        """Check if an entity is stored in the archetype"""
+        return entity in self._rows
+
+    def add_entity(self, entity, components: dict):
+        """Append an entity + its components to the columns"""
+        self._rows[entity] = len(self.entities)
+        self.entities.append(entity)
+        for comp_hash, column in self.columns.items():
+            column.append(components[comp_hash])
+
+    def remove_entity(self, entity):
+        """Swap-remove an entity from the columns"""
+        row = self._rows.pop(entity)
+        last = len(self.entities) - 1
+        if row != last:
+            moved = self.entities[last]
+            self.entities[row] = moved
+            self._rows[moved] = row
+            for column in self.columns.values():
+                column[row] = column[last]
+        self.entities.pop()
+        for column in self.columns.values():
+            column.pop()
+
+    def set_component(self, entity, comp_hash: int, component):
+        """Replace a component in place"""
+        self.columns[comp_hash][self._rows[entity]] = component
+
+    def get_column(self, comp_hash: int) -> list:
+        """Get a packed component column"""
+        return self.columns[comp_hash]
+
+
+# ------------------------------ #
+# scene - queries
+
+class Query:
+    """
+    Query
+    - all_of: entities must have every one of these components
+    - any_of: entities must have at least one of these components (if any given)
+    - none_of: entities must have none of these components
+
+    queries are matched against archetypes -- the world caches the matching
+    archetypes for each query and extends the cache as new archetypes appear
+    """
+
+    def __init__(self, all_of: list = (), any_of: list = (), none_of: list = ()):
+        """Create a query from component classes"""
+        self.all_of = frozenset(hash(x) for x in all_of)
+        self.any_of = frozenset(hash(x) for x in any_of)
+        self.none_of = frozenset(hash(x) for x in none_of)
+        self._key = (self.all_of, self.any_of, self.none_of)
+
+    def matches(self, signature: frozenset) -> bool:
+        """Check if an archetype signature matches the query"""
+        return (
+            self.all_of <= signature
+            and (not self.any_of or not self.any_of.isdisjoint(signature))
+            and self.none_of.isdisjoint(signature)
+        )
+
+    def __eq__(self, o):
+        """Queries with the same filters are equal"""
+        return isinstance(o, Query) and self._key == o._key
+
+    def __hash__(self):
+        """Hash the query filters"""
+        return hash(self._key)
+
+
 # ------------------------------ #
 # scene - aspects
 
 class Aspect:
-    def __init__(self, target_component_class: list, priority: int = 0):
+    def __init__(self, target_component_class: list, priority: int = 0, query: Query = None):
         """Create a processor"""
         # defined after added to world
         self._world = None
         # variables
         self.priority = priority
-        self._targets = [
-            hash(x)
-            for x in (
-                target_component_class
-                if type(target_component_class) == list
-                else [target_component_class]
-            )
-        ]
+        targets = (
+            target_component_class
+            if type(target_component_class) == list
+            else [target_component_class]
+        )
+        self._targets = [hash(x) for x in targets]
+        # cached entity query -- defaults to entities with any of the targets
+        self._query = query if query else Query(any_of=targets)
+        # declared access -- None = undeclared (runs exclusively)
+        self.reads = None
+        self.writes = None
+        # fixed step aspects run once per world timestep (0..max_substeps times a frame)
+        self.fixed_step = False
 
     def on_add(self):
         """When added to the world"""
         pass
 
+    def declare_access(self, reads: list = (), writes: list = ()):
+        """Declare the components (or shared resources) this aspect reads + writes"""
+        self.reads = frozenset(hash(x) for x in reads)
+        self.writes = frozenset(hash(x) for x in writes)
+        if self._world:
+            self._world.scheduler.invalidate()
+        return self
+
+    def conflicts_with(self, other: "Aspect") -> bool:
+        """Check if two aspects cannot run at the same time"""
+        # undeclared aspects are exclusive
+        if self.writes is None or other.writes is None:
+            return True
+        return not (
+            self.writes.isdisjoint(other.writes)
+            and self.writes.isdisjoint(other.reads)
+            and self.reads.isdisjoint(other.writes)
+        )
+
+    def on_chunk_activated(self, chunk: Chunk):
+        """When a chunk enters the active window -- stream data in"""
+        pass
+
+    def on_chunk_deactivated(self, chunk: Chunk):
+        """When a chunk leaves the active window -- stream data out"""
+        pass
+
     def handle(self, *args, **kwargs):
         """base process function"""
         raise NotImplementedError("Process function not implemented")
 
+    @property
+    def query(self) -> Query:
+        """Get the aspect query"""
+        return self._query
+
+    @property
+    def delta(self) -> float:
+        """Get the time step -- the fixed world step for fixed step aspects, else the frame delta"""
+        if self.fixed_step and self._world:
+            return self._world.timestep.dt
+        return SORA.DELTA
+
     def iterate_entities(self):
-        """Iterate through the entities"""
-        # print(self._world._components[self._target])
-        for t in self._targets:
-            for entity in self._world._components[t]:
-                yield entity
+        """Iterate through the entities matching the query -- each entity once"""
+        for archetype in self._world.get_query_archetypes(self._query):
+            yield from archetype.entities
+
+    def iterate_components(self, comp_class=None):
+        """Iterate through (entity, component) pairs -- packed per archetype"""
+        comp_hash = hash(comp_class) if comp_class else self._targets[0]
+        for archetype in self._world.get_query_archetypes(self._query):
+            column = archetype.columns.get(comp_hash)
+            if column:
+                yield from zip(archetype.entities, column)
+
+# ------------------------------ #
+# scene - aspect scheduling
+
+# shared resources aspects can declare access to (besides component classes)
+RES_FRAMEBUFFER = "framebuffer"
+RES_DEBUGBUFFER = "debugbuffer"
+RES_TRANSFORMS = "transforms"
+RES_CHUNKS = "chunks"
+RES_CAMERA = "camera"
+
+# world._dev key of the aspect answering raycasts + shape queries
+DEV_QUERIES = "collision queries"
+
+
+class AspectScheduler:
+    """
+    Aspect Scheduler
+    - aspects are grouped into stages: an aspect runs after every earlier
+      (higher priority) aspect it conflicts with -- see `Aspect.declare_access`
+    - aspects within a stage run together on a thread pool
+    - `workers <= 1` runs every aspect serially in priority order (deterministic / debugging)
+
+    NOTE: structural changes (add/remove components + entities) go through the scene `CommandBuffer`
+    """
+
+    def __init__(self, workers: int = 0):
+        """Create an aspect scheduler"""
+        # private
+        self._stages = None
+        self._pool = None
+
+        # public
+        self.workers = workers
+
+    def invalidate(self):
+        """Rebuild the stages on the next run"""
+        self._stages = None
+
+    def build_stages(self, aspects: list) -> list:
+        """Group aspects into stages of non-conflicting aspects"""
+        stages = []
+        placed = []  # (aspect, stage)
+        for aspect in aspects:
+            stage = 0
+            for other, other_stage in placed:
+                if other_stage >= stage and aspect.conflicts_with(other):
+                    stage = other_stage + 1
+            placed.append((aspect, stage))
+            if stage == len(stages):
+                stages.append([])
+            stages[stage].append(aspect)
+        return stages
+
+    def get_stages(self, aspects: list) -> list:
+        """Get the (cached) stages"""
+        if self._stages is None:
+            self._stages = self.build_stages(aspects)
+        return self._stages
+
+    @staticmethod
+    def handle_aspect(aspect: "Aspect", steps: int = 1):
+        """Handle an aspect (`steps` times if fixed step) -- records its timing if the profiler is enabled"""
+        steps = steps if aspect.fixed_step else 1
+        if not profiler.ENABLED:
+            for _ in range(steps):
+                aspect.handle()
+            return
+        st = profiler.clock()
+        for _ in range(steps):
+            aspect.handle()
+        profiler.record(profiler.ASPECT, aspect.__class__.__name__, profiler.clock() - st)
+
+    def run(self, aspects: list, steps: int = 1):
+        """Handle all the aspects -- fixed step aspects run `steps` times"""
+        if self.workers <= 1:
+            for aspect in aspects:
+                self.handle_aspect(aspect, steps)
+            return
+        if not self._pool:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="soragl-aspect"
+            )
+        for stage in self.get_stages(aspects):
+            if len(stage) == 1:
+                self.handle_aspect(stage[0], steps)
+                continue
+            # wait for the whole stage -- re-raises errors from the workers
+            for future in [self._pool.submit(self.handle_aspect, aspect, steps) for aspect in stage]:
+                future.result()
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class FixedTimestep:
+    """
+    Fixed Timestep
+    - accumulates frame time + hands it out in fixed `dt` sized steps
+    - hz <= 0 disables fixed stepping: one step of the frame delta every frame
+    - max_substeps caps the steps per frame -- extra time is dropped (spiral of death guard)
+    - alpha: leftover fraction of a step -- used to interpolate rendering
+    """
+
+    def __init__(self, hz: float = 60, max_substeps: int = 5):
+        """Create a fixed timestep accumulator"""
+        # private
+        self._accumulator = 0.0
+
+        # public
+        self.hz = hz
+        self.dt = 1 / hz if hz > 0 else 0.0
+        self.max_substeps = max_substeps
+        self.steps = 0  # steps taken in the last frame
+        self.alpha = 1.0
+        self.dropped = 0.0  # seconds of simulation dropped by the guard
+
+    def set_rate(self, hz: float):
+        """Change the step rate"""
+        self.hz = hz
+        self.dt = 1 / hz if hz > 0 else 0.0
+        self._accumulator = 0.0
+
+    def advance(self, delta: float) -> int:
+        """Add a frame's time -- returns the number of steps to run"""
+        if self.hz <= 0:
+            self.dt = delta
+            self.steps = 1
+            self.alpha = 1.0
+            return 1
+        self._accumulator += delta
+        # small epsilon -- a delta of exactly `dt` always gives one step
+        steps = int(self._accumulator / self.dt + 1e-6)
+        if steps > self.max_substeps:
+            self.dropped += (steps - self.max_substeps) * self.dt
+            steps = self.max_substeps
+            self._accumulator = 0.0
+        else:
+            self._accumulator = max(self._accumulator - steps * self.dt, 0.0)
+        self.steps = steps
+        self.alpha = min(self._accumulator / self.dt, 1.0)
+        return steps
+
+    def reset(self):
+        """Clear the accumulated time"""
+        self._accumulator = 0.0
+        self.alpha = 1.0
+
 
 # ------------------------------ #
 # components
@@ -156,9 +446,13 @@ class Component:
         """When an added to an Entity"""
         pass
 
+    def on_remove(self):
+        """When removed from an Entity"""
+        pass
+
     def __hash__(self):
-        """Hash the component"""
-        return hash(self.__class__)
+        """Hash the component -- the class unless a hash was pre-loaded"""
+        return self.HASH
 
     def get_hash(self):
         """Get the pre-loaded hash"""
@@ -168,6 +462,22 @@ class Component:
 # ------------------------------ #
 # world class
 
+def _window_difference(a: tuple, b: tuple):
+    """Iterate the chunk keys inside window `a` but outside window `b` -- (x0, y0, x1, y1) inclusive"""
+    ax0, ay0, ax1, ay1 = a
+    bx0, by0, bx1, by1 = b
+    for x in range(ax0, ax1 + 1):
+        if bx0 <= x <= bx1:
+            # column overlaps -- only the rows above + below `b`
+            for y in range(ay0, min(ay1, by0 - 1) + 1):
+                yield (x, y)
+            for y in range(max(ay0, by1 + 1), ay1 + 1):
+                yield (x, y)
+        else:
+            for y in range(ay0, ay1 + 1):
+                yield (x, y)
+
+
 class World:
     """
     Acts as layers within a scene
@@ -181,20 +491,27 @@ class World:
         aspects: dict = {},
         chunks: dict = {},
     ):
-        self._chunks = {}
+        self._chunks = {}  # (x, y): Chunk
         self._scene = scene
         self._active_chunks = set()
         self._aspects = []
-        self._components = {}  # comp_hash: {entities} (set)
+        self._archetypes = {}  # signature (frozenset): Archetype
+        self._components = {}  # comp_hash: [archetypes]
+        self._entity_archetypes = {}  # entity: Archetype
+        self._queries = {}  # Query: [archetypes]
         self._options = options
-        self._remove_c_ = []
         # rendering
         self._center_chunk = [0, 0]
+        self._active_window = None  # (x0, y0, x1, y1) -- inclusive chunk bounds
         self._dev = {}
 
         # variables
         self.render_distance = options["render_distance"]
-        self.aspect_times = {}
+        self.name = "world"
+        self.scheduler = AspectScheduler(options.get("aspect_workers", 0))
+        self.timestep = FixedTimestep(
+            options.get("physics_hz", 60), options.get("physics_max_substeps", 5)
+        )
 
         # add data to buffer
         for i, j in aspects.items():
@@ -220,15 +537,15 @@ class World:
         self._scene.add_entity(entity)
         return entity
 
+    @property
+    def commands(self) -> "CommandBuffer":
+        """Get the scene command buffer"""
+        return self._scene.commands
+
     def update_entity_chunk(self, entity, old, new):
         """Update the chunk intrinsic properties for entities"""
-        ochunk = self.get_chunk(old[0], old[1])
-        nchunk = self.get_chunk(new[0], new[1])
-        # print(entity, old, new)
-        # ochunk
-        # print('moved', entity, 'from', old, 'to', new)
-        ochunk.remove_entity(entity)
-        nchunk.add_entity(entity)
+        # chunk membership moves with the next command flush
+        self._scene.commands.move_chunk(entity, tuple(old), tuple(new))
         # update entity
         entity.c_chunk[0], entity.c_chunk[1] = new
 
@@ -245,65 +562,174 @@ class World:
             for entity in self._chunks[chunk]._intrinstic_entities:
                 yield self._scene.get_entity(entity)
 
+    # == archetypes
+    def get_archetype(self, signature: frozenset) -> Archetype:
+        """Get (or create) the archetype for a component signature"""
+        if signature in self._archetypes:
+            return self._archetypes[signature]
+        archetype = Archetype(signature)
+        self._archetypes[signature] = archetype
+        for comp_hash in signature:
+            if comp_hash not in self._components:
+                self._components[comp_hash] = []
+            self._components[comp_hash].append(archetype)
+        # extend cached queries
+        for query, archetypes in self._queries.items():
+            if query.matches(signature):
+                archetypes.append(archetype)
+        return archetype
+
+    def get_query_archetypes(self, query: Query) -> list:
+        """Get the (cached) archetypes matching a query"""
+        archetypes = self._queries.get(query)
+        if archetypes is None:
+            archetypes = self._queries[query] = [
+                a for a in self._archetypes.values() if query.matches(a.signature)
+            ]
+        return archetypes
+
+    def iterate_query(self, query: Query):
+        """Iterate through the entities matching a query"""
+        for archetype in self.get_query_archetypes(query):
+            yield from archetype.entities
+
+    def _move_entity_archetype(self, entity, archetype: Archetype):
+        """Move an entity (+ its components) into a new archetype"""
+        old = self._entity_archetypes.get(entity)
+        if old is not None:
+            old.remove_entity(entity)
+        if not archetype.signature:
+            self._entity_archetypes.pop(entity, None)
+            return
+        archetype.add_entity(entity, entity._components)
+        self._entity_archetypes[entity] = archetype
+
+    def iterate_component_columns(self, comp_hash: int):
+        """Iterate (entities, column) pairs of every archetype that holds a component"""
+        if comp_hash not in self._components:
+            return
+        for archetype in self._components[comp_hash]:
+            if archetype.entities:
+                yield archetype.entities, archetype.columns[comp_hash]
+
     # == comps
     def add_component(self, entity, component):
-        """Add a component to an entity in the world"""
+        """Add a component to an entity -- deferred to the next command flush once the entity has spawned"""
+        if entity._spawned:
+            self._scene.commands.add_component(entity, component)
+            return
+        self._add_component(entity, component)
+
+    def _add_component(self, entity, component):
+        """Add a component to an entity + move it to its new archetype"""
         comp_hash = hash(component)
-        comp_id = id(component)
-        # print(component.__class__.__name__, comp_hash)
-        if comp_hash not in self._components:
-            self._components[comp_hash] = set()
-        # find parent classes
-        self._components[comp_hash].add(entity)
+        old = self._entity_archetypes.get(entity)
         # add to entity -- using unique id
         entity._components[comp_hash] = component
         # component parent = entity
         component._entity = entity
+        if old is not None and comp_hash in old.signature:
+            # same component type -- replace in place
+            old.set_component(entity, comp_hash, component)
+        else:
+            signature = old.signature if old is not None else frozenset()
+            if old is not None and comp_hash in old._add_edges:
+                archetype = old._add_edges[comp_hash]
+            else:
+                archetype = self.get_archetype(signature | {comp_hash})
+                if old is not None:
+                    old._add_edges[comp_hash] = archetype
+            self._move_entity_archetype(entity, archetype)
         component.on_add()
 
     def remove_component(self, entity: "Entity", comp: "Component"):
         """Remove a component from an entity"""
         comp_hash = hash(comp)
-        comp_id = id(comp)
         if comp_hash in self._components:
-            self._remove_c_.append((entity, comp))
+            self._scene.commands.remove_component(entity, comp_hash)
+
+    def _remove_component(self, entity, comp_hash: int):
+        """Remove a component from an entity + move it to its new archetype"""
+        if comp_hash not in entity._components:
+            return
+        old = self._entity_archetypes.get(entity)
+        entity._components.pop(comp_hash).on_remove()
+        if old is None:
+            return
+        if comp_hash in old._remove_edges:
+            archetype = old._remove_edges[comp_hash]
+        else:
+            archetype = self.get_archetype(old.signature - {comp_hash})
+            old._remove_edges[comp_hash] = archetype
+        self._move_entity_archetype(entity, archetype)
 
     # == chunks
     def add_chunk(self, chunk):
         """Add chunks to the world"""
-        self._chunks[hash(chunk)] = chunk
+        self._chunks[chunk.key] = chunk
 
     def remove_chunk(self, chunk: Chunk):
         """Remove a chunk"""
-        h = hash(chunk)
-        if h in self._chunks:
-            return self._chunks.pop(h)
+        return self._chunks.pop(chunk.key, None)
 
     def set_center_chunk(self, x: int, y: int):
         """Set the center chunk for rendering"""
+        x, y = int(x), int(y)
         self._center_chunk[0] = x
         self._center_chunk[1] = y
-        # update active chunks
-        self._active_chunks.clear()
-        for i in range(
-            self._center_chunk[0] - self.render_distance,
-            self._center_chunk[0] + self.render_distance + 1,
-        ):
-            for j in range(
-                self._center_chunk[1] - self.render_distance,
-                self._center_chunk[1] + self.render_distance + 1,
-            ):
-                self._active_chunks.add(hash(self.get_chunk(i, j)))
+        r = self.render_distance
+        window = (x - r, y - r, x + r, y + r)
+        old = self._active_window
+        if window == old:
+            return
+        self._active_window = window
+        # update active chunks -- only the strips entering / leaving the window
+        if old is not None:
+            for key in tuple(_window_difference(old, window)):
+                self._active_chunks.discard(key)
+                chunk = self._chunks.get(key)
+                if chunk is not None:
+                    self._chunk_deactivated(chunk)
+            entering = _window_difference(window, old)
+        else:
+            entering = (
+                (i, j)
+                for i in range(window[0], window[2] + 1)
+                for j in range(window[1], window[3] + 1)
+            )
+        for key in entering:
+            chunk = self.get_chunk_from_key(key)
+            self._active_chunks.add(key)
+            self._chunk_activated(chunk)
+
+    def _chunk_activated(self, chunk: Chunk):
+        """Notify aspects that a chunk entered the active window"""
+        for aspect in self._aspects:
+            aspect.on_chunk_activated(chunk)
+
+    def _chunk_deactivated(self, chunk: Chunk):
+        """Notify aspects that a chunk left the active window"""
+        for aspect in self._aspects:
+            aspect.on_chunk_deactivated(chunk)
+
+    def find_chunk(self, x: int, y: int):
+        """Get a chunk if it exists -- does not create one"""
+        return self._chunks.get((int(x), int(y)))
 
     def get_chunk(self, x: int, y: int):
         """Get the chunk"""
-        x, y = int(x), int(y)
-        f = hash(f"{x}-{y}")
-        if f in self._chunks:
-            return self._chunks[f]
-        c = Chunk(x, y, self, self._options)
-        self._chunks[hash(c)] = c
-        return c
+        key = (int(x), int(y))
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = Chunk(key[0], key[1], self, self._options)
+        return chunk
+
+    def get_chunk_from_key(self, key: tuple):
+        """Get the chunk from an (x, y) integer key -- fast path, no conversions"""
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            chunk = self._chunks[key] = Chunk(key[0], key[1], self, self._options)
+        return chunk
 
     # == aspects
     def add_aspect(self, aspect):
@@ -311,10 +737,14 @@ class World:
         aspect._world = self
         self._aspects.append(aspect)
         aspect.on_add()
+        # stream in the chunks that are already active
+        for key in self._active_chunks:
+            aspect.on_chunk_activated(self._chunks[key])
         self._aspects.sort(key=lambda x: x.priority, reverse=True)
+        self.scheduler.invalidate()
         for ast in aspect._targets:
             if ast not in self._components:
-                self._components[ast] = set()
+                self._components[ast] = []
         # print("DEBUG: Aspect sorting", [x.priority for x in self._aspects])
         # print(self._aspects)
         # cache the components
@@ -338,23 +768,41 @@ class World:
 
     def remove_aspect(self, aspect_type):
         """Remove a processor -- all instnaces of the same type"""
-        for i in self._aspects:
+        for i in tuple(self._aspects):
             if isinstance(i, aspect_type):
                 del i._world
                 self._aspects.remove(i)
+        self.scheduler.invalidate()
+
+    # == collision queries
+    def get_query_handler(self):
+        """Get the aspect answering collision queries"""
+        handler = self._dev.get(DEV_QUERIES)
+        if not handler:
+            raise NotImplementedError(
+                "Please add a Collision2DAspect before running collision queries"
+            )
+        return handler
 
-    def handle_aspects(self):
-        """Handle the aspects"""
-        for i in self._aspects:
-            i.handle()
+    def raycast(self, origin, direction, distance: float, first: bool = False, ignore=None) -> list:
+        """Cast a ray -- [(collider, distance, normal)] sorted by distance"""
+        return self.get_query_handler().raycast(origin, direction, distance, first, ignore)
+
+    def segment_cast(self, start, end, first: bool = False, ignore=None) -> list:
+        """Cast a segment -- [(collider, distance, normal)] sorted by distance"""
+        return self.get_query_handler().segment_cast(start, end, first, ignore)
 
-    def handle_aspect_timed(self) -> list:
+    def query_point(self, point, ignore=None) -> list:
+        """Get the colliders containing a point"""
+        return self.get_query_handler().query_point(point, ignore)
+
+    def query_rect(self, rect, ignore=None) -> list:
+        """Get the colliders overlapping a rect -- sorted by distance to its center"""
+        return self.get_query_handler().query_rect(rect, ignore)
+
+    def handle_aspects(self):
         """Handle the aspects"""
-        for i in self._aspects:
-            st = SORA.get_time()
-            i.handle()
-            aspect_time = int(round((SORA.get_time() - st) * 1000, 3))
-            self.aspect_times[i.__class__.__name__] = aspect_time
+        self.scheduler.run(self._aspects, self.timestep.advance(SORA.DELTA))
 
     # == update
     def update(self):
@@ -376,12 +824,6 @@ class World:
             for y in ly:
                 pygame.draw.line(SORA.DEBUGBUFFER, (255, 0, 0), (0, y - SORA.iOFFSET[1]), (SORA.FSIZE[0], y - SORA.iOFFSET[1]), 1)
             # pygame.draw.rect(SORA.DEBUGBUFFER, (255, 0, 0), (cr.x - SORA.iOFFSET[0], cr.y - SORA.iOFFSET[1], cr.w, cr.h), 1)
-        # == update components
-        for i in self._remove_c_:
-            # print(i)
-            i[0].world._components[hash(i[1])].remove(i[0])
-            del i[0]._components[hash(i[1])]
-        self._remove_c_.clear()
         # == update aspects
         self.handle_aspects()
 
@@ -390,15 +832,140 @@ class World:
         self._chunks.clear()
         self._aspects.clear()
         self._ehandler.clear()
+        self.shutdown()
+
+    def shutdown(self):
+        """Stop the aspect worker threads -- restarted if the world is updated again"""
+        self.scheduler.invalidate()
+        self.scheduler.shutdown()
 
     def clear_cache(self):
         """Clear the cache"""
         self._components.clear()
+        self._archetypes.clear()
+        self._entity_archetypes.clear()
+        self._queries.clear()
 
     def __hash__(self):
         return id(self)
 
 
+# ------------------------------ #
+# scene - commands
+
+CMD_SPAWN = 0
+CMD_DESPAWN = 1
+CMD_ADD_COMPONENT = 2
+CMD_REMOVE_COMPONENT = 3
+CMD_MOVE_CHUNK = 4
+
+
+class CommandBuffer:
+    """
+    CommandBuffer
+    - records structural changes (spawn, despawn, add/remove component, move chunk)
+    - applied by the scene in one ordered batch at the start of each frame
+    - recording is a single `list.append` -- safe to call from parallel aspects
+    """
+
+    def __init__(self, scene):
+        """Create a command buffer"""
+        # private
+        self._scene = scene
+        self._commands = []
+
+        # public
+        self.applied = 0  # commands applied in the last flush
+        self.skipped = 0  # commands cancelled out in the last flush
+
+    def spawn(self, entity):
+        """Add an entity to its world chunk + call `on_ready`"""
+        self._commands.append((CMD_SPAWN, entity, None))
+
+    def despawn(self, entity):
+        """Remove an entity, its components + its linked entities"""
+        self._commands.append((CMD_DESPAWN, entity, None))
+
+    def add_component(self, entity, component):
+        """Add a component to an entity"""
+        self._commands.append((CMD_ADD_COMPONENT, entity, component))
+
+    def remove_component(self, entity, comp_hash: int):
+        """Remove a component (by hash) from an entity"""
+        self._commands.append((CMD_REMOVE_COMPONENT, entity, comp_hash))
+
+    def move_chunk(self, entity, old: tuple, new: tuple):
+        """Move an entity between chunks"""
+        self._commands.append((CMD_MOVE_CHUNK, entity, (old, new)))
+
+    def apply(self):
+        """Apply all recorded commands -- in order"""
+        self.applied = self.skipped = 0
+        # despawning can record more commands (linked entities)
+        while self._commands:
+            commands, self._commands = self._commands, []
+            self._apply(commands)
+
+    def _apply(self, commands: list):
+        """Apply one batch of commands"""
+        scene = self._scene
+        despawned = {e for op, e, _ in commands if op == CMD_DESPAWN}
+        # `c_chunk` already points at the pending new chunk -- despawns leave the old one
+        pending = {}
+        for op, entity, arg in commands:
+            if op == CMD_MOVE_CHUNK and entity in despawned:
+                pending.setdefault(entity, arg[0])
+        moves = {}  # entity: [first old chunk, last new chunk]
+        for op, entity, arg in commands:
+            if op == CMD_DESPAWN:
+                if entity not in scene._global_entities:
+                    self.skipped += 1
+                    continue
+                if entity in pending:
+                    old = pending.pop(entity)
+                    entity.world.get_chunk(old[0], old[1])._remove_entity(entity)
+                scene._remove_entity(entity)
+            elif entity in despawned:
+                # spawned / changed + killed in the same frame
+                self.skipped += 1
+                continue
+            elif op == CMD_MOVE_CHUNK:
+                if entity in moves:
+                    moves[entity][1] = arg[1]
+                    self.skipped += 1
+                else:
+                    moves[entity] = list(arg)
+                continue
+            elif op == CMD_SPAWN:
+                w = entity.world
+                w.get_chunk(
+                    entity.position.x // w._options["chunkpixw"],
+                    entity.position.y // w._options["chunkpixh"],
+                )._add_entity(entity)
+                entity._spawned = True
+                entity.on_ready()
+            elif op == CMD_ADD_COMPONENT:
+                entity.world._add_component(entity, arg)
+            elif op == CMD_REMOVE_COMPONENT:
+                entity.world._remove_component(entity, arg)
+            self.applied += 1
+        # only the net chunk change of each entity
+        for entity, (old, new) in moves.items():
+            if old != new:
+                w = entity.world
+                w.get_chunk(old[0], old[1])._remove_entity(entity)
+                w.get_chunk(new[0], new[1])._add_entity(entity)
+            self.applied += 1
+
+    def clear(self):
+        """Drop all recorded commands"""
+        self._commands.clear()
+
+    def __len__(self):
+        """Get the number of recorded commands"""
+        return len(self._commands)
+
+
 # ------------------------------ #
 # scene
 
@@ -414,13 +981,15 @@ class Scene:
 
         # adding entities
         self._global_entities = {}
-        self._new_entities = set()
-        self._remove_entities = set()
 
-    def make_layer(self, config: dict, priority: int = 0, **kwargs):
+        # === public
+        self.commands = CommandBuffer(self)
+
+    def make_layer(self, config: dict, priority: int = 0, name: str = None, **kwargs):
         """Add a layer to the scene"""
         layer = World(self, config, priority, **kwargs)
         layer.priority = priority
+        layer.name = name if name else f"layer{len(self._layers)}"
         self._layers.append(layer)
         self._layers.sort(key=lambda x: x.priority, reverse=True)
         return layer
@@ -430,17 +999,12 @@ class Scene:
         entity.scene = self
         # IMPORTANT: added but should not be updatable!!
         self._global_entities[entity] = entity
-        self._new_entities.add(entity)
+        self.commands.spawn(entity)
 
     def remove_entity(self, entity):
         """Remove an entity from the scene"""
-        # remove from global entities
         if entity in self._global_entities:
-            # remove entity + components from handlers
-            for comp in entity._components.values():
-                entity.world.remove_component(entity, comp.__class__)
-            # add to remove queue
-            self._remove_entities.add(entity)
+            self.commands.despawn(entity)
 
     def get_entity(self, entity_hash: int):
         """Get an entity from the scene"""
@@ -451,6 +1015,12 @@ class Scene:
     def remove_layer(self, layer: World):
         """Remove a layer from the scene"""
         self._layers.remove(layer)
+        layer.shutdown()
+
+    def shutdown(self):
+        """Stop the aspect worker threads of every layer"""
+        for layer in self._layers:
+            layer.shutdown()
 
     def get_config(self):
         """Get the scene configuration"""
@@ -458,38 +1028,38 @@ class Scene:
 
     def update(self):
         """Update a scene"""
-        # add new entities
-        buf = tuple(self._new_entities)
-        # print(buf) if buf else None
-        self._new_entities.clear()
-        for pack in buf:
-            # add components + etc
-            # register components in world
-            w = pack.world
-            for comp in pack.components:
-                w.add_component(entity, comp)
-            # add to chunk
-            c = w.get_chunk(
-                pack.position.x // w._options["chunkpixw"],
-                pack.position.y // w._options["chunkpixh"],
-            ).add_entity(pack)
-            # on ready function call
-            pack.on_ready()
-        # remove entities
-        for entity in tuple(self._remove_entities):
-            e = self.get_entity(entity)
-            self._remove_entity(e)
-        self._remove_entities.clear()
+        # spawn / despawn / component + chunk changes from last frame
+        self.commands.apply()
         # update layers
-        for layer in self._layers:
-            layer.update()
+        if not profiler.ENABLED:
+            for layer in self._layers:
+                layer.update()
+        else:
+            for layer in self._layers:
+                st = profiler.clock()
+                layer.update()
+                profiler.record(profiler.LAYER, layer.name, profiler.clock() - st)
+        # deliver the signals emitted this frame
+        signal.handle_signals()
     
     def _remove_entity(self, entity: "Entity"):
         """Remove an entity from the scene"""
-        entity.world.get_chunk(entity.c_chunk[0], entity.c_chunk[1]).remove_entity(entity)
+        w = entity.world
+        for comp_hash in tuple(entity._components):
+            w._remove_component(entity, comp_hash)
+        w.get_chunk(entity.c_chunk[0], entity.c_chunk[1])._remove_entity(entity)
+        self._global_entities.pop(entity, None)
+        entity._spawned = False
+        # free the transform store slot
+        if entity._transform_store is not None:
+            entity._transform_store.release(entity)
         # remove linked entities
         for link in entity._linked_entities:
             link.kill()
+        entity._alive = False
+        # recycle pooled entities
+        if entity._pool is not None:
+            entity._pool.release(entity)
 
 
 # ------------------------------ #
@@ -502,7 +1072,12 @@ DEFAULT_CONFIG = {
     "chunktileh": 16,
     "tilepixw": 16,
     "tilepixh": 16,
-    "render_distance": 2
+    "render_distance": 2,
+    "cellpixw": 0,
+    "cellpixh": 0,
+    "aspect_workers": 0,
+    "physics_hz": 60,
+    "physics_max_substeps": 5,
 }
 
 
@@ -520,6 +1095,11 @@ def configure_ecs(**kwargs):
     # calculate chunk pixel values
     config["chunkpixw"] = config["chunktilew"] * config["tilepixw"]
     config["chunkpixh"] = config["chunktileh"] * config["tilepixh"]
+    # broadphase cells default to the chunk size
+    if config["cellpixw"] <= 0:
+        config["cellpixw"] = config["chunkpixw"]
+    if config["cellpixh"] <= 0:
+        config["cellpixh"] = config["chunkpixh"]
 
     return config
 
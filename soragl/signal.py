@@ -8,7 +8,7 @@ from queue import deque, Queue
 # ------------------------------------------------------------ #
 
 SIGNALS = {}
-EMIT_QUEUE = Queue(100)
+EMIT_QUEUE = Queue()  # drained once per frame by the scene
 
 def register_signal(signal_register: "SignalRegister") -> "Signal Register":
     """Register a signal to the system"""
@@ -20,7 +20,10 @@ def handle_signals():
     while not EMIT_QUEUE.empty():
         # get and update
         s, args = EMIT_QUEUE.get()
-        s._emit_signal(args)
+        if type(args) == list:
+            s._emit_batch(args)
+        else:
+            s._emit_signal(args)
 
 
 # ------------------------------------------------------------ #
@@ -84,11 +87,21 @@ class SignalRegister:
         """Queue a signal to be emitted -- the one to actually call"""
         EMIT_QUEUE.put((self, kwargs))
 
+    def emit_batch(self, batch: list):
+        """Queue many emissions as one queue entry -- a list of args dicts"""
+        if batch and self.receivers:
+            EMIT_QUEUE.put((self, batch))
+
     def _emit_signal(self, args: dict):
         """Call all receiver functions"""
         for rec in self.receivers:
             self.receivers[rec].call(args)
 
+    def _emit_batch(self, batch: list):
+        """Call all receiver functions for each args dict"""
+        for args in batch:
+            self._emit_signal(args)
+
     def __repr__(self):
         """Represent the signal as a string"""
         return f"signal: {self.name} | id: {self.id}"
@@ -73,8 +73,7 @@ class StateHandlerAspect(scene.Aspect):
     
     def handle(self):
         """Handles the components"""
-        for ent in self.iterate_entities():
-            c_shandler = ent.get_component(StateHandler)
+        for ent, c_shandler in self.iterate_components():
             if not c_shandler._current:
                 continue
             c_shandler.states[c_shandler._current].update()
@@ -0,0 +1,37 @@
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import soragl as SORA
+
+SORA.initialize(
+    {
+        "window_size": [320, 240],
+        "framebuffer_size": [320, 240],
+        "debug": False,
+        "headless": True,
+    }
+)
+SORA.create_context()
+
+from soragl import scene
+
+
+@pytest.fixture
+def world():
+    """A fresh scene layer -- the scene is stepped with `world._scene.update()`"""
+    sc = scene.Scene(config=scene.configure_ecs())
+    layer = sc.make_layer(sc.get_config(), 0, name="test")
+    SORA.DELTA = 1 / 60
+    yield layer
+    sc.shutdown()
+
+
+def step(world, frames: int = 1):
+    """Run the scene of a world for a number of frames"""
+    for _ in range(frames):
+        SORA.DELTA = 1 / 60
+        world._scene.update()
@@ -0,0 +1,49 @@
+from soragl import physics, signal, base_objects
+
+from conftest import step
+
+
+def add_area(world, position, area):
+    """Add an Area2D entity"""
+    e = world.add_entity(physics.Entity())
+    e.position = position
+    e.area = area
+    return e, e.add_component(base_objects.Area2D(*area))
+
+
+def add_body(world, position, area):
+    """Add a resting dynamic collider"""
+    e = world.add_entity(physics.Entity())
+    e.position = position
+    e.area = area
+    e.add_component(base_objects.Collision2DComponent())
+    return e
+
+
+def test_sustained_overlap_does_not_block_the_signal_queue(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    world.add_aspect(base_objects.Area2DAspect())
+    # one area nobody listens to, one area with a "stay" receiver
+    add_area(world, (0, 0), (40, 40))
+    _, area = add_area(world, (0, 0), (40, 40))
+    stays = []
+    area.overlap_signal_register.add_receiver(signal.Receiver(stays.append))
+    add_body(world, (0, 0), (8, 8))
+    step(world, 150)
+    assert len(area.overlaps) == 1
+    # delivered every frame -- nothing left waiting in the queue
+    assert len(stays) > 100
+    assert signal.EMIT_QUEUE.empty()
+
+
+def test_enter_and_exit_are_delivered_once(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    world.add_aspect(base_objects.Area2DAspect())
+    _, area = add_area(world, (0, 0), (20, 20))
+    events = []
+    area.enter_signal_register.add_receiver(signal.Receiver(lambda args: events.append("enter")))
+    area.exit_signal_register.add_receiver(signal.Receiver(lambda args: events.append("exit")))
+    mover = add_body(world, (-30, 0), (4, 4))
+    mover.velocity = (120, 0)
+    step(world, 60)
+    assert events == ["enter", "exit"]
@@ -0,0 +1,65 @@
+import gc
+
+import pygame
+
+from soragl import atlas
+
+
+def make_static(size=(8, 8), color=(255, 0, 0, 255)):
+    """Make a filled static surface"""
+    surface = pygame.Surface(size, pygame.SRCALPHA, 32)
+    surface.fill(color)
+    return atlas.register_static(surface)
+
+
+def test_live_surface_is_drawn_with_current_pixels():
+    target = pygame.Surface((16, 16), pygame.SRCALPHA, 32)
+    sprite = pygame.Surface((4, 4), pygame.SRCALPHA, 32)
+    batch = atlas.SpriteBatch(atlas.TextureAtlas())
+    for color in ((255, 0, 0, 255), (0, 0, 255, 255)):
+        sprite.fill(color)
+        batch.begin(target)
+        batch.draw(sprite, (2, 2))
+        batch.flush()
+        assert tuple(target.get_at((3, 3))) == color
+    assert len(batch.atlas) == 0
+
+
+def test_live_region_is_recopied_each_batch():
+    tex = atlas.TextureAtlas(page_size=64)
+    sprite = pygame.Surface((4, 4), pygame.SRCALPHA, 32)
+    sprite.fill((255, 0, 0, 255))
+    tex.begin()
+    region = tex.get_region(sprite, live=True)
+    tex.end()
+    sprite.fill((0, 255, 0, 255))
+    tex.begin()
+    assert tex.get_region(sprite, live=True) is region
+    tex.end()
+    assert tuple(region.surface.get_at((0, 0))) == (0, 255, 0, 255)
+
+
+def test_dead_surface_regions_are_freed_and_reused():
+    tex = atlas.TextureAtlas(page_size=64, max_pages=1)
+    sprite = make_static()
+    rect = tex.get_region(sprite).rect.copy()
+    del sprite
+    gc.collect()
+    assert len(tex) == 0
+    assert tex.get_region(make_static()).rect.topleft == rect.topleft
+
+
+def test_atlas_is_not_reset_during_a_batch():
+    tex = atlas.TextureAtlas(page_size=16, padding=0, max_pages=1)
+    target = pygame.Surface((64, 64), pygame.SRCALPHA, 32)
+    sprites = [make_static((16, 16), (i * 50, 0, 0, 255)) for i in range(3)]
+    batch = atlas.SpriteBatch(tex)
+    batch.begin(target)
+    for i, sprite in enumerate(sprites):
+        batch.draw(sprite, (i * 16, 0))
+    # every sprite is still packed -- the full atlas grew instead of dropping queued pages
+    assert len(tex.pages) == 3 and len(tex) == 3
+    batch.flush()
+    assert tex.resets == 1 and not tex.pages
+    for i in range(3):
+        assert tuple(target.get_at((i * 16 + 8, 8))) == (i * 50, 0, 0, 255)
@@ -0,0 +1,33 @@
+import soragl as SORA
+from soragl import physics, base_objects
+
+
+def test_camera_follows_the_target_after_physics_steps(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    target = world.add_entity(physics.Entity())
+    target.position = (100, 100)
+    target.area = (8, 8)
+    target.velocity = (90, 0)
+    target.add_component(base_objects.Collision2DComponent())
+    camera = world.add_entity(base_objects.Camera2D())
+    camera.set_target(target)
+    for _ in range(20):
+        # frame time that is not a whole number of fixed steps -- alpha changes every frame
+        SORA.DELTA = 1 / 45
+        world._scene.update()
+        # same frame, same alpha as the sprites drawn this frame
+        drawn = target.render_position
+        assert camera.position.xy == drawn
+        assert SORA.OFFSET[0] == drawn.x - SORA.FHSIZE[0]
+        assert camera.viewport.center == (int(drawn.x), int(drawn.y))
+    assert target.position.x > 100
+
+
+def test_camera_aspect_runs_between_physics_and_rendering(world):
+    world.add_aspect(base_objects.SpriteRendererAspect())
+    world.add_aspect(base_objects.Collision2DAspect())
+    world.add_entity(base_objects.Camera2D())
+    world._scene.update()
+    order = [type(a) for a in world._aspects]
+    camera = order.index(base_objects.Camera2DAspect)
+    assert order.index(base_objects.Collision2DAspect) < camera < order.index(base_objects.SpriteRendererAspect)
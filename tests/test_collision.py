@@ -0,0 +1,77 @@
+import pygame
+
+from soragl import physics, base_objects
+
+from conftest import step
+
+
+def add_box(world, position, area, static=False, velocity=(0, 0)):
+    """Add a box collider entity"""
+    e = world.add_entity(physics.Entity())
+    e.position = position
+    e.area = area
+    e.static = static
+    e.velocity = velocity
+    e.add_component(base_objects.Collision2DComponent())
+    return e
+
+
+def test_overlap_aabb_pushes_out_shortest_way():
+    assert physics.overlap_aabb((0, 0, 10, 10), pygame.Rect(8, 0, 10, 10)) == (-1.0, 0.0, 2)
+    assert physics.overlap_aabb((0, 0, 10, 10), pygame.Rect(-5, 7, 20, 20)) == (0.0, -1.0, 3)
+    # touching is not overlapping
+    assert physics.overlap_aabb((0, 0, 10, 10), pygame.Rect(10, 0, 10, 10)) is None
+
+
+def test_box_starting_inside_static_is_pushed_out(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    wall = add_box(world, (100, 100), (20, 100), static=True)
+    mover = add_box(world, (95, 100), (8, 8), velocity=(30, 0))
+    step(world, 10)
+    assert not mover.rect.colliderect(wall.rect)
+    assert mover.get_component(base_objects.Collision2DComponent).contacts
+
+
+def test_box_starting_inside_tiles_is_pushed_out(world):
+    world.add_aspect(base_objects.TileMap())
+    world.add_aspect(base_objects.Collision2DAspect())
+    tilemap = world.get_aspect(base_objects.TileMap)
+    tilemap.set_sprite_data("assets/sprites/shovel.png", pygame.Rect(0, 0, 16, 16))
+    tilemap.set_region("assets/sprites/shovel.png", 0, 4, 8, 1)
+    # floor top at y = 64 -- the mover starts 3px inside it
+    mover = add_box(world, (40, 63), (8, 8), velocity=(0, 10))
+    step(world, 10)
+    assert not any(tilemap.iterate_tiles_in_rect(mover.rect.inflate(-1, -1)))
+    assert mover.position.y <= 60 + 1e-6
+
+
+def test_shaped_colliders_share_the_collider_slot(world):
+    e = world.add_entity(physics.Entity())
+    circle = e.add_component(base_objects.CircleCollider2D(5))
+    assert e.get_component(base_objects.Collision2DComponent) is circle
+    assert e.get_component(base_objects.CircleCollider2D) is circle
+    assert e.get_component(base_objects.CapsuleCollider2D) is None
+    assert e.entity_has_component(base_objects.CircleCollider2D)
+    # one collider per entity -- a new one replaces the old
+    polygon = e.add_component(base_objects.PolygonCollider2D([(0, 0), (4, 0), (0, 4)]))
+    assert len(e.components) == 1
+    assert e.get_component(base_objects.PolygonCollider2D) is polygon
+    assert e.get_component(base_objects.CircleCollider2D) is None
+
+
+def test_moving_body_wakes_sleeping_body(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    aspect = world.get_aspect(base_objects.Collision2DAspect)
+    sleeper = add_box(world, (100, 0), (8, 8))
+    mover = add_box(world, (0, 0), (8, 8))
+    step(world, aspect.SLEEP_STEPS + 2)
+    comp = sleeper.get_component(base_objects.Collision2DComponent)
+    assert comp.sleeping
+    mover.velocity = (240, 0)
+    # the mover reaches the sleeper after ~23 steps
+    for _ in range(30):
+        step(world)
+        if not comp.sleeping:
+            break
+    assert not comp.sleeping
+    assert mover.rect.inflate(2, 2).colliderect(sleeper.rect)
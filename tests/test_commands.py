@@ -0,0 +1,57 @@
+from soragl import physics, base_objects
+
+from conftest import step
+
+
+def chunks_holding(world, entity):
+    """Keys of every chunk that holds the entity"""
+    return [key for key, chunk in world._chunks.items() if entity in chunk._intrinstic_entities]
+
+
+def test_spawn_is_deferred_to_the_next_flush(world):
+    e = world.add_entity(physics.Entity())
+    assert not e._spawned
+    assert not chunks_holding(world, e)
+    step(world)
+    assert e._spawned
+    assert chunks_holding(world, e) == [(0, 0)]
+
+
+def test_components_added_after_spawn_are_deferred(world):
+    e = world.add_entity(physics.Entity())
+    step(world)
+    comp = e.add_component(base_objects.Collision2DComponent())
+    assert comp is not None
+    assert not e.entity_has_component(base_objects.Collision2DComponent)
+    step(world)
+    assert e.entity_has_component(base_objects.Collision2DComponent)
+
+
+def test_spawn_and_kill_in_one_frame_cancel_out(world):
+    e = world.add_entity(physics.Entity())
+    e.kill()
+    step(world)
+    assert e not in world._scene._global_entities
+    assert not chunks_holding(world, e)
+    assert world._scene.commands.skipped == 1
+
+
+def test_chunk_moves_collapse_to_the_net_move(world):
+    e = world.add_entity(physics.Entity())
+    step(world)
+    world.update_entity_chunk(e, (0, 0), (1, 0))
+    world.update_entity_chunk(e, (1, 0), (0, 1))
+    assert chunks_holding(world, e) == [(0, 0)]
+    step(world)
+    assert chunks_holding(world, e) == [(0, 1)]
+    assert world._scene.commands.skipped == 1
+
+
+def test_chunk_move_and_kill_in_one_frame(world):
+    e = world.add_entity(physics.Entity())
+    step(world)
+    world.update_entity_chunk(e, (0, 0), (1, 0))
+    e.kill()
+    step(world, 2)
+    assert e not in world._scene._global_entities
+    assert not chunks_holding(world, e)
@@ -0,0 +1,93 @@
+import math
+import random
+
+import pytest
+from pygame import Rect
+
+from soragl import physics, base_objects
+
+from conftest import step
+
+
+def at(shape, x, y):
+    shape.transform(x, y)
+    return shape
+
+
+def test_circles_are_pushed_apart_along_the_centers():
+    a, b = at(physics.Circle(5), 0, 0), at(physics.Circle(5), 8, 0)
+    assert physics.collide(a, b) == pytest.approx((-1, 0, 2))
+    b.transform(10, 0)
+    assert physics.collide(a, b) is None
+
+
+def test_swapped_pairs_flip_the_normal():
+    circle = at(physics.Circle(5), 0, 0)
+    rect = Rect(3, -10, 10, 20)
+    hit = physics.collide(circle, rect)
+    assert hit == pytest.approx((-1, 0, 2))
+    assert physics.collide(rect, circle) == pytest.approx((1, 0, 2))
+
+
+def test_circle_corner_contact_uses_the_corner():
+    poly = at(physics.ConvexPolygon.from_size(10, 10), 0, 0)
+    circle = at(physics.Circle(5), 8, 8)
+    nx, ny, depth = physics.collide(circle, poly)
+    assert (nx, ny) == pytest.approx((math.sqrt(0.5), math.sqrt(0.5)))
+    assert depth == pytest.approx(5 - math.hypot(3, 3))
+
+
+def test_pair_functions_agree_with_sat():
+    random.seed(0)
+    for _ in range(500):
+        c = at(physics.Circle(random.uniform(1, 6)), random.uniform(-10, 20), random.uniform(-10, 20))
+        r = Rect(0, 0, random.randint(2, 12), random.randint(2, 12))
+        fast, sat = physics.collide_circle_aabb(c, r), physics.collide_sat(c, r)
+        assert (fast is None) == (sat is None)
+        if fast:
+            assert fast[2] == pytest.approx(sat[2])
+
+
+def test_capsules_collide_with_every_shape():
+    cap = at(physics.Capsule(20, 2, 90), 0, 0)
+    assert physics.collide(cap, at(physics.Circle(2), 3, 8))
+    assert physics.collide(cap, at(physics.Capsule(20, 2, 0), 3, 5))
+    assert physics.collide(cap, Rect(1, -5, 10, 10))
+    assert physics.collide(cap, at(physics.ConvexPolygon.from_size(4, 4), 3, 0))
+    assert physics.collide(cap, Rect(10, -5, 10, 10)) is None
+
+
+def test_registered_pairs_override_the_sat_fallback():
+    class Point:
+        aabb = (0, 0, 0, 0)
+
+        def transform(self, x, y, angle=None):
+            pass
+
+    calls = []
+    physics.register_narrowphase(Point, physics.Circle, lambda a, b: calls.append((a, b)) or (0.0, 1.0, 1.0))
+    try:
+        p, c = Point(), physics.Circle(1)
+        assert physics.collide(p, c) == (0.0, 1.0, 1.0)
+        assert physics.collide(c, p) == (-0.0, -1.0, 1.0)
+        assert calls == [(p, c), (p, c)]
+    finally:
+        physics.NARROWPHASE.pop((Point, physics.Circle))
+
+
+def test_circle_collider_is_pushed_out_of_a_static_box(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    wall = world.add_entity(physics.Entity())
+    wall.position = (100, 100)
+    wall.area = (20, 100)
+    wall.static = True
+    wall.add_component(base_objects.Collision2DComponent())
+    ball = world.add_entity(physics.Entity())
+    ball.position = (70, 100)
+    ball.area = (10, 10)
+    ball.velocity = (60, 0)
+    ball.add_component(base_objects.CircleCollider2D(5))
+    step(world, 60)
+    # stopped at the wall face
+    assert ball.position.x <= wall.rect.left - 5 + 0.01
+    assert ball.position.x > 80
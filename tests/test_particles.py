@@ -0,0 +1,55 @@
+import numpy as np
+
+from soragl import physics
+
+
+def test_remove_dead_fills_holes_from_the_tail():
+    buf = physics.ParticleBuffer(8)
+    # particle i sits at x == i -- odd particles die
+    buf.emit(6, np.column_stack([np.arange(6), np.zeros(6)]), life=[1, 0, 1, 0, 1, 1])
+    assert buf.remove_dead() == 2
+    assert len(buf) == 4
+    assert sorted(buf.positions[:4, 0]) == [0, 2, 4, 5]
+    # rows stay together -- every field moved with its particle
+    assert (buf.life[:4] == 1).all()
+
+
+def test_remove_dead_keeps_order_when_only_the_tail_dies():
+    buf = physics.ParticleBuffer(8)
+    buf.emit(4, np.column_stack([np.arange(4), np.zeros(4)]), life=[1, 1, 0, 0])
+    assert buf.remove_dead() == 2
+    assert list(buf.positions[:2, 0]) == [0, 1]
+    assert buf.remove_dead() == 0
+
+
+def test_age_integrate_and_remove_every_particle():
+    buf = physics.ParticleBuffer(4)
+    buf.emit(3, (10, 10), velocity=(2, 0), life=0.5, spin=1)
+    buf.integrate(0.5, acceleration=(0, 4))
+    assert list(buf.positions[0]) == [11, 11]
+    assert buf.angles[0] == 0.5
+    buf.age(0.5)
+    assert buf.remove_dead() == 3
+    assert len(buf) == 0
+
+
+def test_emit_grows_the_arrays():
+    buf = physics.ParticleBuffer(2)
+    buf.emit(2, (0, 0), color=(255, 0, 0))
+    buf.emit(3, (1, 1))
+    assert buf.capacity == 8
+    assert len(buf) == 5
+    assert list(buf.colors[0]) == [255, 0, 0]
+    assert list(buf.positions[4]) == [1, 1]
+
+
+def test_max_count_drops_extra_particles():
+    buf = physics.ParticleBuffer(4, max_count=3)
+    buf.emit(2, (0, 0))
+    s = buf.emit(3, np.column_stack([np.arange(3), np.ones(3)]), life=[1, 2, 3])
+    assert s == slice(2, 3)
+    assert len(buf) == 3
+    assert buf.dropped == 2
+    # per-particle values keep the rows that fit
+    assert list(buf.positions[2]) == [0, 1]
+    assert buf.life[2] == 1
@@ -0,0 +1,61 @@
+from soragl import physics
+
+from conftest import step
+
+
+def test_killed_entities_are_recycled_with_a_new_generation(world):
+    pool = physics.EntityPool()
+    a = pool.spawn(world)
+    step(world)
+    handle = a.handle
+    assert pool.resolve(handle) is a
+    a.kill()
+    step(world)
+    assert not a.alive
+    assert pool.resolve(handle) is None
+    b = pool.spawn(world)
+    step(world)
+    assert b is a
+    assert b.handle == (handle[0], handle[1] + 1)
+    # the stale handle stays dead, the new one resolves
+    assert pool.resolve(handle) is None
+    assert pool.resolve(b.handle) is b
+    assert pool.get_stats()["hits"] == 1
+
+
+def test_free_entities_do_not_resolve():
+    pool = physics.EntityPool()
+    pool.prewarm(2)
+    e = pool.acquire()
+    pool.release(e)
+    assert pool.resolve(e.handle) is None
+    assert pool.acquire() is e
+    assert pool.resolve(e.handle) is e
+
+
+def test_pool_capacity_drops_extra_entities():
+    pool = physics.EntityPool(capacity=1)
+    a, b = pool.acquire(), pool.acquire()
+    handle = b.handle
+    pool.release(a)
+    pool.release(b)
+    assert pool.dropped == 1
+    assert pool.resolve(handle) is None
+    assert pool.acquire() is a
+    assert pool.acquire() is not b
+
+
+def test_recycled_entities_get_a_transform_slot_again():
+    store = physics.TransformStore(4)
+    pool = physics.EntityPool(transform_store=store)
+    e = pool.acquire()
+    e.position = (5, 6)
+    assert len(store) == 1
+    store.release(e)
+    pool.release(e)
+    assert len(store) == 0
+    assert pool.acquire() is e
+    assert len(store) == 1
+    e.velocity = (60, 0)
+    store.integrate(1 / 60)
+    assert e.position.x == 1
@@ -0,0 +1,69 @@
+from soragl import scene, physics
+
+from conftest import step
+
+
+class Position(scene.Component):
+    pass
+
+
+class Velocity(scene.Component):
+    pass
+
+
+class Frozen(scene.Component):
+    pass
+
+
+def add(world, *components):
+    """Add a spawned entity with components"""
+    e = world.add_entity(physics.Entity())
+    for comp in components:
+        e.add_component(comp())
+    return e
+
+
+def test_query_matches_signatures():
+    query = scene.Query(all_of=[Position], any_of=[Velocity, Frozen], none_of=[Frozen])
+    assert query.matches(frozenset({hash(Position), hash(Velocity)}))
+    assert not query.matches(frozenset({hash(Position)}))
+    assert not query.matches(frozenset({hash(Position), hash(Velocity), hash(Frozen)}))
+
+
+def test_equal_queries_share_one_cache_entry(world):
+    add(world, Position, Velocity)
+    step(world)
+    first = world.get_query_archetypes(scene.Query(all_of=[Position]))
+    second = world.get_query_archetypes(scene.Query(all_of=[Position]))
+    assert first is second
+    assert len(world._queries) == 1
+
+
+def test_cached_queries_are_extended_by_new_archetypes(world):
+    query = scene.Query(all_of=[Position], none_of=[Frozen])
+    a = add(world, Position)
+    step(world)
+    cached = world.get_query_archetypes(query)
+    assert list(world.iterate_query(query)) == [a]
+    b = add(world, Position, Velocity)
+    add(world, Position, Frozen)
+    step(world)
+    assert world.get_query_archetypes(query) is cached
+    assert len(cached) == 2
+    assert sorted(world.iterate_query(query), key=id) == sorted([a, b], key=id)
+
+
+def test_entities_follow_their_components(world):
+    query = scene.Query(all_of=[Position, Velocity])
+    a = add(world, Position)
+    b = add(world, Position, Velocity)
+    step(world)
+    assert list(world.iterate_query(query)) == [b]
+    a.add_component(Velocity())
+    b.remove_component(Velocity)
+    step(world)
+    assert list(world.iterate_query(query)) == [a]
+    # swap-removed rows keep the columns packed
+    archetype = world._entity_archetypes[a]
+    assert archetype.entities == [a]
+    assert archetype.columns[hash(Velocity)][0] is a.get_component(Velocity)
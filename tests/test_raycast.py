@@ -0,0 +1,82 @@
+import pygame
+import pytest
+
+from soragl import physics, base_objects
+
+from conftest import step
+
+
+def at(shape, x, y):
+    shape.transform(x, y)
+    return shape
+
+
+def add_static(world, position, component, area=(8, 8)):
+    """Add a static collider entity"""
+    e = world.add_entity(physics.Entity())
+    e.position = position
+    e.area = area
+    e.static = True
+    e.add_component(component)
+    return e
+
+
+def test_grid_ray_visits_cells_in_order():
+    cells = list(physics.iterate_grid_ray(5, 5, 1, 0, 34, 10, 10))
+    assert [(cx, cy) for cx, cy, _ in cells] == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    assert [t for _, _, t in cells] == [0, 5, 15, 25]
+    diagonal = [(cx, cy) for cx, cy, _ in physics.iterate_grid_ray(1, 1, 0.6, 0.8, 20, 10, 10)]
+    assert diagonal[0] == (0, 0) and diagonal[-1] == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "shape, expected",
+    [
+        (pygame.Rect(10, -5, 10, 10), (10, -1, 0)),
+        (at(physics.Circle(5), 20, 0), (15, -1, 0)),
+        (at(physics.ConvexPolygon.from_size(10, 10), 20, 0), (15, -1, 0)),
+        (at(physics.Capsule(10, 5, 90), 20, 0), (15, -1, 0)),
+    ],
+)
+def test_ray_hits_every_shape_type(shape, expected):
+    assert physics.raycast_shape(shape, 0, 0, 1, 0, 100) == pytest.approx(expected)
+    # too short + pointing away
+    assert physics.raycast_shape(shape, 0, 0, 1, 0, 5) is None
+    assert physics.raycast_shape(shape, 0, 0, -1, 0, 100) is None
+
+
+def test_ray_starting_inside_hits_at_zero():
+    assert physics.raycast_shape(at(physics.Circle(5), 0, 0), 1, 1, 1, 0, 10) == (0.0, 0.0, 0.0)
+
+
+def test_world_raycast_sorts_filters_and_stops_early(world):
+    world.add_aspect(base_objects.Collision2DAspect())
+    box = add_static(world, (-100, 0), base_objects.Collision2DComponent(), (20, 20))
+    circle = add_static(world, (100, 0), base_objects.CircleCollider2D(10))
+    polygon = add_static(world, (200, 0), base_objects.PolygonCollider2D([(-10, -10), (10, -10), (0, 10)]))
+    step(world, 2)
+    hits = world.raycast((0, 0), (1, 0), 1000)
+    assert [col for col, _, _ in hits] == [circle, polygon]
+    assert hits[0][1] == pytest.approx(90)
+    assert hits[0][2] == pytest.approx((-1, 0))
+    assert [col for col, _, _ in world.raycast((0, 0), (1, 0), 1000, first=True)] == [circle]
+    assert [col for col, _, _ in world.raycast((0, 0), (1, 0), 1000, ignore=circle)] == [polygon]
+    assert [col for col, _, _ in world.raycast((0, 0), (-2, 0), 1000)] == [box]
+    assert world.segment_cast((0, 0), (85, 0)) == []
+
+
+def test_world_queries_include_tiles(world):
+    world.add_aspect(base_objects.TileMap())
+    world.add_aspect(base_objects.Collision2DAspect())
+    tilemap = world.get_aspect(base_objects.TileMap)
+    tilemap.set_sprite_data("assets/sprites/shovel.png", pygame.Rect(0, 0, 16, 16))
+    tilemap.add_tile_global("assets/sprites/shovel.png", 5, 0)
+    circle = add_static(world, (40, 8), base_objects.CircleCollider2D(10))
+    step(world, 2)
+    col, distance, normal = world.raycast((0, 8), (1, 0), 1000, first=True)[0]
+    assert col is circle and distance == pytest.approx(30)
+    tile = world.raycast((60, 8), (1, 0), 1000, first=True)[0][0]
+    assert isinstance(tile, base_objects.Tile)
+    assert world.query_point((40, 12)) == [circle]
+    assert world.query_point((0, 100)) == []
+    assert world.query_rect(pygame.Rect(30, 0, 60, 16)) == [circle, tile]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from soragl import physics
+
+
+def make_poly(poly, x, y, angle=0.0):
+    poly.transform(x, y, angle)
+    return poly
+
+
+def test_parallel_edges_share_an_axis():
+    assert len(physics.ConvexPolygon.from_size(10, 4).axes) == 2
+    assert len(physics.ConvexPolygon.regular(6, 5).axes) == 3
+    assert len(physics.ConvexPolygon([(0, 0), (10, 0), (0, 10)]).axes) == 3
+
+
+def test_polygons_overlap_only_when_no_axis_separates_them():
+    a = make_poly(physics.ConvexPolygon.from_size(10, 10), 0, 0)
+    b = make_poly(physics.ConvexPolygon.from_size(10, 10), 9, 0)
+    assert a.overlaps(b)
+    b.transform(11, 0)
+    assert not a.overlaps(b)
+
+
+def test_rotated_polygons_use_the_rotated_axes():
+    a = make_poly(physics.ConvexPolygon.from_size(10, 10), 0, 0)
+    # the AABBs overlap but the diagonal edge separates the shapes
+    b = make_poly(physics.ConvexPolygon.from_size(10, 10), 11, 11, 45)
+    assert a.aabb_overlaps(b)
+    assert not a.overlaps(b)
+    b.transform(8, 8, 45)
+    assert a.overlaps(b)
+
+
+def test_transform_is_cached_until_the_owner_moves():
+    poly = make_poly(physics.ConvexPolygon.from_size(4, 2), 3, 3, 30)
+    vertices = poly.vertices
+    poly.transform(3, 3, 30)
+    assert poly.vertices is vertices
+    poly.transform(4, 3, 30)
+    assert poly.vertices is not vertices
+    assert np.allclose(poly.vertices, vertices + (1, 0))
+
+
+def test_batched_sat_matches_pairwise_sat():
+    rng = np.random.default_rng(3)
+    shape = make_poly(physics.ConvexPolygon.regular(5, 12), 0, 0, 10)
+    others = [
+        make_poly(physics.ConvexPolygon.regular(int(rng.integers(3, 8)), 6), *rng.uniform(-30, 30, 2), rng.uniform(0, 360))
+        for _ in range(60)
+    ]
+    expected = [shape.overlaps(o) for o in others]
+    assert list(physics.sat_overlap_many(shape, others)) == expected
+    assert any(expected) and not all(expected)
+
+
+def test_overlap_general_accepts_any_vertex_shape():
+    circle = physics.Circle(5)
+    circle.transform(0, 0)
+    box = make_poly(physics.ConvexPolygon.from_size(4, 4), 6, 0)
+    assert physics.overlap_general(circle, box)
+    box.transform(8, 0)
+    assert not physics.overlap_general(circle, box)
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+import soragl as SORA
+from soragl import scene
+
+from conftest import step
+
+
+class Recorder(scene.Aspect):
+    """Records when it is handled"""
+
+    def __init__(self, name, log, priority=0, reads=None, writes=None):
+        super().__init__(None, priority)
+        self.name = name
+        self.log = log
+        if reads is not None or writes is not None:
+            self.declare_access(reads or (), writes or ())
+
+    def handle(self):
+        self.log.append((self.name, threading.current_thread().name))
+
+
+def names(stages):
+    return [[a.name for a in stage] for stage in stages]
+
+
+def test_non_conflicting_aspects_share_a_stage():
+    log = []
+    a = Recorder("a", log, reads=["pos"], writes=["vel"])
+    b = Recorder("b", log, reads=["pos"], writes=["hp"])
+    assert names(scene.AspectScheduler().build_stages([a, b])) == [["a", "b"]]
+
+
+def test_conflicting_aspects_run_in_priority_order():
+    log = []
+    writer = Recorder("writer", log, writes=["pos"])
+    reader = Recorder("reader", log, reads=["pos"])
+    other = Recorder("other", log, writes=["hp"])
+    stages = scene.AspectScheduler().build_stages([writer, reader, other])
+    assert names(stages) == [["writer", "other"], ["reader"]]
+
+
+def test_undeclared_aspects_run_alone():
+    log = []
+    a = Recorder("a", log, writes=["pos"])
+    b = Recorder("b", log)
+    c = Recorder("c", log, writes=["hp"])
+    assert names(scene.AspectScheduler().build_stages([a, b, c])) == [["a"], ["b"], ["c"]]
+
+
+def test_stages_are_rebuilt_when_aspects_change(world):
+    log = []
+    world.add_aspect(Recorder("a", log, priority=2, writes=["pos"]))
+    world.add_aspect(Recorder("b", log, priority=1, writes=["hp"]))
+    assert names(world.scheduler.get_stages(world._aspects)) == [["a", "b"]]
+    world.get_aspect(Recorder).declare_access(reads=["hp"], writes=["pos"])
+    assert names(world.scheduler.get_stages(world._aspects)) == [["a"], ["b"]]
+    world.add_aspect(Recorder("c", log, priority=3, writes=["mana"]))
+    assert names(world.scheduler.get_stages(world._aspects)) == [["c", "a"], ["b"]]
+
+
+def test_stages_run_on_the_worker_pool(world):
+    log = []
+    world.scheduler.workers = 2
+    world.add_aspect(Recorder("a", log, priority=2, writes=["pos"]))
+    world.add_aspect(Recorder("b", log, priority=1, writes=["hp"]))
+    world.add_aspect(Recorder("c", log, priority=0, reads=["pos"]))
+    step(world)
+    assert sorted(n for n, _ in log) == ["a", "b", "c"]
+    # the later stage only starts once the first stage is done
+    assert log[-1][0] == "c"
+    assert any(t.startswith("soragl-aspect") for _, t in log)
+
+
+def test_worker_errors_are_raised(world):
+    class Broken(scene.Aspect):
+        def handle(self):
+            raise ValueError("broken")
+
+    world.scheduler.workers = 2
+    world.add_aspect(Broken(None).declare_access(writes=["pos"]))
+    world.add_aspect(Recorder("b", [], writes=["hp"]))
+    with pytest.raises(ValueError):
+        step(world)
+
+
+def test_fixed_step_aspects_run_once_per_step(world):
+    log = []
+    fixed = Recorder("fixed", log)
+    fixed.fixed_step = True
+    world.add_aspect(fixed)
+    world.add_aspect(Recorder("frame", log))
+    world.timestep.set_rate(60)
+    SORA.DELTA = 3 / 60 + 1e-6
+    world._scene.update()
+    assert [n for n, _ in log].count("fixed") == 3
+    assert [n for n, _ in log].count("frame") == 1
@@ -0,0 +1,86 @@
+import numpy as np
+import pygame
+import pytest
+
+from soragl import base_objects
+
+SHOVEL = "assets/sprites/shovel.png"
+HOE = "assets/sprites/hoe.png"
+
+
+@pytest.fixture
+def tilemap(world):
+    world.add_aspect(base_objects.TileMap())
+    tilemap = world.get_aspect(base_objects.TileMap)
+    tilemap.set_sprite_data(SHOVEL, pygame.Rect(0, 0, 16, 16))
+    return tilemap
+
+
+def chunk_counts(tilemap):
+    """Tile count of every chunk with a tile grid"""
+    return {
+        key: len(chunk._dev[tilemap.CHUNK_KEY])
+        for key, chunk in tilemap._world._chunks.items()
+        if tilemap.CHUNK_KEY in chunk._dev
+    }
+
+
+def test_tile_grid_counts_and_drops_cached_tiles():
+    grid = base_objects.TileGrid(4, 4)
+    grid.set(1, 2, 3)
+    grid.set(1, 2, 5)
+    assert len(grid) == 1
+    grid.tiles[2 * 4 + 1] = object()
+    grid.set(1, 2, 0)
+    assert len(grid) == 0 and not grid.tiles
+    grid.set_region(1, 1, np.ones((2, 3), dtype=np.uint16))
+    assert len(grid) == 6
+    assert grid.ids[1:3, 1:4].all() and grid.ids.sum() == 6
+
+
+def test_set_region_is_split_across_chunks(tilemap):
+    assert min(tilemap._chunk_tile_area) > 3
+    # a region straddling the four chunks around the origin
+    tilemap.set_region(SHOVEL, -2, -3, 5, 6)
+    tid = tilemap.get_palette_id(SHOVEL)
+    for tx in range(-4, 5):
+        for ty in range(-5, 5):
+            inside = -2 <= tx < 3 and -3 <= ty < 3
+            assert tilemap.get_tile_id(tx, ty) == (tid if inside else 0)
+    assert chunk_counts(tilemap) == {(-1, -1): 6, (0, -1): 9, (-1, 0): 6, (0, 0): 9}
+    # None clears the region
+    tilemap.set_region(None, -2, -3, 5, 6)
+    assert set(chunk_counts(tilemap).values()) == {0}
+
+
+def test_load_layer_maps_its_palette(tilemap):
+    layer = np.array([[0, 1, 2], [2, 0, 1]])
+    tilemap.load_layer(layer, 10, 10, palette=[HOE, SHOVEL])
+    hoe, shovel = tilemap.get_palette_id(HOE), tilemap.get_palette_id(SHOVEL)
+    assert [tilemap.get_tile_id(x, 10) for x in range(10, 13)] == [0, hoe, shovel]
+    assert [tilemap.get_tile_id(x, 11) for x in range(10, 13)] == [shovel, 0, hoe]
+    with pytest.raises(ValueError):
+        tilemap.load_layer([[99]], 0, 0)
+
+
+def test_tiles_are_made_on_query_and_cached(tilemap):
+    tilemap.add_tile_global(SHOVEL, 3, 2)
+    tile = tilemap.get_tile(3, 2)
+    assert tile.rect.topleft == (3 * 16, 2 * 16)
+    assert tilemap.get_tile(3, 2) is tile
+    assert tilemap.get_tile(4, 2) is None
+    chunk = tilemap._world.get_chunk(0, 0)
+    assert list(tilemap.iterate_chunk_tiles(chunk)) == [tile]
+    # editing the grid drops the cached tile
+    tilemap.add_tile_global(HOE, 3, 2)
+    assert tilemap.get_tile(3, 2) is not tile
+    assert tilemap.get_tile(3, 2).sprite_path == HOE
+
+
+def test_edits_drop_the_baked_chunk(tilemap):
+    tilemap.add_tile_global(SHOVEL, 0, 0)
+    chunk = tilemap._world.get_chunk(0, 0)
+    baked = tilemap.get_baked_chunk(chunk)
+    assert tilemap.get_baked_chunk(chunk) is baked
+    tilemap.set_region(SHOVEL, 1, 0, 2, 1)
+    assert tilemap.get_baked_chunk(chunk) is not baked